@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+HTML Parser Benchmark
+Times the parser backends (scraping.parser) over a corpus of saved HTML pages and
+checks that they extract the same title, author, publisher and text.
+
+    python benchmarks/bench_html_parsers.py
+    python benchmarks/bench_html_parsers.py --pages ~/saved-pages --repeat 20
+
+The default corpus is benchmarks/fixtures/pages; any directory of saved *.html
+pages can be used instead.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.html_parsers import PARSERS  # noqa: E402
+
+FIXTURE_PAGES = Path(__file__).resolve().parent / 'fixtures' / 'pages'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the HTML parser backends')
+    parser.add_argument('--pages', type=Path, default=FIXTURE_PAGES, help='Directory of saved *.html pages')
+    parser.add_argument('--repeat', type=int, default=10, help='Passes over the corpus per backend (default: 10)')
+    args = parser.parse_args()
+
+    pages = {path.name: path.read_bytes() for path in sorted(args.pages.glob('*.html'))}
+    if not pages:
+        sys.exit(f"No *.html pages in {args.pages}")
+    corpus_bytes = sum(len(html) for html in pages.values())
+    print(f"{len(pages)} pages, {corpus_bytes / 1024:.0f} KiB, {args.repeat} passes\n")
+
+    backends = {}
+    for name, backend in PARSERS.items():
+        try:
+            backends[name] = backend()
+        except ImportError:
+            print(f"{name}: not installed, skipped")
+
+    reference = {page: backends['beautifulsoup'].parse(html) for page, html in pages.items()}
+
+    print(f"{'parser':<14} {'ms/page':>8} {'MiB/s':>7} {'speedup':>8} {'matches':>8}")
+    baseline = None
+    for name, backend in backends.items():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            for html in pages.values():
+                backend.parse(html)
+        elapsed = time.perf_counter() - start
+
+        baseline = baseline or elapsed
+        matches = sum(backend.parse(html) == reference[page] for page, html in pages.items())
+        print(f"{name:<14} {elapsed / (args.repeat * len(pages)) * 1000:>8.2f} "
+              f"{corpus_bytes * args.repeat / elapsed / 2 ** 20:>7.1f} {baseline / elapsed:>7.1f}x "
+              f"{matches:>4}/{len(pages)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmark
+Runs BookmarkProcessor end to end over synthetic exports without network access:
+pages come from tools/fixture_server.py (saved pages with injected latency and
+errors) and AI requests go through the `local` provider to tools/mock_llm_server.py.
+Reports bookmarks/sec, p50/p95 latency per bookmark and peak RSS per export size.
+
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --rows 1000 10000 100000 --concurrency 8 --parse-workers 4
+    python benchmarks/bench_pipeline.py --page-latency 0.2 --llm-latency 0.8 --error-rate 0.05
+    python benchmarks/bench_pipeline.py --save baseline.json
+    python benchmarks/bench_pipeline.py --baseline baseline.json  # exit 1 on a regression
+    python benchmarks/bench_pipeline.py --export-only --rows 100000 --output-dir exports/
+
+Each export size runs in a fresh process, so peak RSS is that run's own. The page
+and AI response caches, the negative cache and near-duplicate detection are off,
+and the per-host request delay is --request-delay (default 0), so every bookmark
+pays for the full fetch, parse and AI round trip.
+"""
+
+import argparse
+import csv
+import json
+import logging
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+TOPICS = ['Climate', 'Neuroscience', 'Startups', 'Typography', 'Databases', 'Urban Planning', 'Economics',
+          'Photography', 'Linguistics', 'Astronomy', 'Nutrition', 'Cryptography', 'Architecture', 'Music']
+ANGLES = ['How', 'Why', 'The Future of', 'A Short History of', 'What We Get Wrong About', 'Notes on']
+TRACKING = '?utm_source=pocket&utm_campaign=fftutorial'
+
+# Metrics compared against --baseline, and whether higher is better
+COMPARED = {'bookmarks_per_sec': True, 'p95': False, 'peak_rss_mb': False}
+
+
+def write_export(path: Path, rows: int, base_url: str, duplicate_rate: float = 0.05, seed: int = 0):
+    """
+    Write a synthetic export in the pocket-bookmarks.csv format (title;url;tags;created).
+
+    URLs spread over 50 site paths on the fixture server; `duplicate_rate` of the
+    rows repeat an earlier URL with Pocket's tracking parameters, as real exports do.
+    """
+    rng = random.Random(seed)
+    urls = []
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(['title', 'url', 'tags', 'created'])
+        for i in range(rows):
+            if urls and rng.random() < duplicate_rate:
+                url = rng.choice(urls) + TRACKING
+            else:
+                url = f"{base_url}/site{i % 50}/articles/{i}"
+                urls.append(url)
+            title = f"{rng.choice(ANGLES)} {rng.choice(TOPICS)} {i}"
+            writer.writerow([title, url, rng.choice(['NA', 'NA', 'reading', 'research']), 1500000000 + i * 37])
+
+
+def start_server(script: str, *args: str) -> tuple:
+    """Start a stand-in server from tools/ on a free port; returns (process, base URL)."""
+    process = subprocess.Popen([sys.executable, str(ROOT / 'tools' / script), '--port', '0', *args],
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line:
+        raise RuntimeError(f"{script} did not start")
+    return process, line.strip().rsplit(' ', 1)[-1]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process and its parse workers, in MiB (0 where unsupported)."""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    return peak * unit / 2 ** 20
+
+
+def run_one(args) -> dict:
+    """Process one export in this process and return its figures."""
+    import openai
+    from src.ai_processor import AIProcessor
+    from src.bookmark_processor import BookmarkProcessor
+
+    logging.basicConfig(level=logging.ERROR)
+
+    processor = BookmarkProcessor(concurrency=args.concurrency, parse_workers=args.parse_workers)
+    extractor = processor.content_extractor
+    extractor.rate_limiter.delay = args.request_delay
+    extractor.cache = None
+    extractor.failure_cache = None
+    # The fixture server replays a handful of pages, which would all be near-duplicates
+    processor.near_duplicates = None
+
+    ai = AIProcessor('local', 'bench-model')
+    ai.client = openai.OpenAI(base_url=f"{args.llm_url}/v1", api_key='bench', max_retries=0)
+    ai.response_cache = None
+    ai.concurrency = args.ai_concurrency
+    processor.ai_processor = ai
+
+    output_dir = Path(args.export).parent
+    start = time.perf_counter()
+    processor.process_file(Path(args.export), output_dir / 'enriched.csv')
+    elapsed = time.perf_counter() - start
+
+    stages = processor.metrics.stage_report()
+    total = stages.get('total', {})
+    return {
+        'rows': args.run_one,
+        'seconds': elapsed,
+        'bookmarks_per_sec': args.run_one / elapsed,
+        'p50': total.get('p50', 0.0),
+        'p95': total.get('p95', 0.0),
+        'stage_p95': {stage: timing['p95'] for stage, timing in stages.items()},
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def compare(results: list, baseline_path: Path, tolerance: float) -> list:
+    """Regressions of `results` against a saved run, as messages."""
+    baseline = {result['rows']: result for result in json.loads(baseline_path.read_text())}
+    regressions = []
+    for result in results:
+        before = baseline.get(result['rows'])
+        if not before:
+            continue
+        for metric, higher_is_better in COMPARED.items():
+            old, new = before[metric], result[metric]
+            worse = new < old * (1 - tolerance) if higher_is_better else new > old * (1 + tolerance)
+            if old and worse:
+                regressions.append(f"{result['rows']} rows: {metric} {old:.2f} -> {new:.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the full pipeline against local stand-in servers')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000],
+                        help='Synthetic export sizes (default: 1000; e.g. 1000 10000 100000)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Fetch workers (default: 4)')
+    parser.add_argument('--parse-workers', type=int, default=0, help='Parse worker processes (default: 0)')
+    parser.add_argument('--ai-concurrency', type=int, default=4, help='AI requests in flight (default: 4)')
+    parser.add_argument('--request-delay', type=float, default=0.0, help='Seconds between requests to a host (default: 0)')
+    parser.add_argument('--page-latency', type=float, default=0.05, help='Fixture server latency in seconds (default: 0.05)')
+    parser.add_argument('--llm-latency', type=float, default=0.3, help='Mock LLM latency in seconds (default: 0.3)')
+    parser.add_argument('--jitter', type=float, default=0.5, help='Latency variation of both servers (default: 0.5)')
+    parser.add_argument('--error-rate', type=float, default=0.02, help='Fraction of URLs with an injected error (default: 0.02)')
+    parser.add_argument('--duplicate-rate', type=float, default=0.05, help='Fraction of duplicate URLs in the exports (default: 0.05)')
+    parser.add_argument('--save', type=Path, help='Write the results as JSON (e.g. a baseline)')
+    parser.add_argument('--baseline', type=Path, help='Compare with saved results and exit 1 on a regression')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='Allowed change against the baseline before it counts as a regression (default: 0.10)')
+    parser.add_argument('--export-only', action='store_true', help='Only write the synthetic exports to --output-dir')
+    parser.add_argument('--output-dir', type=Path, help='Where to write the exports (default: a temporary directory)')
+    parser.add_argument('--run-one', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--export', help=argparse.SUPPRESS)
+    parser.add_argument('--llm-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        print(json.dumps(run_one(args)))
+        return
+
+    if args.export_only:
+        output_dir = args.output_dir or Path('.')
+        output_dir.mkdir(parents=True, exist_ok=True)
+        for rows in args.rows:
+            path = output_dir / f"synthetic_{rows}.csv"
+            write_export(path, rows, 'http://127.0.0.1:8002', args.duplicate_rate)
+            print(f"Wrote {path} (pages expected on http://127.0.0.1:8002, see tools/fixture_server.py)")
+        return
+
+    pages, pages_url = start_server('fixture_server.py', '--latency', str(args.page_latency), '--jitter', str(args.jitter),
+                                    '--error-rate', str(args.error_rate))
+    llm, llm_url = start_server('mock_llm_server.py', '--latency', str(args.llm_latency), '--jitter', str(args.jitter))
+    print(f"{args.concurrency} fetch workers, {args.parse_workers} parse workers, {args.ai_concurrency} AI requests; "
+          f"page latency {args.page_latency}s, LLM latency {args.llm_latency}s, error rate {args.error_rate:.0%}\n")
+
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            work_dir = args.output_dir or Path(tmp)
+            work_dir.mkdir(parents=True, exist_ok=True)
+            print(f"{'rows':>8}  {'seconds':>8}  {'bookmarks/s':>11}  {'p50 s':>7}  {'p95 s':>7}  {'peak RSS MiB':>12}")
+            for rows in args.rows:
+                run_dir = work_dir / f"run_{rows}"
+                run_dir.mkdir(exist_ok=True)
+                export = run_dir / f"synthetic_{rows}.csv"
+                write_export(export, rows, pages_url, args.duplicate_rate)
+
+                child = subprocess.run(
+                    [sys.executable, __file__, '--run-one', str(rows), '--export', str(export), '--llm-url', llm_url,
+                     '--concurrency', str(args.concurrency), '--parse-workers', str(args.parse_workers),
+                     '--ai-concurrency', str(args.ai_concurrency), '--request-delay', str(args.request_delay)],
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=str(ROOT)
+                )
+                if child.returncode != 0:
+                    sys.exit(f"Benchmark run for {rows} rows failed:\n{child.stderr[-2000:]}")
+
+                result = json.loads(child.stdout.strip().splitlines()[-1])
+                results.append(result)
+                print(f"{rows:>8}  {result['seconds']:>8.1f}  {result['bookmarks_per_sec']:>11.1f}  "
+                      f"{result['p50']:>7.3f}  {result['p95']:>7.3f}  {result['peak_rss_mb']:>12.0f}")
+                print('          stage p95: ' + ', '.join(f"{stage} {seconds:.3f}s"
+                                                          for stage, seconds in result['stage_p95'].items()))
+    finally:
+        pages.terminate()
+        llm.terminate()
+
+    if args.save:
+        args.save.write_text(json.dumps(results, indent=2))
+        print(f"\nResults saved to {args.save}")
+
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == '__main__':
+    main()
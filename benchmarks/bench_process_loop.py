@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Process Loop Benchmark
+Measures the per-row bookkeeping overhead of BookmarkProcessor.process_file on
+synthetic exports, with fetching and AI calls replaced by instant stand-ins.
+
+    python benchmarks/bench_process_loop.py
+    python benchmarks/bench_process_loop.py --rows 1000 10000 100000
+
+Per-row time, including checkpoint journal writes, should stay flat as the row
+count grows.
+"""
+
+import argparse
+import csv
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.bookmark_processor import BookmarkProcessor  # noqa: E402
+
+
+def write_export(path: Path, rows: int):
+    """Write a synthetic Pocket-style export with `rows` unique URLs."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(['title', 'url', 'tags', 'created'])
+        for i in range(rows):
+            writer.writerow([f"Synthetic article {i}", f"https://site{i % 50}.example/articles/{i}",
+                             'NA', 1600000000 + i])
+
+
+def fake_extract(url):
+    return {'title': 'Extracted title', 'text': 'Body text. ' * 20, 'authors': ['A. Writer'],
+            'publisher': 'Example Publisher', 'url': url}
+
+
+def fake_ai(title, content, authors, publisher, existing_tags):
+    return {'description': f"Summary of {title}", 'tags': ['synthetic', 'benchmark'], 'author': 'A. Writer'}
+
+
+def run(rows: int, work_dir: Path) -> float:
+    """Process a synthetic export and return the elapsed seconds."""
+    input_path = work_dir / f"export_{rows}.csv"
+    output_path = work_dir / f"enriched_{rows}.csv"
+    write_export(input_path, rows)
+
+    processor = BookmarkProcessor(concurrency=1)
+    processor.content_extractor.extract_content = fake_extract
+    processor.ai_processor.process_content = fake_ai
+
+    start = time.perf_counter()
+    processor.process_file(input_path, output_path)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark per-row overhead of the processing loop')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Synthetic export sizes (default: 1000 10000 100000)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    print(f"{'rows':>8}  {'total s':>9}  {'us/row':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            elapsed = run(rows, Path(tmp))
+            print(f"{rows:>8}  {elapsed:>9.2f}  {elapsed / rows * 1e6:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
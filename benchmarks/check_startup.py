@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Startup Budget Check
+Runs the CLI entry points under `python -X importtime` and fails (exit 1) when
+their import time exceeds a budget or when a module that should be deferred is
+imported at startup: `main.py --help` must not load the config, pandas or the
+HTTP stack, and importing the processor must not load the provider SDKs or
+newspaper3k, which are imported on first use.
+
+    python benchmarks/check_startup.py
+    python benchmarks/check_startup.py --help-budget 0.2 --processor-budget 0.6 --runs 5
+
+Each check runs in a fresh interpreter; the fastest of --runs is compared, so a
+busy machine doesn't fail the check on one slow start.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+# (name, command, modules that must not be imported)
+CHECKS = [
+    ('main.py --help', ['main.py', '--help'],
+     ('yaml', 'dotenv', 'pandas', 'requests', 'newspaper', 'openai', 'anthropic')),
+    ('import src.bookmark_processor', ['-c', 'import src.bookmark_processor'],
+     ('newspaper', 'nltk', 'openai', 'anthropic')),
+]
+
+
+def import_times(command: list) -> dict:
+    """Cumulative import seconds and nesting depth (0 for top-level imports) of each module a command imports."""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *command], cwd=str(ROOT),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            # Nested imports are indented by two spaces per level below the top one
+            modules[name] = (int(cumulative) / 1e6, (len(indent) - 1) // 2)
+    return modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the import time of the CLI against a budget')
+    parser.add_argument('--help-budget', type=float, default=0.25,
+                        help='Seconds of imports allowed for main.py --help (default: 0.25)')
+    parser.add_argument('--processor-budget', type=float, default=0.8,
+                        help='Seconds of imports allowed for src.bookmark_processor (default: 0.8)')
+    parser.add_argument('--runs', type=int, default=3, help='Runs per check, the fastest counts (default: 3)')
+    parser.add_argument('--top', type=int, default=5, help='Slowest imports listed per check (default: 5)')
+    args = parser.parse_args()
+
+    budgets = [args.help_budget, args.processor_budget]
+    failures = []
+    for (name, command, deferred), budget in zip(CHECKS, budgets):
+        runs = [import_times(command) for _ in range(max(1, args.runs))]
+        modules = min(runs, key=lambda run: sum(seconds for seconds, depth in run.values() if depth == 0))
+        total = sum(seconds for seconds, depth in modules.values() if depth == 0)
+        # What the top-level imports spend their time on
+        slowest = sorted(((seconds, module) for module, (seconds, depth) in modules.items() if depth == 1),
+                         reverse=True)
+
+        status = 'ok' if total <= budget else 'OVER BUDGET'
+        print(f"{name}: {total * 1000:.0f} ms of imports (budget {budget * 1000:.0f} ms) {status}")
+        for seconds, module in slowest[:args.top]:
+            print(f"    {seconds * 1000:8.1f} ms  {module}")
+        if total > budget:
+            failures.append(f"{name} imports take {total * 1000:.0f} ms, over the {budget * 1000:.0f} ms budget")
+
+        loaded = [module for module in deferred if module in modules]
+        if loaded:
+            failures.append(f"{name} imports {', '.join(loaded)}, which should be imported on first use")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,48 +1,183 @@
+"""
+Settings from config.yaml and .env, read and validated on first use.
+
+The settings are module attributes (`from config import AI_MODEL`), but the files
+are only read when the first one is accessed, so `main.py --help` and runs that
+fail argument checks never touch them. Invalid settings raise one ConfigError
+listing every problem.
+"""
 import os
-import yaml
 from pathlib import Path
-from dotenv import load_dotenv
-
-load_dotenv()
-
-# Load YAML configuration
-config_path = Path(__file__).parent / 'config.yaml'
-with open(config_path, 'r') as f:
-    config = yaml.safe_load(f)
-
-# AI Configuration
-AI_PROVIDER = config['ai']['provider']
-AI_MODEL = config['ai']['model']
-AI_TEMPERATURE = config['ai']['temperature']
-AI_MAX_TOKENS = config['ai']['max_tokens']
-
-# Get API key based on provider
-if AI_PROVIDER == 'openai':
-    AI_API_KEY = os.getenv(config['ai']['openai']['api_key_env'])
-elif AI_PROVIDER == 'anthropic':
-    AI_API_KEY = os.getenv(config['ai']['anthropic']['api_key_env'])
-elif AI_PROVIDER == 'local':
-    AI_API_KEY = None  # Local models don't need API keys
-    AI_BASE_URL = config['ai']['local']['base_url']
-else:
-    raise ValueError(f"Unsupported AI provider: {AI_PROVIDER}")
-
-# Scraping Configuration
-USER_AGENT = config['scraping']['user_agent']
-REQUEST_DELAY = config['scraping']['request_delay']
-REQUEST_TIMEOUT = config['scraping']['request_timeout']
-MAX_RETRIES = config['scraping']['max_retries']
-
-# Processing Configuration
-DESCRIPTION_LENGTH = config['processing']['description_length']
-MAX_TAGS = config['processing']['max_tags']
-BATCH_SIZE = config['processing']['batch_size']
-EXTRACT_PEOPLE = config['processing']['extract_people']
-EXTRACT_AUTHOR = config['processing']['extract_author']
-EXTRACT_PUBLISHER = config['processing']['extract_publisher']
-
-# Output Configuration
-OUTPUT_FORMAT = config['output']['format']
-CSV_CONFIG = config['output']['csv_format']
-TSV_CONFIG = config['output']['tsv_format']
-RESUME_PROCESSING = config['output']['resume_processing']
\ No newline at end of file
+from typing import Any, Dict, List
+
+CONFIG_PATH = Path(__file__).parent / 'config.yaml'
+
+AI_PROVIDERS = ('openai', 'anthropic', 'local')
+FETCH_PREFLIGHTS = ('none', 'head', 'range')
+HTML_PARSERS = ('beautifulsoup', 'lxml', 'selectolax')
+CHECKPOINT_FSYNC_POLICIES = ('always', 'batch', 'never')
+CONDENSE_METHODS = ('textrank', 'tfidf', 'head')
+OUTPUT_FORMATS = ('csv', 'tsv', 'json')
+
+_settings = None
+
+
+class ConfigError(ValueError):
+    """config.yaml is missing a setting or has an invalid value."""
+
+
+def _validate(config: Dict[str, Any]) -> List[str]:
+    """Problems with the loaded config.yaml, as messages."""
+    problems = []
+    for section in ('ai', 'scraping', 'processing', 'output'):
+        if not isinstance(config.get(section), dict):
+            problems.append(f"missing section '{section}'")
+    if problems:
+        return problems
+
+    ai, scraping, processing, output = config['ai'], config['scraping'], config['processing'], config['output']
+    choices = [
+        ('ai.provider', ai.get('provider'), AI_PROVIDERS),
+        ('scraping.preflight', scraping.get('preflight', 'none'), FETCH_PREFLIGHTS),
+        ('scraping.parser', scraping.get('parser', 'beautifulsoup'), HTML_PARSERS),
+        ('processing.checkpoint_fsync', processing.get('checkpoint_fsync', 'batch'), CHECKPOINT_FSYNC_POLICIES),
+        ('processing.condense.method', processing.get('condense', {}).get('method', 'textrank'), CONDENSE_METHODS),
+        ('output.format', output.get('format'), OUTPUT_FORMATS),
+    ]
+    for name, value, allowed in choices:
+        if value not in allowed:
+            problems.append(f"{name} is {value!r}, expected one of {', '.join(allowed)}")
+
+    required = [('ai', ai, ('model', 'temperature', 'max_tokens')),
+                ('scraping', scraping, ('user_agent', 'request_delay', 'request_timeout', 'max_retries')),
+                ('processing', processing, ('description_length', 'max_tags', 'batch_size', 'extract_people',
+                                            'extract_author', 'extract_publisher')),
+                ('output', output, ('csv_format', 'tsv_format', 'resume_processing'))]
+    for section, values, keys in required:
+        problems += [f"missing setting '{section}.{key}'" for key in keys if key not in values]
+
+    positive = [('processing.batch_size', processing.get('batch_size', 1)),
+                ('processing.ai_batch_size', processing.get('ai_batch_size', 1)),
+                ('processing.stream_chunk_size', processing.get('stream_chunk_size', 1000)),
+                ('scraping.concurrency', scraping.get('concurrency', 1)),
+                ('scraping.max_bytes', scraping.get('max_bytes', 1)),
+                ('ai.concurrency', ai.get('concurrency', 1)),
+                ('ai.max_tokens', ai.get('max_tokens', 1))]
+    for name, value in positive:
+        if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+            problems.append(f"{name} must be a positive integer, got {value!r}")
+    for name, value in [('scraping.parse_workers', scraping.get('parse_workers', 0)),
+                        ('scraping.request_delay', scraping.get('request_delay', 0))]:
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value < 0:
+            problems.append(f"{name} must not be negative, got {value!r}")
+
+    threshold = processing.get('near_duplicates', {}).get('threshold', 0.8)
+    if not isinstance(threshold, (int, float)) or isinstance(threshold, bool) or not 0 < threshold <= 1:
+        problems.append(f"processing.near_duplicates.threshold must be between 0 and 1, got {threshold!r}")
+
+    if ai.get('provider') in AI_PROVIDERS and not isinstance(ai.get(ai['provider']), dict):
+        problems.append(f"missing section 'ai.{ai['provider']}'")
+    elif ai.get('provider') == 'local' and 'base_url' not in ai['local']:
+        problems.append("missing setting 'ai.local.base_url'")
+    return problems
+
+
+def load(path: Path = CONFIG_PATH) -> Dict[str, Any]:
+    """Read and validate config.yaml and .env; returns the settings by name."""
+    import yaml
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    try:
+        with open(path, 'r') as f:
+            config = yaml.safe_load(f)
+    except (OSError, yaml.YAMLError) as e:
+        raise ConfigError(f"Cannot read {path}: {e}") from e
+
+    problems = _validate(config) if isinstance(config, dict) else ['not a mapping of sections']
+    if problems:
+        raise ConfigError(f"Invalid {path}:\n  " + '\n  '.join(problems))
+
+    ai, scraping, processing, output = config['ai'], config['scraping'], config['processing'], config['output']
+    provider = ai['provider']
+    settings = {
+        'config': config,
+
+        # AI Configuration
+        'AI_PROVIDER': provider,
+        'AI_MODEL': ai['model'],
+        'AI_TEMPERATURE': ai['temperature'],
+        'AI_MAX_TOKENS': ai['max_tokens'],
+        'AI_CACHE_CONFIG': ai.get('cache', {'enabled': False}),
+        'AI_CONCURRENCY': ai.get('concurrency', 1),
+        'AI_MAX_RETRIES': ai.get('max_retries', 3),
+        'AI_BATCH_API_CONFIG': ai.get('batch_api', {}),
+        'AI_STRUCTURED_OUTPUT': ai.get('structured_output', True),
+        'AI_REASKS': ai.get('reasks', 1),
+        # Local models don't need API keys
+        'AI_API_KEY': os.getenv(ai[provider]['api_key_env']) if provider != 'local' else None,
+        'AI_RATE_LIMITS': ai[provider].get('rate_limits', {}),
+        # Settings of every provider, for model cascade tiers on a different provider than AI_PROVIDER
+        'AI_PROVIDER_SETTINGS': {name: ai.get(name, {}) for name in AI_PROVIDERS},
+        'AI_CASCADE_CONFIG': ai.get('cascade', {'enabled': False}),
+
+        # Scraping Configuration
+        'USER_AGENT': scraping['user_agent'],
+        'REQUEST_DELAY': scraping['request_delay'],
+        'REQUEST_TIMEOUT': scraping['request_timeout'],
+        'MAX_RETRIES': scraping['max_retries'],
+        'CONCURRENCY': scraping.get('concurrency', 1),
+        'CONTENT_CACHE_CONFIG': scraping.get('cache', {'enabled': False}),
+        'NEGATIVE_CACHE_CONFIG': scraping.get('negative_cache', {'enabled': False}),
+        'HTML_PARSER': scraping.get('parser', 'beautifulsoup'),
+        'MAX_PAGE_BYTES': int(scraping.get('max_bytes', 2 * 1024 * 1024)),
+        'ALLOWED_CONTENT_TYPES': [t.lower() for t in scraping.get('allowed_content_types',
+                                                                  ['text/html', 'application/xhtml+xml'])],
+        'FETCH_PREFLIGHT': scraping.get('preflight', 'none'),
+        'PARSE_WORKERS': scraping.get('parse_workers', 0),
+        'TRANSPORT_CONFIG': scraping.get('transport', {}),
+
+        # Processing Configuration
+        'DESCRIPTION_LENGTH': processing['description_length'],
+        'MAX_TAGS': processing['max_tags'],
+        'BATCH_SIZE': processing['batch_size'],
+        'AI_BATCH_SIZE': processing.get('ai_batch_size', 1),
+        'CHECKPOINT_FSYNC': processing.get('checkpoint_fsync', 'batch'),
+        'STREAM_CHUNK_SIZE': processing.get('stream_chunk_size', 1000),
+        'CONDENSE_CONFIG': processing.get('condense', {}),
+        'NEAR_DUPLICATE_CONFIG': processing.get('near_duplicates', {'enabled': False}),
+        'EXTRACT_PEOPLE': processing['extract_people'],
+        'EXTRACT_AUTHOR': processing['extract_author'],
+        'EXTRACT_PUBLISHER': processing['extract_publisher'],
+
+        # Output Configuration
+        'OUTPUT_FORMAT': output['format'],
+        'CSV_CONFIG': output['csv_format'],
+        'TSV_CONFIG': output['tsv_format'],
+        'RESUME_PROCESSING': output['resume_processing'],
+        'RUN_METRICS': output.get('metrics', True),
+    }
+    if provider == 'local':
+        settings['AI_BASE_URL'] = ai['local']['base_url']
+    return settings
+
+
+def settings() -> Dict[str, Any]:
+    """The settings, loaded on the first call."""
+    global _settings
+    if _settings is None:
+        _settings = load()
+    return _settings
+
+
+def __getattr__(name: str) -> Any:
+    # Called for names not defined above, i.e. the settings (PEP 562)
+    if not name.startswith('__'):
+        values = settings()
+        if name in values:
+            return values[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(settings()))
@@ -2,25 +2,115 @@
 """
 Bookmark Enrichment Tool
 Processes CSV bookmark exports and enriches them with AI-generated summaries and tags.
+
+    python main.py pocket-bookmarks.csv
+    python main.py pocket-bookmarks.csv --shard 1/4  # one of 4 workers, see merge
+    python main.py merge pocket-bookmarks.csv --shards 4
 """
 
 import sys
 import argparse
 from pathlib import Path
 
-from src.bookmark_processor import BookmarkProcessor
+from config import ConfigError
+from src.shards import parse_shard, shard_path
 from src.utils import setup_logging
 
+def shard_spec(value: str):
+    """argparse type for --shard i/N."""
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def default_output_path(input_path: Path, output_format: str) -> Path:
+    extension = '.tsv' if output_format == 'tsv' else '.csv'
+    return input_path.parent / f"{input_path.stem}_enriched{extension}"
+
+def load_processor():
+    """
+    Import the processor module, reporting an invalid config.yaml.
+    
+    Imported only when needed: pandas, the HTML parsers and their dependencies
+    take most of the startup time, which --help and invalid arguments shouldn't pay.
+    """
+    try:
+        from src.bookmark_processor import BookmarkProcessor
+    except ConfigError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    return BookmarkProcessor
+
+def merge(argv):
+    """The merge subcommand: combine the outputs of a sharded run."""
+    parser = argparse.ArgumentParser(prog='main.py merge',
+                                     description='Combine the outputs of a sharded run (--shard i/N) in the input row order')
+    parser.add_argument('input_file', help='Input CSV file the shards were run on')
+    parser.add_argument('shard_outputs', nargs='*',
+                        help='Shard outputs in shard order 1..N (default: the outputs of --shards N shards next to --output)')
+    parser.add_argument('--shards', type=int, metavar='N', help='Number of shards, when their outputs have the default names')
+    parser.add_argument('--output', '-o', help='Merged output file path (default: input_file_enriched.csv/tsv)')
+    parser.add_argument('--format', '-f', choices=['csv', 'tsv'], default='csv', help='Format of the shard outputs and the merged output (default: csv)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose logging')
+    
+    args = parser.parse_args(argv)
+    
+    if not args.shard_outputs and not args.shards:
+        parser.error('give the shard outputs or --shards N')
+    if args.shards is not None and args.shards < 1:
+        parser.error('--shards must be at least 1')
+    
+    setup_logging(verbose=args.verbose)
+    
+    input_path = Path(args.input_file)
+    output_path = Path(args.output) if args.output else default_output_path(input_path, args.format)
+    shard_outputs = [Path(path) for path in args.shard_outputs] or \
+        [shard_path(output_path, (index, args.shards)) for index in range(1, args.shards + 1)]
+    
+    missing = [str(path) for path in [input_path, *shard_outputs] if not path.exists()]
+    if missing:
+        print(f"Error: not found: {', '.join(missing)}")
+        sys.exit(1)
+    
+    BookmarkProcessor = load_processor()
+    try:
+        BookmarkProcessor.merge_shards(input_path, shard_outputs, output_path, output_format=args.format)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    print(f"Merged {len(shard_outputs)} shards into: {output_path}")
+
 def main():
-    parser = argparse.ArgumentParser(description='Enrich bookmarks with AI-generated summaries and tags')
+    if len(sys.argv) > 1 and sys.argv[1] == 'merge':
+        return merge(sys.argv[2:])
+    
+    parser = argparse.ArgumentParser(description='Enrich bookmarks with AI-generated summaries and tags',
+                                     epilog='Run "main.py merge --help" for combining the outputs of a sharded run')
     parser.add_argument('input_file', help='Input CSV file path')
     parser.add_argument('--output', '-o', help='Output file path (default: input_file_enriched.csv/tsv)')
     parser.add_argument('--format', '-f', choices=['csv', 'tsv'], default='csv', help='Output format: csv or tsv (default: csv)')
-    parser.add_argument('--resume', '-r', action='store_true', help='Resume from previous run')
+    parser.add_argument('--resume', '-r', action='store_true', help='Resume from the checkpoint journal of a previous run')
+    parser.add_argument('--concurrency', '-c', type=int, metavar='N', help='Number of concurrent fetch workers (default: scraping.concurrency from config.yaml)')
+    parser.add_argument('--parse-workers', type=int, metavar='N',
+                        help='Parse HTML on N worker processes, 0 to parse on the fetch threads (default: scraping.parse_workers from config.yaml)')
+    parser.add_argument('--batch-api', action='store_true',
+                        help='Send all prompts through the provider batch API (openai/anthropic) and poll for the results')
+    parser.add_argument('--stream', action='store_true',
+                        help='Read the input and write the output in chunks (processing.stream_chunk_size) to bound memory on very large exports')
+    parser.add_argument('--invalidate-ai-cache', nargs='?', const='', metavar='MODEL',
+                        help='Drop cached AI responses for MODEL (default: the configured model, "all" for every model) before processing')
+    parser.add_argument('--shard', type=shard_spec, metavar='I/N',
+                        help='Process only shard I of N, chosen by a hash of the canonical URL; the output gets a _shardIofN suffix')
     parser.add_argument('--verbose', '-v', action='store_true', help='Verbose logging')
     
     args = parser.parse_args()
     
+    if args.concurrency is not None and args.concurrency < 1:
+        parser.error('--concurrency must be at least 1')
+    if args.parse_workers is not None and args.parse_workers < 0:
+        parser.error('--parse-workers must not be negative')
+    
     # Setup logging
     setup_logging(verbose=args.verbose)
     
@@ -31,15 +121,22 @@ def main():
         sys.exit(1)
     
     # Determine output path
-    if args.output:
-        output_path = Path(args.output)
-    else:
-        extension = '.tsv' if args.format == 'tsv' else '.csv'
-        output_path = input_path.parent / f"{input_path.stem}_enriched{extension}"
+    output_path = Path(args.output) if args.output else default_output_path(input_path, args.format)
+    if args.shard:
+        output_path = shard_path(output_path, args.shard)
+    
+    BookmarkProcessor = load_processor()
     
     # Process bookmarks
-    processor = BookmarkProcessor()
-    processor.process_file(input_path, output_path, output_format=args.format, resume=args.resume)
+    with BookmarkProcessor(concurrency=args.concurrency, parse_workers=args.parse_workers) as processor:
+        response_cache = processor.ai_processor.response_cache
+        if args.invalidate_ai_cache is not None and response_cache:
+            model = None if args.invalidate_ai_cache == 'all' else (args.invalidate_ai_cache or processor.ai_processor.model)
+            removed = response_cache.invalidate(model=model)
+            print(f"Removed {removed} cached AI responses")
+        
+        processor.process_file(input_path, output_path, output_format=args.format, resume=args.resume,
+                               batch_api=args.batch_api, stream=args.stream, shard=args.shard)
     
     print(f"Processing complete. Enriched bookmarks saved to: {output_path}")
 
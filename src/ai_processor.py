@@ -1,47 +1,192 @@
 import logging
+import os
 import re
-from typing import Dict, List, Optional
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
 import json
 
 from config import (
     AI_PROVIDER, AI_MODEL, AI_API_KEY, AI_TEMPERATURE, AI_MAX_TOKENS,
-    DESCRIPTION_LENGTH
+    DESCRIPTION_LENGTH, AI_CACHE_CONFIG, AI_BATCH_SIZE, AI_CONCURRENCY, AI_MAX_RETRIES,
+    AI_BATCH_API_CONFIG, AI_STRUCTURED_OUTPUT, AI_REASKS, CONDENSE_CONFIG, AI_PROVIDER_SETTINGS, AI_CASCADE_CONFIG
 )
+from .ai_schema import RESULT_SCHEMA, BATCH_RESULT_SCHEMA, AIResult, parse_json, validate_result
+from .batch_api import BatchAPISubmitter
+from .content_condenser import ContentCondenser
+from .rate_limiter import TokenBucket
+from .response_cache import ResponseCache
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the prompt template or system message changes so cached responses are not reused
+PROMPT_VERSION = '3'
+
+SYSTEM_PROMPT = "You are a helpful assistant that summarizes web content and extracts relevant tags, with special attention to people mentioned."
+
+PROMPT_GUIDELINES = """**Important Guidelines:**
+- Pay special attention to people mentioned in the content. Include person names as tags when they are central to the content.
+- In the description, focus on the CONTENT and KEY INSIGHTS only
+- Do NOT mention the author name, title, or publication in the description
+- Do NOT repeat information that will be captured separately in author/title fields
+- Focus on what the content discusses, argues, or reveals
+- Use a NEUTRAL, OBJECTIVE tone - avoid promotional language, superlatives, or subjective opinions
+- Present information factually without editorial commentary"""
+
+# Follow-up sent with the validation errors when a response does not match the result schema
+REASK_PROMPT = """Your previous response could not be used: {errors}.
+Please answer again with only the corrected JSON object containing "description", "tags" and "author"."""
+
+# Anthropic structured output: the model is made to call this tool with the result as its input
+RESULT_TOOL = 'record_enrichment'
+
+# Descriptions of results that carry no summary (parse failure, request failure)
+PLACEHOLDER_PREFIXES = ("Content summary not available", "Content from: ")
+
+BATCH_API_PROVIDERS = ('openai', 'anthropic')
+
 class AIProcessor:
-    """Handles AI-powered content summarization and tagging with configurable providers."""
+    """
+    Handles AI-powered content summarization and tagging with configurable providers.
+    
+    With `ai.cascade` enabled, articles go to the cascade's cheaper models first and
+    are escalated tier by tier to the configured provider/model only when a result
+    fails the escalation checks (see _escalation_reasons). Each tier is an
+    AIProcessor of its own sharing this one's counters, response cache and rate
+    limits.
+    """
     
-    def __init__(self):
-        self.provider = AI_PROVIDER
-        self.model = AI_MODEL
+    def __init__(self, provider: Optional[str] = None, model: Optional[str] = None,
+                 shared: Optional['AIProcessor'] = None):
+        self.provider = provider or AI_PROVIDER
+        self.model = model or AI_MODEL
+        self.name = f"{self.provider}/{self.model}"
         self.temperature = AI_TEMPERATURE
         self.max_tokens = AI_MAX_TOKENS
+        self.batch_size = max(1, AI_BATCH_SIZE)
+        self.concurrency = max(1, AI_CONCURRENCY)
+        self.max_retries = AI_MAX_RETRIES
+        self.structured_output = AI_STRUCTURED_OUTPUT
+        self.reasks = max(0, AI_REASKS)
         
-        if self.provider == 'openai':
-            import openai
-            if not AI_API_KEY or AI_API_KEY == 'sk-test-key-placeholder':
-                logger.warning("OpenAI API key not configured - using mock responses for testing")
-                self.client = None  # Will use mock responses
-            else:
-                self.client = openai.OpenAI(api_key=AI_API_KEY)
-            
-        elif self.provider == 'anthropic':
+        settings = AI_PROVIDER_SETTINGS.get(self.provider, {})
+        api_key = AI_API_KEY if self.provider == AI_PROVIDER else os.getenv(settings.get('api_key_env', ''))
+        
+        if self.provider not in ('openai', 'anthropic', 'local'):
+            raise ValueError(f"Unsupported AI provider: {self.provider}")
+        if self.provider == 'anthropic' and not api_key:
+            raise ValueError("Anthropic API key not configured")
+        
+        # The SDK client is created on first use (see client): importing openai or
+        # anthropic takes about a second, which runs answered from the cache skip
+        self.mock = self.provider == 'openai' and (not api_key or api_key == 'sk-test-key-placeholder')
+        if self.mock:
+            logger.warning("OpenAI API key not configured - using mock responses for testing")
+        self._api_key = api_key
+        self._base_url = settings.get('base_url')
+        self._client = None
+        self._client_lock = threading.Lock()
+        
+        # Tokens used by this model, for the cascade's cost report
+        self.usage = {'input_tokens': 0, 'output_tokens': 0}
+        
+        if shared is not None:
+            # A cascade tier: articles arrive already condensed
+            self.response_cache = shared.response_cache
+            self.request_bucket, self.token_bucket = shared._rate_buckets(self.provider)
+            self.condenser = None
+            self.tiers = []
+            self.stats = shared.stats
+            self._stats_lock = shared._stats_lock
+            self._local = shared._local
+            return
+        
+        self.response_cache = None
+        if AI_CACHE_CONFIG.get('enabled'):
+            self.response_cache = ResponseCache(Path(AI_CACHE_CONFIG.get('path', '.cache/ai_responses.sqlite3')))
+            pruned = self.response_cache.prune(PROMPT_VERSION)
+            if pruned:
+                logger.info(f"Dropped {pruned} cached AI responses from older prompt versions")
+        
+        # Requests/tokens per minute throttles per provider; retries are handled in _complete
+        self._buckets = {}
+        self.request_bucket, self.token_bucket = self._rate_buckets(self.provider)
+        
+        self.condenser = ContentCondenser(CONDENSE_CONFIG.get('token_budget', 500),
+                                          CONDENSE_CONFIG.get('method', 'textrank'), self.model)
+        
+        self.stats = {'requests': 0, 'batch_retries': 0, 'cache_hits': 0, 'cache_misses': 0,
+                      'rate_limited': 0, 'retries': 0, 'batch_api_items': 0, 'batch_api_failed': 0,
+                      'articles': 0, 'content_tokens': 0, 'content_tokens_sent': 0,
+                      'validated': 0, 'invalid': 0, 'reasks': 0, 'reasks_fixed': 0}
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+        
+        # Model cascade: cheaper tiers first, this provider/model last
+        self.tiers = []
+        self.escalation_checks = AI_CASCADE_CONFIG.get('escalate_on', {})
+        self.model_costs = AI_CASCADE_CONFIG.get('costs', {})
+        self.tier_stats: Dict[str, Dict[str, float]] = {}
+        self.escalation_reasons: Dict[str, int] = {}
+        if AI_CASCADE_CONFIG.get('enabled'):
+            self.tiers = [AIProcessor(tier['provider'], tier['model'], shared=self)
+                          for tier in AI_CASCADE_CONFIG.get('tiers', [])]
+            self.tiers.append(AIProcessor(self.provider, self.model, shared=self))
+            self.tier_stats = {tier.name: {'articles': 0, 'escalated': 0, 'seconds': 0.0} for tier in self.tiers}
+            logger.info(f"Model cascade: {' -> '.join(tier.name for tier in self.tiers)}")
+    
+    @property
+    def client(self):
+        """The provider SDK client (None for mock responses), created on first use."""
+        if self._client is None and not self.mock:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
+        self.mock = client is None
+    
+    def _create_client(self):
+        if self.provider == 'anthropic':
             import anthropic
-            if not AI_API_KEY:
-                raise ValueError("Anthropic API key not configured")
-            self.client = anthropic.Anthropic(api_key=AI_API_KEY)
-            
-        elif self.provider == 'local':
-            import openai
-            from config import AI_BASE_URL
-            self.client = openai.OpenAI(
-                base_url=AI_BASE_URL,
-                api_key="not-needed"  # Local models don't need API keys
+            return anthropic.Anthropic(api_key=self._api_key, max_retries=0)
+        
+        import openai
+        if self.provider == 'local':
+            return openai.OpenAI(
+                base_url=self._base_url,
+                api_key="not-needed",  # Local models don't need API keys
+                max_retries=0
             )
-        else:
-            raise ValueError(f"Unsupported AI provider: {self.provider}")
+        return openai.OpenAI(api_key=self._api_key, max_retries=0)
+    
+    def _rate_buckets(self, provider: str):
+        """Request and token buckets of a provider, shared by every tier on that provider."""
+        if provider not in self._buckets:
+            limits = AI_PROVIDER_SETTINGS.get(provider, {}).get('rate_limits', {})
+            self._buckets[provider] = (
+                TokenBucket(limits['requests_per_minute']) if limits.get('requests_per_minute') else None,
+                TokenBucket(limits['tokens_per_minute']) if limits.get('tokens_per_minute') else None
+            )
+        return self._buckets[provider]
+    
+    @contextmanager
+    def traced(self) -> Iterator[Dict[str, any]]:
+        """
+        Collect what the calls in the block do on this thread: the AI counters they
+        add (requests, retries, cache hits, content tokens, re-asks), the input and
+        output tokens used and, for a single article, the cascade tier that answered.
+        """
+        trace = self._local.trace = {}
+        try:
+            yield trace
+        finally:
+            self._local.trace = None
     
     def process_content(self, title: str, content: str, authors: List[str] = None, publisher: str = '', existing_tags: str = '') -> Dict[str, any]:
         """
@@ -50,59 +195,533 @@ class AIProcessor:
         Returns:
             Dict with 'description', 'tags', and 'author' keys
         """
+        if self.tiers:
+            item = {'title': title, 'content': self._condense(title, content), 'authors': authors,
+                    'publisher': publisher, 'existing_tags': existing_tags}
+            return self._run_cascade([item], 'process_content')[0]
+        
         try:
-            prompt = self._build_prompt(title, content, authors or [], publisher, existing_tags)
+            prompt = self._build_prompt(title, self._condense(title, content), authors or [], publisher, existing_tags)
             
             # Mock response for testing when no API key is configured
-            if self.client is None:
+            if self.mock:
                 result = self._generate_mock_response(title, content)
                 return self._parse_ai_response(result)
             
-            if self.provider in ['openai', 'local']:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[
-                        {"role": "system", "content": "You are a helpful assistant that summarizes web content and extracts relevant tags, with special attention to people mentioned."},
-                        {"role": "user", "content": prompt}
-                    ],
-                    temperature=self.temperature,
-                    max_tokens=self.max_tokens
-                )
-                result = response.choices[0].message.content.strip()
-                
-            elif self.provider == 'anthropic':
-                response = self.client.messages.create(
-                    model=self.model,
-                    max_tokens=self.max_tokens,
-                    temperature=self.temperature,
-                    system="You are a helpful assistant that summarizes web content and extracts relevant tags, with special attention to people mentioned.",
-                    messages=[
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                result = response.content[0].text.strip()
-            
-            return self._parse_ai_response(result)
+            cache_key, cached = self._lookup_cache(prompt)
+            if cached is not None:
+                return cached
+            
+            return self._request(prompt, cache_key)
             
         except Exception as e:
             logger.error(f"AI processing failed: {e}")
-            return {
-                'description': f"Content from: {title}",
-                'tags': [],
-                'author': ', '.join(authors) if authors else ''
+            return self._fallback_result(title, authors)
+    
+    def process_batch(self, items: List[Dict[str, any]]) -> List[Dict[str, any]]:
+        """
+        Generate summaries and tags for several articles, packing up to AI_BATCH_SIZE
+        articles into each request.
+        
+        Items are dicts of process_content keyword arguments. Cached articles are
+        answered from the cache; articles missing or malformed in a batch response
+        are retried individually.
+        
+        Returns:
+            One result dict per item, in input order
+        """
+        if self.tiers:
+            return self._run_cascade(self._condensed(items), 'process_batch')
+        if self.mock:
+            return [self.process_content(**item) for item in items]
+        
+        items = list(items)
+        results = [None] * len(items)
+        pending = []  # (item index, single-article prompt, cache key)
+        
+        for i, item in enumerate(items):
+            try:
+                items[i] = item = dict(item, content=self._condense(item['title'], item['content']))
+                prompt = self._build_prompt(item['title'], item['content'], item.get('authors') or [],
+                                            item.get('publisher', ''), item.get('existing_tags', ''))
+                cache_key, cached = self._lookup_cache(prompt)
+            except Exception as e:
+                logger.error(f"AI processing failed: {e}")
+                results[i] = self._fallback_result(item.get('title', ''), item.get('authors'))
+                continue
+            
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.append((i, prompt, cache_key))
+        
+        for start in range(0, len(pending), self.batch_size):
+            chunk = pending[start:start + self.batch_size]
+            ids = [str(n) for n in range(1, len(chunk) + 1)]
+            
+            parsed = {}
+            try:
+                batch_prompt = self._build_batch_prompt([items[i] for i, _, _ in chunk])
+                raw = self._complete(batch_prompt, max_tokens=self.max_tokens * len(chunk), schema=BATCH_RESULT_SCHEMA)
+                parsed = self._parse_batch_response(raw, ids)
+            except Exception as e:
+                logger.error(f"Batch AI processing failed: {e}")
+            
+            for item_id, (i, prompt, cache_key) in zip(ids, chunk):
+                if item_id in parsed:
+                    results[i] = parsed[item_id]
+                    self._store_cache(cache_key, json.dumps(parsed[item_id]), parsed[item_id])
+                    continue
+                
+                # Retry only the articles the batch response did not answer properly
+                self._record_stats(batch_retries=1)
+                try:
+                    results[i] = self._request(prompt, cache_key)
+                except Exception as e:
+                    logger.error(f"AI processing failed: {e}")
+                    results[i] = self._fallback_result(items[i].get('title', ''), items[i].get('authors'))
+        
+        return results
+    
+    def process_via_batch_api(self, items: List[Dict[str, any]]) -> List[Dict[str, any]]:
+        """
+        Generate summaries and tags for many articles through the provider's batch API.
+        
+        Cached articles are answered from the cache; the rest are written to one
+        batch file, submitted, polled until the batch finishes and parsed with
+        _parse_ai_response. Articles without a usable batch result get the fallback
+        result.
+        
+        Returns:
+            One result dict per item, in input order
+        """
+        if self.tiers:
+            return self._run_cascade(self._condensed(items), 'process_via_batch_api')
+        if self.mock:
+            return [self.process_content(**item) for item in items]
+        
+        results = [None] * len(items)
+        pending = {}  # custom_id -> (item index, prompt, cache key)
+        
+        for i, item in enumerate(items):
+            content = self._condense(item['title'], item['content'])
+            prompt = self._build_prompt(item['title'], content, item.get('authors') or [],
+                                        item.get('publisher', ''), item.get('existing_tags', ''))
+            cache_key, cached = self._lookup_cache(prompt)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending[f"bookmark-{i}"] = (i, prompt, cache_key)
+        
+        if pending:
+            submitter = BatchAPISubmitter(self, Path(AI_BATCH_API_CONFIG.get('work_dir', '.cache/batches')),
+                                          poll_interval=AI_BATCH_API_CONFIG.get('poll_interval', 60),
+                                          timeout=AI_BATCH_API_CONFIG.get('timeout_hours', 24) * 3600)
+            responses = submitter.run({custom_id: prompt for custom_id, (_, prompt, _) in pending.items()})
+            self._record_stats(batch_api_items=len(pending))
+            
+            for custom_id, (i, prompt, cache_key) in pending.items():
+                text = responses.get(custom_id)
+                if text is None:
+                    self._record_stats(batch_api_failed=1)
+                    results[i] = self._fallback_result(items[i].get('title', ''), items[i].get('authors'))
+                    continue
+                
+                try:
+                    results[i], text = self._validated(prompt, text)
+                except Exception as e:
+                    logger.error(f"AI processing failed: {e}")
+                    results[i] = self._parse_ai_response(text)
+                self._store_cache(cache_key, text, results[i])
+        
+        return results
+    
+    def _run_cascade(self, items: List[Dict[str, any]], method: str) -> List[Dict[str, any]]:
+        """
+        Send articles down the model cascade with `method` of each tier.
+        
+        Every tier gets the articles the tiers before it escalated; very short
+        articles skip straight to the last tier. Results of the last tier are kept
+        whatever their quality.
+        
+        Returns:
+            One result dict per item, in input order
+        """
+        results = [None] * len(items)
+        last = len(self.tiers) - 1
+        min_words = self.escalation_checks.get('min_input_words', 0)
+        short = [i for i, item in enumerate(items) if len((item.get('content') or '').split()) < min_words]
+        pending = sorted(set(range(len(items))) - set(short))
+        if short and last:
+            self._record_escalation(['short_input'] * len(short))
+        
+        for level, tier in enumerate(self.tiers):
+            if level == last:
+                pending = sorted(pending + short)
+            if not pending:
+                continue
+            
+            start = time.perf_counter()
+            tier_results = self._call_tier(tier, method, [items[i] for i in pending])
+            elapsed = time.perf_counter() - start
+            
+            escalated, reasons = [], []
+            for i, result in zip(pending, tier_results):
+                failed = self._escalation_reasons(result, items[i]) if level < last else []
+                if failed:
+                    escalated.append(i)
+                    reasons += failed
+                else:
+                    results[i] = result
+            
+            with self._stats_lock:
+                stats = self.tier_stats[tier.name]
+                stats['articles'] += len(pending)
+                stats['escalated'] += len(escalated)
+                stats['seconds'] += elapsed
+            self._record_escalation(reasons)
+            
+            trace = getattr(self._local, 'trace', None)
+            if trace is not None and len(items) == 1 and not escalated:
+                trace['tier'] = tier.name
+            pending = escalated
+        
+        return results
+    
+    @staticmethod
+    def _call_tier(tier: 'AIProcessor', method: str, items: List[Dict[str, any]]) -> List[Dict[str, any]]:
+        """Run a cascade tier; tiers without a batch API process batch API work with batched requests."""
+        if method == 'process_content':
+            return [tier.process_content(**item) for item in items]
+        if method == 'process_via_batch_api' and tier.provider not in BATCH_API_PROVIDERS:
+            return tier.process_batch(items)
+        return getattr(tier, method)(items)
+    
+    def _escalation_reasons(self, result: Dict[str, any], item: Dict[str, any]) -> List[str]:
+        """Why a cheaper tier's result is not good enough (empty if it is)."""
+        reasons = []
+        description = result.get('description') or ''
+        if description.startswith(PLACEHOLDER_PREFIXES):
+            return ['no_result']
+        
+        if self.escalation_checks.get('missing_author', True) and not result.get('author'):
+            reasons.append('missing_author')
+        if len(result.get('tags') or []) < self.escalation_checks.get('min_tags', 3):
+            reasons.append('too_few_tags')
+        
+        word_range = re.findall(r'\d+', DESCRIPTION_LENGTH)
+        if self.escalation_checks.get('description_length', True) and len(word_range) == 2:
+            slack = self.escalation_checks.get('length_tolerance', 0.25)
+            words = len(description.split())
+            if not int(word_range[0]) * (1 - slack) <= words <= int(word_range[1]) * (1 + slack):
+                reasons.append('description_length')
+        return reasons
+    
+    def _record_escalation(self, reasons: List[str]):
+        with self._stats_lock:
+            for reason in reasons:
+                self.escalation_reasons[reason] = self.escalation_reasons.get(reason, 0) + 1
+    
+    def tier_report(self) -> List[Dict[str, any]]:
+        """
+        Per-tier cascade figures for the run summary: articles, escalations,
+        average latency per article, tokens and cost (from `ai.cascade.costs`,
+        USD per million input/output tokens).
+        """
+        report = []
+        for tier in self.tiers:
+            stats = self.tier_stats[tier.name]
+            costs = self.model_costs.get(tier.model, {})
+            cost = (tier.usage['input_tokens'] * costs.get('input', 0)
+                    + tier.usage['output_tokens'] * costs.get('output', 0)) / 1e6
+            report.append({
+                'tier': tier.name,
+                'articles': stats['articles'],
+                'escalated': stats['escalated'],
+                'escalation_rate': stats['escalated'] / stats['articles'] if stats['articles'] else 0.0,
+                'latency': stats['seconds'] / stats['articles'] if stats['articles'] else 0.0,
+                'input_tokens': tier.usage['input_tokens'],
+                'output_tokens': tier.usage['output_tokens'],
+                'cost': cost
+            })
+        return report
+    
+    def escalation_rate(self) -> float:
+        """Share of articles the cascade did not finish on its first tier (short articles included)."""
+        if len(self.tiers) < 2:
+            return 0.0
+        total = self.tier_stats[self.tiers[0].name]['articles'] + self.escalation_reasons.get('short_input', 0)
+        return self.tier_stats[self.tiers[-1].name]['articles'] / total if total else 0.0
+    
+    def _condensed(self, items: List[Dict[str, any]]) -> List[Dict[str, any]]:
+        return [dict(item, content=self._condense(item['title'], item['content'])) for item in items]
+    
+    def _condense(self, title: str, content: str) -> str:
+        """Select the most informative part of an article for its prompt and count the tokens saved."""
+        if self.condenser is None:
+            return content
+        condensed = self.condenser.condense(title, content)
+        self._record_stats(articles=1, content_tokens=condensed.original_tokens, content_tokens_sent=condensed.tokens)
+        if condensed.tokens < condensed.original_tokens:
+            logger.debug(f"Condensed '{title}' from {condensed.original_tokens} to {condensed.tokens} tokens "
+                         f"({condensed.original_tokens - condensed.tokens} saved)")
+        return condensed.text
+    
+    def _lookup_cache(self, prompt: str):
+        """
+        Look a single-article prompt up in the response cache.
+        
+        Returns:
+            Tuple of (cache key or None, cached result or None)
+        """
+        if not self.response_cache:
+            return None, None
+        
+        cache_key = ResponseCache.make_key(self.provider, self.model, self.temperature,
+                                           self.max_tokens, PROMPT_VERSION, prompt)
+        cached = self.response_cache.get(cache_key)
+        if cached is not None:
+            self._record_stats(cache_hits=1)
+        else:
+            self._record_stats(cache_misses=1)
+        return cache_key, cached
+    
+    def _store_cache(self, cache_key: Optional[str], raw: str, parsed: Dict[str, any]):
+        """Cache a parsed result unless parsing fell back to the placeholder summary."""
+        if cache_key and parsed['description'] != "Content summary not available":
+            self.response_cache.put(cache_key, self.provider, self.model, PROMPT_VERSION, raw, parsed)
+    
+    def _request(self, prompt: str, cache_key: Optional[str]) -> Dict[str, any]:
+        """Send a single-article prompt to the provider and parse the response."""
+        parsed, raw = self._validated(prompt, self._complete(prompt))
+        self._store_cache(cache_key, raw, parsed)
+        return parsed
+    
+    def _validated(self, prompt: str, raw: str) -> Tuple[Dict[str, any], str]:
+        """
+        Validate the response to a single-article prompt.
+        
+        Invalid responses are counted, and the model is asked again (up to
+        `reasks` times) with its previous answer and the validation errors, so
+        only failed articles pay for another request. If that does not help, the
+        line-based fallback parser gets the last response.
+        
+        Returns:
+            Tuple of (result dict, raw response text the result was parsed from)
+        """
+        result, errors = self._check_response(raw)
+        self._record_stats(validated=1, invalid=1 if errors else 0)
+        
+        for _ in range(self.reasks):
+            if not errors:
+                break
+            logger.info(f"Invalid AI response ({'; '.join(errors)}); asking again")
+            self._record_stats(reasks=1)
+            try:
+                raw = self._complete(prompt, reask=(raw, errors))
+            except Exception as e:
+                logger.warning(f"AI re-ask failed: {e}")
+                break
+            result, errors = self._check_response(raw)
+            if not errors:
+                self._record_stats(reasks_fixed=1)
+        
+        if errors:
+            return self._parse_ai_response(raw), raw
+        return result.as_dict(), raw
+    
+    def _check_response(self, raw: str) -> Tuple[Optional[AIResult], List[str]]:
+        """Parse and validate a single-article response."""
+        data, error = parse_json(raw)
+        if error:
+            return None, [error]
+        return validate_result(data)
+    
+    def _complete(self, prompt: str, max_tokens: Optional[int] = None, schema: Dict[str, any] = RESULT_SCHEMA,
+                  reask: Optional[Tuple[str, List[str]]] = None) -> str:
+        """
+        Send a prompt to the configured provider and return the response text.
+        
+        Requests are throttled by the requests/tokens per minute buckets. Rate limit
+        (429), server and connection errors are retried up to max_retries times,
+        waiting for the Retry-After header when the provider sends one. Results are
+        requested in the provider's structured output mode for `schema`; a model
+        that rejects it is used without structured output for the rest of the run.
+        `reask` is a (previous response, validation errors) pair to follow up on.
+        """
+        max_tokens = max_tokens or self.max_tokens
+        
+        for attempt in range(self.max_retries + 1):
+            self._throttle(prompt, max_tokens)
+            try:
+                return self._send(prompt, max_tokens, schema, reask)
+            except Exception as e:
+                if self._structured_output_rejected(e):
+                    return self._complete(prompt, max_tokens, schema, reask)
+                
+                delay = self._retry_delay(e, attempt)
+                if delay is None or attempt == self.max_retries:
+                    raise
+                
+                self._record_stats(retries=1)
+                logger.warning(f"AI request failed ({e}); retrying in {delay:.1f}s")
+                if getattr(e, 'status_code', None) == 429:
+                    self._record_stats(rate_limited=1)
+                    # Hold back every worker, not just this one
+                    for bucket in (self.request_bucket, self.token_bucket):
+                        if bucket:
+                            bucket.pause(delay)
+                time.sleep(delay)
+    
+    def _structured_output_rejected(self, error: Exception) -> bool:
+        """Turn structured output off if the request failed because the model does not support it."""
+        if not self.structured_output or getattr(error, 'status_code', None) != 400:
+            return False
+        if not any(word in str(error) for word in ('response_format', 'json_schema', 'tool')):
+            return False
+        
+        logger.warning(f"{self.model} does not support structured output ({error}); continuing without it")
+        self.structured_output = False
+        return True
+    
+    def _throttle(self, prompt: str, max_tokens: int):
+        """Wait for the per-minute request and token budgets."""
+        if self.request_bucket:
+            self.request_bucket.acquire()
+        if self.token_bucket:
+            # Rough estimate: ~4 characters per prompt token plus the completion budget
+            self.token_bucket.acquire(len(SYSTEM_PROMPT + prompt) // 4 + max_tokens)
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying a failed request, or None if it should not be retried."""
+        status = getattr(error, 'status_code', None)
+        retryable = status == 429 or (status is not None and status >= 500) \
+            or type(error).__name__ in ('APIConnectionError', 'APITimeoutError')
+        if not retryable:
+            return None
+        
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        try:
+            return max(0.0, float(retry_after))
+        except (TypeError, ValueError):
+            return min(2 ** attempt, 60)
+    
+    def _send(self, prompt: str, max_tokens: int, schema: Dict[str, any] = RESULT_SCHEMA,
+              reask: Optional[Tuple[str, List[str]]] = None) -> str:
+        """Make one provider API call."""
+        self._record_stats(requests=1)
+        params = self._request_params(prompt, max_tokens, schema, reask)
+        
+        if self.provider in ['openai', 'local']:
+            response = self.client.chat.completions.create(**params)
+            usage = response.usage
+            self._record_usage(usage.prompt_tokens if usage else 0, usage.completion_tokens if usage else 0)
+            return (response.choices[0].message.content or '').strip()
+            
+        elif self.provider == 'anthropic':
+            response = self.client.messages.create(**params)
+            self._record_usage(response.usage.input_tokens, response.usage.output_tokens)
+            return self._message_text(response.content)
+        
+        raise ValueError(f"Unsupported AI provider: {self.provider}")
+    
+    def _request_params(self, prompt: str, max_tokens: Optional[int] = None, schema: Dict[str, any] = RESULT_SCHEMA,
+                        reask: Optional[Tuple[str, List[str]]] = None) -> Dict[str, any]:
+        """
+        Provider request body for a prompt (also used for batch API files).
+        
+        With structured output the result schema is attached in the provider's
+        native form: an OpenAI json_schema response format, a forced Anthropic tool
+        call, or JSON mode for local (Ollama) models.
+        """
+        max_tokens = max_tokens or self.max_tokens
+        
+        messages = [{"role": "user", "content": prompt}]
+        if reask:
+            previous, errors = reask
+            messages += [
+                {"role": "assistant", "content": previous or '(empty response)'},
+                {"role": "user", "content": REASK_PROMPT.format(errors='; '.join(errors))}
+            ]
+        
+        if self.provider in ['openai', 'local']:
+            params = {
+                'model': self.model,
+                'messages': [{"role": "system", "content": SYSTEM_PROMPT}] + messages,
+                'temperature': self.temperature,
+                'max_tokens': max_tokens
+            }
+            if self.structured_output and self.provider == 'openai':
+                params['response_format'] = {
+                    'type': 'json_schema',
+                    'json_schema': {'name': 'bookmark_enrichment', 'strict': True, 'schema': schema}
+                }
+            elif self.structured_output:
+                # Ollama's OpenAI-compatible endpoint maps JSON mode to format: "json"
+                params['response_format'] = {'type': 'json_object'}
+            return params
+            
+        elif self.provider == 'anthropic':
+            params = {
+                'model': self.model,
+                'max_tokens': max_tokens,
+                'temperature': self.temperature,
+                'system': SYSTEM_PROMPT,
+                'messages': messages
             }
+            if self.structured_output:
+                params['tools'] = [{
+                    'name': RESULT_TOOL,
+                    'description': "Record the summary, tags and author of the web content",
+                    'input_schema': schema
+                }]
+                params['tool_choice'] = {'type': 'tool', 'name': RESULT_TOOL}
+            return params
+        
+        raise ValueError(f"Unsupported AI provider: {self.provider}")
+    
+    @staticmethod
+    def _message_text(content) -> str:
+        """Response text of an Anthropic message; a forced tool call's input is returned as JSON."""
+        for block in content:
+            if block.type == 'tool_use':
+                return json.dumps(block.input)
+        return ''.join(block.text for block in content if block.type == 'text').strip()
+    
+    def _record_stats(self, **increments: int):
+        """Add to the per-run AI counters (safe to call from worker threads)."""
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+        self._record_trace(increments)
+    
+    def _record_usage(self, input_tokens: int, output_tokens: int):
+        usage = {'input_tokens': input_tokens or 0, 'output_tokens': output_tokens or 0}
+        with self._stats_lock:
+            for key, value in usage.items():
+                self.usage[key] += value
+        self._record_trace(usage)
+    
+    def _record_trace(self, increments: Dict[str, int]):
+        """Add to the trace of this thread, if one is active."""
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            for key, value in increments.items():
+                trace[key] = trace.get(key, 0) + value
+    
+    def _fallback_result(self, title: str, authors: Optional[List[str]]) -> Dict[str, any]:
+        """Result used when the AI request fails."""
+        return {
+            'description': f"Content from: {title}",
+            'tags': [],
+            'author': ', '.join(authors) if authors else ''
+        }
     
     def _build_prompt(self, title: str, content: str, authors: List[str], publisher: str, existing_tags: str) -> str:
         """Build the prompt for AI processing."""
         
-        # Truncate content if too long
-        max_content_length = 2000
-        if len(content) > max_content_length:
-            content = content[:max_content_length] + "..."
-        
-        existing_info = f"\nExisting tags: {existing_tags}" if existing_tags and existing_tags != 'NA' else ""
-        author_info = f"\nDetected authors: {', '.join(authors)}" if authors else ""
-        publisher_info = f"\nPublisher: {publisher}" if publisher else ""
+        details = self._format_article(title, content, authors, publisher, existing_tags)
         
         prompt = f"""
 Please analyze this web content and provide:
@@ -111,17 +730,9 @@ Please analyze this web content and provide:
 2. Relevant tags (1-4 words each, maximum 5 tags)
 3. The author of the content (if identifiable)
 
-**Important Guidelines:**
-- Pay special attention to people mentioned in the content. Include person names as tags when they are central to the content.
-- In the description, focus on the CONTENT and KEY INSIGHTS only
-- Do NOT mention the author name, title, or publication in the description
-- Do NOT repeat information that will be captured separately in author/title fields
-- Focus on what the content discusses, argues, or reveals
-- Use a NEUTRAL, OBJECTIVE tone - avoid promotional language, superlatives, or subjective opinions
-- Present information factually without editorial commentary
+{PROMPT_GUIDELINES}
 
-Title: {title}
-Content: {content}{existing_info}{author_info}{publisher_info}
+{details}
 
 Please respond in this exact JSON format:
 {{
@@ -132,34 +743,57 @@ Please respond in this exact JSON format:
 """
         return prompt
     
+    def _build_batch_prompt(self, items: List[Dict[str, any]]) -> str:
+        """Build a prompt that asks for several articles at once, identified by ids 1..K."""
+        
+        articles = "\n\n".join(
+            f"=== Item {n} ===\n" + self._format_article(item['title'], item['content'], item.get('authors') or [],
+                                                        item.get('publisher', ''), item.get('existing_tags', ''))
+            for n, item in enumerate(items, 1)
+        )
+        
+        prompt = f"""
+Please analyze each of the {len(items)} web content items below and provide for each item:
+
+1. A concise summary ({DESCRIPTION_LENGTH})
+2. Relevant tags (1-4 words each, maximum 5 tags)
+3. The author of the content (if identifiable)
+
+{PROMPT_GUIDELINES}
+- Treat every item independently; never mix information between items
+
+{articles}
+
+Please respond with a JSON object whose "items" array contains exactly one object per item, in this exact format:
+{{
+    "items": [
+        {{
+            "id": "1",
+            "description": "Your summary here focusing only on content insights and key points",
+            "tags": ["tag1", "tag2", "Person Name", "tag4"],
+            "author": "Author Name (or empty string if not identifiable)"
+        }}
+    ]
+}}
+"""
+        return prompt
+    
+    def _format_article(self, title: str, content: str, authors: List[str], publisher: str, existing_tags: str) -> str:
+        """Format the title, content and metadata of one article for a prompt."""
+        
+        existing_info = f"\nExisting tags: {existing_tags}" if existing_tags and existing_tags != 'NA' else ""
+        author_info = f"\nDetected authors: {', '.join(authors)}" if authors else ""
+        publisher_info = f"\nPublisher: {publisher}" if publisher else ""
+        
+        return f"Title: {title}\nContent: {content}{existing_info}{author_info}{publisher_info}"
+    
     def _parse_ai_response(self, response: str) -> Dict[str, any]:
         """Parse AI response into structured data."""
         try:
-            # Try to extract JSON from response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                json_str = json_match.group()
-                data = json.loads(json_str)
-                
-                # Validate structure
-                if 'description' in data and 'tags' in data:
-                    # Clean and validate tags
-                    tags = []
-                    for tag in data['tags']:
-                        if isinstance(tag, str) and len(tag.strip()) > 0:
-                            # Limit tag length to 4 words
-                            tag_words = tag.strip().split()
-                            if len(tag_words) <= 4:
-                                tags.append(' '.join(tag_words))
-                    
-                    # Extract author
-                    author = data.get('author', '').strip()
-                    
-                    return {
-                        'description': data['description'].strip(),
-                        'tags': tags[:5],  # Limit to 5 tags
-                        'author': author
-                    }
+            data, _ = parse_json(response)
+            result, _ = validate_result(data)
+            if result:
+                return result.as_dict()
             
             # Fallback parsing if JSON fails
             lines = response.strip().split('\n')
@@ -191,6 +825,37 @@ Please respond in this exact JSON format:
                 'author': ""
             }
     
+    def _parse_batch_response(self, response: str, ids: List[str]) -> Dict[str, Dict[str, any]]:
+        """
+        Demultiplex a batch response: {"items": [{id, description, tags, author}, ...]}
+        (a bare JSON array is accepted too).
+        
+        Returns:
+            Dict mapping item id to its parsed result; missing or malformed items are left out
+        """
+        results = {}
+        data, error = parse_json(response)
+        if isinstance(data, dict):
+            data = data.get('items')
+        if error or not isinstance(data, list):
+            logger.warning(f"Failed to parse batch AI response: {error or 'no items array'}")
+            data = []
+        
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            item_id = str(item.get('id', ''))
+            if item_id in ids and item_id not in results:
+                result, _ = validate_result(item)
+                if result:
+                    results[item_id] = result.as_dict()
+        
+        missing = len(ids) - len(results)
+        self._record_stats(validated=len(ids), invalid=missing)
+        if missing:
+            logger.warning(f"Batch AI response is missing or has malformed results for {missing} of {len(ids)} items")
+        return results
+    
     def _generate_mock_response(self, title: str, content: str) -> str:
         """Generate a mock response for testing purposes."""
         # Extract first few sentences for a basic summary
@@ -0,0 +1,117 @@
+import json
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from config import DESCRIPTION_LENGTH, MAX_TAGS
+
+MAX_TAG_WORDS = 4
+
+# JSON schema of one result; kept within the subset OpenAI strict mode accepts
+RESULT_SCHEMA: Dict[str, Any] = {
+    'type': 'object',
+    'properties': {
+        'description': {
+            'type': 'string',
+            'description': f"Summary ({DESCRIPTION_LENGTH}) of the content's insights and key points"
+        },
+        'tags': {
+            'type': 'array',
+            'items': {'type': 'string'},
+            'description': f"Up to {MAX_TAGS} tags of 1-{MAX_TAG_WORDS} words, including people central to the content"
+        },
+        'author': {
+            'type': 'string',
+            'description': "Author of the content, or an empty string if not identifiable"
+        }
+    },
+    'required': ['description', 'tags', 'author'],
+    'additionalProperties': False
+}
+
+# Multi-article prompts: an object wrapping one result per item id (structured output needs an object at the top)
+BATCH_RESULT_SCHEMA: Dict[str, Any] = {
+    'type': 'object',
+    'properties': {
+        'items': {
+            'type': 'array',
+            'items': {
+                'type': 'object',
+                'properties': dict(id={'type': 'string'}, **RESULT_SCHEMA['properties']),
+                'required': ['id'] + RESULT_SCHEMA['required'],
+                'additionalProperties': False
+            }
+        }
+    },
+    'required': ['items'],
+    'additionalProperties': False
+}
+
+
+class AIResult(NamedTuple):
+    """A validated AI result."""
+    description: str
+    tags: List[str]
+    author: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {'description': self.description, 'tags': list(self.tags), 'author': self.author}
+
+
+def parse_json(text: str) -> Tuple[Any, Optional[str]]:
+    """
+    Decode the JSON value in a model response.
+
+    Structured output returns bare JSON; for plain responses the first complete
+    object or array is decoded, ignoring prose or code fences around it.
+
+    Returns:
+        Tuple of (decoded value or None, error message or None)
+    """
+    text = (text or '').strip()
+    try:
+        return json.loads(text), None
+    except ValueError:
+        pass
+
+    decoder = json.JSONDecoder()
+    starts = [index for index in (text.find('{'), text.find('[')) if index >= 0]
+    for start in sorted(starts):
+        try:
+            return decoder.raw_decode(text[start:])[0], None
+        except ValueError:
+            continue
+    return None, "the response is not valid JSON"
+
+
+def validate_result(data: Any) -> Tuple[Optional[AIResult], List[str]]:
+    """
+    Validate and clean one result object.
+
+    Tags longer than MAX_TAG_WORDS words are dropped and at most MAX_TAGS are
+    kept; these are cleaned rather than reported.
+
+    Returns:
+        Tuple of (AIResult or None, list of validation errors)
+    """
+    if not isinstance(data, dict):
+        return None, ["the response must be a JSON object with description, tags and author"]
+
+    errors = []
+    description = data.get('description')
+    if not isinstance(description, str) or not description.strip():
+        errors.append("description must be a non-empty string")
+
+    raw_tags = data.get('tags')
+    if not isinstance(raw_tags, list):
+        errors.append("tags must be a list of strings")
+    if errors:
+        return None, errors
+
+    tags = []
+    for tag in raw_tags:
+        if isinstance(tag, str) and tag.strip():
+            tag_words = tag.strip().split()
+            if len(tag_words) <= MAX_TAG_WORDS:
+                tags.append(' '.join(tag_words))
+
+    author = data.get('author') or ''
+    return AIResult(description.strip(), tags[:MAX_TAGS], author.strip() if isinstance(author, str) else ''), []
@@ -0,0 +1,134 @@
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# Terminal batch states per provider
+OPENAI_DONE_STATES = ('completed', 'failed', 'expired', 'cancelled')
+ANTHROPIC_DONE_STATE = 'ended'
+
+
+class BatchAPISubmitter:
+    """
+    Runs prompts through the OpenAI or Anthropic batch API.
+
+    Prompts are written to a JSONL batch file, submitted in one batch, polled
+    until the provider reports a terminal state, and the response texts are
+    returned keyed by custom_id. The clients honour OPENAI_BASE_URL /
+    ANTHROPIC_BASE_URL, so a local stand-in server (tools/mock_llm_server.py)
+    can be used instead of the real endpoints.
+    """
+
+    def __init__(self, ai_processor, work_dir: Path, poll_interval: float = 60, timeout: float = 24 * 3600):
+        self.ai_processor = ai_processor
+        self.client = ai_processor.client
+        self.provider = ai_processor.provider
+        self.work_dir = Path(work_dir)
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+
+        if self.provider not in ('openai', 'anthropic'):
+            raise ValueError(f"Batch API is not supported for provider: {self.provider}")
+
+    def run(self, prompts: Dict[str, str]) -> Dict[str, str]:
+        """
+        Submit prompts (custom_id -> prompt) and wait for the results.
+
+        Returns:
+            Dict mapping custom_id to response text; failed requests are left out
+        """
+        batch_file = self.write_batch_file(prompts)
+        batch_id = self.submit(batch_file)
+        logger.info(f"Submitted {len(prompts)} prompts as {self.provider} batch {batch_id} ({batch_file})")
+
+        self.wait(batch_id)
+        results = self.fetch_results(batch_id)
+        logger.info(f"Batch {batch_id} returned {len(results)} of {len(prompts)} results")
+        return results
+
+    def write_batch_file(self, prompts: Dict[str, str]) -> Path:
+        """Write one JSONL request line per prompt in the provider's batch format."""
+        self.work_dir.mkdir(parents=True, exist_ok=True)
+        batch_file = self.work_dir / f"batch_{self.provider}_{time.strftime('%Y%m%d_%H%M%S')}.jsonl"
+
+        with open(batch_file, 'w', encoding='utf-8') as f:
+            for custom_id, prompt in prompts.items():
+                params = self.ai_processor._request_params(prompt)
+                if self.provider == 'openai':
+                    line = {'custom_id': custom_id, 'method': 'POST', 'url': '/v1/chat/completions', 'body': params}
+                else:
+                    line = {'custom_id': custom_id, 'params': params}
+                f.write(json.dumps(line) + '\n')
+
+        return batch_file
+
+    def submit(self, batch_file: Path) -> str:
+        """Upload/submit a batch file and return the batch id."""
+        if self.provider == 'openai':
+            with open(batch_file, 'rb') as f:
+                uploaded = self.client.files.create(file=f, purpose='batch')
+            batch = self.client.batches.create(
+                input_file_id=uploaded.id,
+                endpoint='/v1/chat/completions',
+                completion_window='24h'
+            )
+            return batch.id
+
+        with open(batch_file, 'r', encoding='utf-8') as f:
+            requests = [json.loads(line) for line in f if line.strip()]
+        return self.client.messages.batches.create(requests=requests).id
+
+    def wait(self, batch_id: str) -> Any:
+        """Poll until the batch reaches a terminal state; raises TimeoutError after `timeout`."""
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            if self.provider == 'openai':
+                batch = self.client.batches.retrieve(batch_id)
+                status = batch.status
+                done = status in OPENAI_DONE_STATES
+            else:
+                batch = self.client.messages.batches.retrieve(batch_id)
+                status = batch.processing_status
+                done = status == ANTHROPIC_DONE_STATE
+
+            if done:
+                if status != 'completed' and self.provider == 'openai':
+                    logger.warning(f"Batch {batch_id} finished with status: {status}")
+                return batch
+
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Batch {batch_id} did not finish within {self.timeout:.0f}s (status: {status})")
+
+            logger.debug(f"Batch {batch_id} status: {status}")
+            time.sleep(self.poll_interval)
+
+    def fetch_results(self, batch_id: str) -> Dict[str, str]:
+        """Download the results of a finished batch."""
+        results = {}
+
+        if self.provider == 'openai':
+            batch = self.client.batches.retrieve(batch_id)
+            if not batch.output_file_id:
+                return results
+
+            for line in self.client.files.content(batch.output_file_id).text.splitlines():
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                response = entry.get('response') or {}
+                if response.get('status_code') != 200:
+                    logger.warning(f"Batch request {entry.get('custom_id')} failed: {entry.get('error') or response}")
+                    continue
+                results[entry['custom_id']] = response['body']['choices'][0]['message']['content'].strip()
+            return results
+
+        for entry in self.client.messages.batches.results(batch_id):
+            if entry.result.type != 'succeeded':
+                logger.warning(f"Batch request {entry.custom_id} failed: {entry.result.type}")
+                continue
+            results[entry.custom_id] = self.ai_processor._message_text(entry.result.message.content)
+        return results
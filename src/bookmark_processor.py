@@ -1,113 +1,375 @@
 import pandas as pd
+import csv
 import logging
+import multiprocessing
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Iterable, Iterator, Tuple, Dict, Any, List, Union, TextIO
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, as_completed, FIRST_COMPLETED
 from tqdm import tqdm
+import json
 import time
+from collections import defaultdict
 
-from .content_extractor import ContentExtractor
-from .ai_processor import AIProcessor
-from config import BATCH_SIZE
+from .content_extractor import ContentExtractor, FetchedPage, extract_page_timed
+from .ai_processor import AIProcessor, PLACEHOLDER_PREFIXES
+from .checkpoint_journal import CheckpointJournal
+from .near_duplicates import NearDuplicate, NearDuplicateIndex
+from .rate_limiter import HostQueue
+from .run_metrics import RunMetrics
+from .shards import Shard, shard_of, merge_reports
+from .utils import canonicalize_url
+from config import (BATCH_SIZE, CONCURRENCY, CHECKPOINT_FSYNC, STREAM_CHUNK_SIZE, PARSE_WORKERS, HTML_PARSER, RUN_METRICS,
+                    NEAR_DUPLICATE_CONFIG)
 
 logger = logging.getLogger(__name__)
 
+# Enrichment columns recorded in the checkpoint journal
+JOURNAL_FIELDS = ('description', 'ai_tags', 'author', 'formatted_title', 'skip_reason', 'failure_class',
+                  'near_duplicate_of', 'near_duplicate_similarity', 'processing_status')
+
+# Bytes read from the start of the input to sniff its delimiter
+STREAM_SAMPLE_BYTES = 64 * 1024
+
+# Parse workers start from a fresh interpreter (forkserver, or spawn where that is unavailable):
+# they are created while fetch threads run, and a plain fork would copy locks those threads hold
+PARSE_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Rows held back from the fetch workers at most while their hosts wait for the per-host delay
+FETCH_LOOKAHEAD = 1000
+
 class BookmarkProcessor:
     """Main processor for enriching bookmark CSV files."""
     
-    def __init__(self):
+    def __init__(self, concurrency: Optional[int] = None, parse_workers: Optional[int] = None):
         self.content_extractor = ContentExtractor()
         self.ai_processor = AIProcessor()
+        self.concurrency = max(1, concurrency or CONCURRENCY)
+        self.parse_workers = PARSE_WORKERS if parse_workers is None else max(0, parse_workers)
+        self.stats = {'duplicate_rows': 0, 'fetches_saved': 0, 'llm_calls_saved': 0, 'near_duplicates': 0}
+        self.metrics = RunMetrics()
+        
+        self.near_duplicates = None
+        if NEAR_DUPLICATE_CONFIG.get('enabled'):
+            self.near_duplicates = NearDuplicateIndex(Path(NEAR_DUPLICATE_CONFIG.get('path', '.cache/fingerprints.sqlite3')),
+                                                      NEAR_DUPLICATE_CONFIG.get('threshold', 0.8),
+                                                      NEAR_DUPLICATE_CONFIG.get('min_words', 100))
+    
+    def close(self):
+        """Release the network resources; the processor can't fetch afterwards."""
+        self.content_extractor.close()
+    
+    def __enter__(self):
+        return self
     
-    def process_file(self, input_path: Path, output_path: Path, output_format: str = 'csv', resume: bool = False):
-        """Process a bookmark CSV file and enrich it with summaries and tags."""
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def process_file(self, input_path: Path, output_path: Path, output_format: str = 'csv', resume: bool = False,
+                     batch_api: bool = False, stream: bool = False, shard: Optional[Shard] = None):
+        """
+        Process a bookmark CSV file and enrich it with summaries and tags.
+        
+        With batch_api, all pages are fetched first and the prompts are sent in one
+        submission to the provider's batch API instead of one request at a time.
+        
+        Every processed bookmark is appended to a checkpoint journal next to the
+        output; the output file itself is only written once at the end, and resume
+        replays the journal.
+        
+        With stream, the input is read and the output written in chunks of
+        STREAM_CHUNK_SIZE rows, so memory stays bounded for very large exports.
+        
+        Per-bookmark stage timings and counters go to <output>.metrics.jsonl, and
+        the summary reports their percentiles.
+        
+        With shard (i, N), only the bookmarks whose canonical URL hashes to shard i
+        of N are processed and written, in input order; merge_shards combines the
+        outputs of all N shards.
+        """
         
         logger.info(f"Starting bookmark processing: {input_path}")
+        self.stats = {'duplicate_rows': 0, 'fetches_saved': 0, 'llm_calls_saved': 0, 'near_duplicates': 0}
+        self.progress = {'processed': 0, 'failed': 0}
+        journal = CheckpointJournal(CheckpointJournal.path_for(output_path), CHECKPOINT_FSYNC, BATCH_SIZE)
+        self.metrics = RunMetrics(RunMetrics.path_for(output_path) if RUN_METRICS else None)
+        
+        if stream:
+            try:
+                self._process_stream(input_path, output_path, output_format, resume, batch_api, journal, shard)
+            except (OSError, ValueError, pd.errors.ParserError) as e:
+                logger.error(f"Failed to stream CSV: {e}")
+                return
+            self._log_stats(output_path)
+            return
         
         # Load CSV
         df = self._load_csv(input_path)
         if df is None:
             return
+        if shard is not None:
+            df = self._select_shard(df, shard)
         
         # Handle resume functionality
-        if resume and output_path.exists():
-            df = self._handle_resume(df, output_path)
+        previous = self._load_previous_results(journal, output_path) if resume else None
+        if previous is not None:
+            df = self._merge_previous(df, previous)
         else:
             # Add new columns for enriched data
-            df['description'] = ''
-            df['ai_tags'] = ''
-            df['author'] = ''
-            df['formatted_title'] = ''
-            df['processing_status'] = 'pending'
-        
-        # Process bookmarks
-        total_bookmarks = len(df)
-        total_pending = len(df[df['processing_status'] == 'pending'])
+            df = self._add_enrichment_columns(df)
+        
+        # Process bookmarks as plain records; the dataframe is rebuilt for writing
+        columns = list(df.columns)
+        records = df.to_dict('records')
+        
+        total_bookmarks = len(records)
+        total_pending = sum(1 for record in records if record['processing_status'] == 'pending')
         completed_count = total_bookmarks - total_pending
         
         logger.info(f"Processing {total_pending} bookmarks ({completed_count} already completed)")
+        if self.concurrency > 1:
+            logger.info(f"Fetching with {self.concurrency} concurrent workers")
+        if self.parse_workers > 0:
+            logger.info(f"Parsing with {self.parse_workers} worker processes")
         
-        with tqdm(total=total_bookmarks, initial=completed_count, desc="Processing bookmarks", 
-                  unit="bookmark", bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]") as pbar:
-            for idx, row in df.iterrows():
-                if row['processing_status'] != 'pending':
-                    continue
-                
-                try:
-                    result = self._process_bookmark(row)
-                    
-                    # Update dataframe
-                    df.at[idx, 'description'] = result['description']
-                    df.at[idx, 'ai_tags'] = ', '.join(result['tags'])
-                    df.at[idx, 'author'] = result['author']
-                    df.at[idx, 'formatted_title'] = result.get('formatted_title', row.get('title', ''))
-                    df.at[idx, 'processing_status'] = 'completed'
-                    
-                    pbar.update(1)
-                    pbar.set_postfix({
-                        'current': f"{row.get('title', 'Unknown')[:30]}...",
-                        'success_rate': f"{((idx + 1 - len(df[df['processing_status'] == 'failed'])) / (idx + 1) * 100):.1f}%"
-                    })
-                    
-                    # Save progress periodically
-                    if (idx + 1) % BATCH_SIZE == 0:
-                        self._save_progress(df, output_path, output_format)
-                        logger.info(f"Saved progress: {idx + 1} bookmarks processed")
-                
-                except Exception as e:
-                    logger.error(f"Failed to process bookmark {idx}: {e}")
-                    df.at[idx, 'processing_status'] = 'failed'
-                    df.at[idx, 'description'] = 'Processing failed'
-                    df.at[idx, 'author'] = ''
-                    df.at[idx, 'formatted_title'] = row.get('title', '')
-                    pbar.update(1)
-                    pbar.set_postfix({
-                        'current': f"FAILED: {row.get('title', 'Unknown')[:25]}...",
-                        'success_rate': f"{((idx + 1 - len(df[df['processing_status'] == 'failed'])) / (idx + 1) * 100):.1f}%"
-                    })
+        journal.open(resume=resume)
+        self.metrics.open(resume=resume)
+        with journal, self.metrics, tqdm(total=total_bookmarks, initial=completed_count, desc="Processing bookmarks", 
+                           unit="bookmark", bar_format="{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]") as pbar:
+            self._process_records(records, journal, pbar, batch_api)
+        
+        if self.stats['duplicate_rows']:
+            logger.info(f"Collapsed {self.stats['duplicate_rows']} duplicate URLs")
+        
+        df = pd.DataFrame.from_records(records, columns=columns)
         
         # Final save
         self._save_final_output(df, output_path, output_format)
+        self._log_stats(output_path)
+    
+    def _process_stream(self, input_path: Path, output_path: Path, output_format: str, resume: bool,
+                        batch_api: bool, journal: CheckpointJournal, shard: Optional[Shard] = None):
+        """
+        Process the input chunk by chunk, appending each finished chunk to the output.
+        
+        Duplicate URLs are collapsed within a chunk, and rows repeating a URL enriched
+        in an earlier chunk reuse its result, as duplicates in one chunk do; only the
+        small result fields are kept per URL, not the page content. With batch_api,
+        each chunk is one batch submission.
+        """
+        # Previous results are read before the output file is rewritten
+        previous = self._load_previous_results(journal, output_path) if resume else None
+        status_counts: Dict[str, int] = {}
+        enriched_urls: Dict[str, Tuple[Any, ...]] = {}
+        
+        journal.open(resume=resume)
+        self.metrics.open(resume=resume)
+        with journal, self.metrics, open(output_path, 'w', newline='', encoding='utf-8') as output, \
+                tqdm(desc="Processing bookmarks", unit="bookmark") as pbar:
+            for number, chunk in enumerate(self._iter_csv_chunks(input_path)):
+                if shard is not None:
+                    chunk = self._select_shard(chunk, shard)
+                chunk = self._merge_previous(chunk, previous) if previous is not None else \
+                    self._add_enrichment_columns(chunk)
+                
+                columns = list(chunk.columns)
+                records = chunk.to_dict('records')
+                pbar.update(sum(1 for record in records if record['processing_status'] != 'pending'))
+                self._process_records(records, journal, pbar, batch_api, enriched_urls)
+                
+                chunk = pd.DataFrame.from_records(records, columns=columns)
+                for status, count in chunk['processing_status'].value_counts().items():
+                    status_counts[status] = status_counts.get(status, 0) + count
+                self._write_dataframe(chunk.drop('processing_status', axis=1), output, output_format,
+                                      header=number == 0)
+        
+        summary_path = output_path.parent / f"{output_path.stem}_summary.txt"
+        self._save_summary(status_counts, summary_path)
+    
+    def _process_records(self, records: List[Dict[str, Any]], journal: CheckpointJournal, pbar: tqdm,
+                         batch_api: bool = False, enriched_urls: Optional[Dict[str, Tuple[Any, ...]]] = None):
+        """
+        Enrich the pending records in place, checkpointing every processed row.
+        
+        enriched_urls, if given, maps the canonical URLs enriched by earlier calls
+        (e.g. stream chunks) to their results; rows of those URLs reuse them, and
+        the URLs enriched by this call are added.
+        """
+        # Rows sharing a canonical URL are fetched and enriched once
+        groups = self._group_duplicates(records)
+        self.stats['duplicate_rows'] += sum(len(group) - 1 for group in groups)
+        if enriched_urls is not None:
+            groups = self._reuse_enriched(records, groups, enriched_urls, journal, pbar)
+        
+        pending_rows = ((group, records[group[0]]) for group in groups)
+        fetched = self._iter_fetched(pending_rows)
+        if self.near_duplicates is not None:
+            fetched = self._iter_near_duplicates(fetched)
+        enriched = self._iter_batch_api(fetched) if batch_api else self._iter_enriched(fetched)
+        for group, row, content_data, result in enriched:
+            try:
+                if isinstance(result, Exception):
+                    raise result
+                
+                # Pages skipped by the fetch guards (e.g. non-HTML) keep their reason code,
+                # failed fetches their failure class
+                skip_reason = '' if content_data else self.content_extractor.pop_skip_reason(row['url'])
+                failure_class = '' if content_data else self.content_extractor.pop_failure_class(row['url'])
+                near_duplicate = content_data.get('near_duplicate') if content_data else None
+                
+                # Update records, fanning the result out to duplicate rows
+                self._complete_group(records, group, result, content_data, skip_reason, failure_class,
+                                     near_duplicate, first=True)
+                if enriched_urls is not None and isinstance(row['url'], str):
+                    # Only what later rows need, so a long stream doesn't hold every page's text
+                    content = {key: content_data.get(key, '') for key in ('title', 'publisher')} \
+                        if content_data else None
+                    enriched_urls[canonicalize_url(row['url'])] = (result, content, skip_reason, failure_class,
+                                                                    near_duplicate)
+                
+                self.stats['fetches_saved'] += len(group) - 1
+                if content_data:
+                    self.stats['llm_calls_saved'] += len(group) - 1
+                if near_duplicate:
+                    self.stats['near_duplicates'] += 1
+                elif content_data and self._reusable(result):
+                    self.near_duplicates.add(row['url'], content_data.get('fingerprint'), result)
+                current = f"{str(row.get('title', 'Unknown'))[:30]}..."
+            
+            except Exception as e:
+                logger.error(f"Failed to process bookmark {group[0]}: {e}")
+                for i in group:
+                    records[i].update({
+                        'processing_status': 'failed',
+                        'description': 'Processing failed',
+                        'author': '',
+                        'formatted_title': records[i].get('title', ''),
+                        'skip_reason': '',
+                        'failure_class': '',
+                        'near_duplicate_of': '',
+                        'near_duplicate_similarity': ''
+                    })
+                self.progress['failed'] += len(group)
+                current = f"FAILED: {str(row.get('title', 'Unknown'))[:25]}..."
+            
+            # Checkpoint each row of the group
+            for i in group:
+                journal.append(self._journal_entry(records[i]))
+            self.metrics.finish(row['url'], status=records[group[0]]['processing_status'],
+                                method=content_data.get('method', '') if content_data else '',
+                                skip_reason=records[group[0]]['skip_reason'],
+                                failure_class=records[group[0]]['failure_class'], duplicates=len(group) - 1,
+                                near_duplicate_of=records[group[0]]['near_duplicate_of'])
+            
+            self.progress['processed'] += len(group)
+            pbar.update(len(group))
+            processed = self.progress['processed']
+            pbar.set_postfix({
+                'current': current,
+                'success_rate': f"{(processed - self.progress['failed']) / processed * 100:.1f}%"
+            }, refresh=False)
+    
+    def _complete_group(self, records: List[Dict[str, Any]], group: List[int], result: Dict[str, Any],
+                        content_data: Optional[Dict[str, Any]], skip_reason: str, failure_class: str,
+                        near_duplicate: Optional[NearDuplicate], first: bool):
+        """Mark a group's records completed with `result`, which is the first record's own if `first`."""
+        for i in group:
+            dup_result = result if first and i == group[0] else \
+                self._fan_out_result(result, records[i], content_data)
+            records[i].update({
+                'description': dup_result['description'],
+                'ai_tags': ', '.join(dup_result['tags']),
+                'author': dup_result['author'],
+                'formatted_title': dup_result.get('formatted_title', records[i].get('title', '')),
+                'skip_reason': skip_reason,
+                'failure_class': failure_class,
+                'near_duplicate_of': near_duplicate.url if near_duplicate else '',
+                'near_duplicate_similarity': near_duplicate.similarity if near_duplicate else '',
+                'processing_status': 'completed'
+            })
+    
+    def _reuse_enriched(self, records: List[Dict[str, Any]], groups: List[List[int]],
+                        enriched_urls: Dict[str, Tuple[Any, ...]], journal: CheckpointJournal,
+                        pbar: tqdm) -> List[List[int]]:
+        """Complete the groups whose URL is in enriched_urls; returns the other groups."""
+        remaining = []
+        for group in groups:
+            url = records[group[0]]['url']
+            earlier = enriched_urls.get(canonicalize_url(url)) if isinstance(url, str) else None
+            if earlier is None:
+                remaining.append(group)
+                continue
+            
+            result, content, skip_reason, failure_class, near_duplicate = earlier
+            self._complete_group(records, group, result, content, skip_reason, failure_class, near_duplicate,
+                                 first=False)
+            for i in group:
+                journal.append(self._journal_entry(records[i]))
+            self.stats['duplicate_rows'] += 1
+            self.stats['fetches_saved'] += len(group)
+            if content:
+                self.stats['llm_calls_saved'] += len(group)
+            self.progress['processed'] += len(group)
+            pbar.update(len(group))
+        return remaining
+    
+    def _log_stats(self, output_path: Path):
+        """Log network, cache, duplicate and AI statistics of the run."""
+        net = self.content_extractor.stats
+        logger.info(f"Network: {net['requests']} requests, {net['bytes_downloaded']} bytes downloaded; "
+                    f"single-fetch extraction saved {net['requests_saved']} requests, {net['bytes_saved']} bytes")
+        logger.info(f"Content cache: {net['cache_hits']} hits, {net['cache_revalidated']} revalidated (304)")
+        logger.info(f"Fetch guards: {net['skipped']} non-HTML URLs skipped, {net['truncated']} pages cut at max_bytes")
+        logger.info(f"Fetch failures: {self._failure_breakdown(self.content_extractor.failure_counts)}; "
+                    f"{net['known_failures']} known failures skipped (negative cache)")
+        dns_cache = self.content_extractor.transport.dns_cache
+        logger.info(f"Transport: {net['retries']} retries"
+                    + (f"; DNS cache: {dns_cache.stats['hits']} hits, {dns_cache.stats['misses']} lookups" if dns_cache else ''))
+        logger.info(f"Duplicate collapsing saved {self.stats['fetches_saved']} fetches and "
+                    f"{self.stats['llm_calls_saved']} LLM calls")
+        if self.near_duplicates is not None:
+            logger.info(f"Near-duplicate content: {self.stats['near_duplicates']} articles reused an enriched copy "
+                        f"({len(self.near_duplicates)} articles indexed)")
+        ai_stats = self.ai_processor.stats
+        logger.info(f"AI: {ai_stats['requests']} requests ({ai_stats['batch_retries']} batch retries, "
+                    f"{ai_stats['rate_limited']} rate limited, {ai_stats['retries']} retries); "
+                    f"response cache: {ai_stats['cache_hits']} hits, {ai_stats['cache_misses']} misses")
+        if self.ai_processor.tiers:
+            logger.info(f"Model cascade: {self.ai_processor.escalation_rate() * 100:.1f}% of articles escalated")
+        for tier in self.ai_processor.tier_report():
+            logger.info(f"Cascade tier {tier['tier']}: {tier['articles']} articles, {tier['escalated']} escalated "
+                        f"({tier['escalation_rate'] * 100:.1f}%), {tier['latency']:.2f}s per article, "
+                        f"{tier['input_tokens']}+{tier['output_tokens']} tokens, ${tier['cost']:.4f}")
+        logger.info(f"AI response validation: {ai_stats['invalid']} of {ai_stats['validated']} invalid "
+                    f"({ai_stats['invalid'] / max(ai_stats['validated'], 1) * 100:.1f}%), "
+                    f"{ai_stats['reasks_fixed']} of {ai_stats['reasks']} re-asks fixed")
+        saved = ai_stats['content_tokens'] - ai_stats['content_tokens_sent']
+        logger.info(f"Prompt content: {ai_stats['content_tokens_sent']} of {ai_stats['content_tokens']} article tokens sent, "
+                    f"{saved} saved ({saved / max(ai_stats['articles'], 1):.0f} per article, "
+                    f"{self.ai_processor.condenser.tokenizer.name} token counts)")
+        for stage, timing in self.metrics.stage_report().items():
+            logger.info(f"Stage {stage}: p50 {timing['p50']:.3f}s, p95 {timing['p95']:.3f}s, "
+                        f"p99 {timing['p99']:.3f}s ({timing['count']} bookmarks)")
         logger.info(f"Processing complete. Output saved to: {output_path}")
     
-    def _count_file_lines(self, file_path: Path) -> int:
-        """Count total lines in the input file for progress tracking."""
+    @staticmethod
+    def _detect_delimiter(input_path: Path) -> str:
+        """Sniff the delimiter of the input from a sample of its first lines."""
+        with open(input_path, 'r', encoding='utf-8', errors='ignore') as f:
+            sample = f.read(STREAM_SAMPLE_BYTES)
+        
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                return sum(1 for _ in f) - 1  # Subtract 1 for header
-        except Exception as e:
-            logger.warning(f"Could not count lines in {file_path}: {e}")
-            return 0
+            return csv.Sniffer().sniff(sample, delimiters=';,\t').delimiter
+        except csv.Error:
+            # Fall back to the candidate that splits the header into the most columns
+            header = sample.splitlines()[0] if sample else ''
+            return max([';', ',', '\t'], key=header.count)
     
-    def _load_csv(self, input_path: Path) -> Optional[pd.DataFrame]:
+    @classmethod
+    def _load_csv(cls, input_path: Path) -> Optional[pd.DataFrame]:
         """Load and validate the input CSV file."""
         try:
-            # Count total lines for progress tracking
-            total_lines = self._count_file_lines(input_path)
-            if total_lines > 0:
-                logger.info(f"Input file contains {total_lines} bookmark records")
-            
-            # Try different separators
-            for sep in [';', ',', '\t']:
+            # Parse with the sniffed separator first; the others are only tried if it fails
+            for sep in dict.fromkeys([cls._detect_delimiter(input_path), ';', ',', '\t']):
                 try:
                     df = pd.read_csv(input_path, sep=sep)
                     if len(df.columns) >= 3:  # Should have at least title, url, tags
@@ -123,49 +385,402 @@ class BookmarkProcessor:
             logger.error(f"Failed to load CSV: {e}")
             return None
     
-    def _handle_resume(self, df: pd.DataFrame, output_path: Path) -> pd.DataFrame:
-        """Handle resuming from a previous run."""
+    def _iter_csv_chunks(self, input_path: Path) -> Iterator[pd.DataFrame]:
+        """Read the input CSV in chunks of STREAM_CHUNK_SIZE rows."""
+        sep = self._detect_delimiter(input_path)
+        logger.info(f"Streaming CSV with separator '{sep}' in chunks of {STREAM_CHUNK_SIZE} rows")
+        
+        with pd.read_csv(input_path, sep=sep, chunksize=STREAM_CHUNK_SIZE) as reader:
+            for chunk in reader:
+                if len(chunk.columns) < 3:  # Should have at least title, url, tags
+                    raise ValueError(f"Could not parse CSV file: {input_path}")
+                yield chunk.reset_index(drop=True)
+    
+    def _select_shard(self, df: pd.DataFrame, shard: Shard) -> pd.DataFrame:
+        """The rows of shard (i, N): those whose canonical URL hashes to shard i, in input order."""
+        index, count = shard
+        selected = df[df['url'].map(lambda url: shard_of(url, count) == index)].reset_index(drop=True)
+        logger.info(f"Shard {index}/{count}: {len(selected)} of {len(df)} rows")
+        return selected
+    
+    def _add_enrichment_columns(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add empty enrichment columns with every row pending."""
+        df['description'] = ''
+        df['ai_tags'] = ''
+        df['author'] = ''
+        df['formatted_title'] = ''
+        df['skip_reason'] = ''
+        df['failure_class'] = ''
+        df['near_duplicate_of'] = ''
+        df['near_duplicate_similarity'] = ''
+        df['processing_status'] = 'pending'
+        return df
+    
+    def _load_previous_results(self, journal: CheckpointJournal, output_path: Path) -> Optional[pd.DataFrame]:
+        """
+        Load the results of previous runs for resuming.
+        
+        Results come from the output of the last finished run and the checkpoint
+        journal, which takes precedence. Returns them keyed by resume key, or None
+        if there is nothing to resume from.
+        """
+        if not journal.path.exists() and not output_path.exists():
+            logger.info(f"No checkpoint journal or previous output for {output_path}; starting from scratch")
+            return None
+        
         try:
-            # Try to detect format from file extension
-            if output_path.suffix.lower() == '.tsv':
-                existing_df = pd.read_csv(output_path, sep='\t')
-            else:
-                existing_df = pd.read_csv(output_path, sep=',')
+            # Journal entries are newer than the output of the last finished run
+            sources = []
+            if output_path.exists():
+                sources.append(self._read_previous_output(output_path))
+            if journal.path.exists():
+                sources.append(pd.DataFrame(list(journal.replay()), columns=['url', 'created', *JOURNAL_FIELDS]))
+            previous = pd.concat(sources, ignore_index=True)
             
-            # Merge with existing progress
-            if 'processing_status' in existing_df.columns:
-                # Update status for existing entries
-                for idx, row in existing_df.iterrows():
-                    if idx < len(df):
-                        df.at[idx, 'description'] = row.get('description', '')
-                        df.at[idx, 'ai_tags'] = row.get('ai_tags', '')
-                        df.at[idx, 'author'] = row.get('author', '')
-                        df.at[idx, 'formatted_title'] = row.get('formatted_title', '')
-                        df.at[idx, 'processing_status'] = row.get('processing_status', 'pending')
+            previous['_resume_key'] = self._resume_keys(previous)
+            previous = previous.drop_duplicates('_resume_key', keep='last')
+            logger.info(f"Resuming from previous run: {len(previous)} previous results")
+            return previous[['_resume_key', *JOURNAL_FIELDS]]
             
-            logger.info("Resuming from previous run")
-            return df
+        except Exception as e:
+            logger.warning(f"Could not resume from previous run: {e}")
+            return None
+    
+    def _merge_previous(self, df: pd.DataFrame, previous: pd.DataFrame) -> pd.DataFrame:
+        """
+        Join previous results onto the input by canonical URL plus `created` timestamp.
+        
+        A re-exported, reordered or extended input therefore only leaves bookmarks
+        pending that are new or were saved again.
+        """
+        df = df.drop(columns=[field for field in JOURNAL_FIELDS if field in df.columns])
+        df['_resume_key'] = self._resume_keys(df)
+        df = df.merge(previous, on='_resume_key', how='left', sort=False)
+        df = df.drop(columns='_resume_key')
+        
+        restored = df['processing_status'].notna()
+        df[list(JOURNAL_FIELDS)] = df[list(JOURNAL_FIELDS)].fillna('')
+        df.loc[~restored, 'processing_status'] = 'pending'
+        
+        logger.debug(f"Restored {restored.sum()} bookmarks, {(~restored).sum()} new or changed")
+        return df
+    
+    def _read_previous_output(self, output_path: Path) -> pd.DataFrame:
+        """Read a finished output file; rows with a description count as completed."""
+        sep = '\t' if output_path.suffix.lower() == '.tsv' else ','
+        previous = pd.read_csv(output_path, sep=sep)
+        
+        for field in JOURNAL_FIELDS:
+            if field not in previous.columns:
+                previous[field] = ''
+        previous[list(JOURNAL_FIELDS)] = previous[list(JOURNAL_FIELDS)].fillna('')
+        
+        if (previous['processing_status'] == '').all():
+            previous['processing_status'] = 'pending'
+            previous.loc[previous['description'] != '', 'processing_status'] = 'completed'
+            previous.loc[previous['description'] == 'Processing failed', 'processing_status'] = 'failed'
+        
+        # Rows that were never processed are not results
+        return previous[previous['processing_status'] != 'pending']
+    
+    def _resume_keys(self, df: pd.DataFrame) -> pd.Series:
+        """Stable resume key per row: canonical URL plus the `created` timestamp."""
+        urls = df['url'].map(lambda url: canonicalize_url(url) if isinstance(url, str) else '')
+        if 'created' not in df.columns:
+            return urls + '|'
+        created = df['created'].astype(str).str.replace(r'\.0$', '', regex=True).replace({'nan': '', 'None': ''})
+        return urls + '|' + created
+    
+    def _group_duplicates(self, records: List[Dict[str, Any]]) -> List[List[int]]:
+        """
+        Group pending records by canonical URL.
+        
+        Returns:
+            Lists of record positions in input order; the first position of each group
+            is the record that gets fetched and enriched
+        """
+        groups: Dict[str, List[int]] = {}
+        for i, record in enumerate(records):
+            if record['processing_status'] != 'pending':
+                continue
+            url = record['url']
+            key = canonicalize_url(url) if isinstance(url, str) else f"#{i}"
+            groups.setdefault(key, []).append(i)
+        return list(groups.values())
+    
+    def _iter_fetched(self, rows: Iterable[Tuple[Any, Dict[str, Any]]]) -> Iterator[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Fetch content for each (key, row) pair.
+        
+        With parse_workers > 0 the fetch threads only download and the HTML is
+        parsed on a process pool; otherwise each fetch worker parses its own page.
+        """
+        if self.parse_workers > 0:
+            return self._iter_parsed(self._iter_fetch_stage(rows, self._fetch_page))
+        return self._iter_fetch_stage(rows, self._fetch_content)
+    
+    def _iter_fetch_stage(self, rows: Iterable[Tuple[Any, Dict[str, Any]]], fetch) -> Iterator[Tuple[Any, Dict[str, Any], Any]]:
+        """
+        Run `fetch` for each (key, row) pair.
+        
+        With concurrency > 1 fetches run on a bounded worker pool and results are
+        yielded as they complete, so slow hosts do not hold up the rest of the run.
+        At most 2 * concurrency rows are in flight at once. Rows whose host must
+        wait for the per-host delay are held back (up to FETCH_LOOKAHEAD of them)
+        rather than sleeping in a worker, so other hosts keep the workers busy.
+        """
+        if self.concurrency <= 1:
+            for key, row in rows:
+                yield key, row, fetch(row)
+            return
+        
+        rows = iter(rows)
+        limit = self.concurrency * 2
+        queue = HostQueue(self.content_extractor.rate_limiter)
+        exhausted = False
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix='fetch') as executor:
+            in_flight = {}
+            
+            def fill():
+                nonlocal exhausted
+                while len(in_flight) < limit:
+                    item = queue.pop_ready()
+                    if item is None:
+                        if exhausted or len(queue) >= FETCH_LOOKAHEAD:
+                            return
+                        item = next(rows, None)
+                        if item is None:
+                            exhausted = True
+                            return
+                        if not queue.offer(item, item[1]['url']):
+                            continue
+                    key, row = item
+                    in_flight[executor.submit(fetch, row)] = (key, row)
+            
+            fill()
+            while in_flight or len(queue):
+                # Wake up for the next host slot too, unless no worker could take it
+                timeout = queue.next_ready_in() if len(in_flight) < limit else None
+                if not in_flight:
+                    time.sleep(timeout or 0)
+                    fill()
+                    continue
+                
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                finished = [in_flight.pop(future) + (future.result(),) for future in done]
+                for key, row, _ in finished:
+                    queue.finish(row['url'])
+                fill()
+                yield from finished
+    
+    def _iter_parsed(self, pages: Iterable[Tuple[Any, Dict[str, Any], Optional[FetchedPage]]]) -> Iterator[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Parse fetched pages on a process pool of parse_workers processes.
+        
+        Only the raw HTML is sent to the workers and only the extracted dict comes
+        back. At most 2 * parse_workers pages are queued; while the queue is full no
+        further pages are pulled from the fetch stage.
+        """
+        limit = self.parse_workers * 2
+        
+        with ProcessPoolExecutor(max_workers=self.parse_workers,
+                                 mp_context=multiprocessing.get_context(PARSE_START_METHOD)) as executor:
+            in_flight = {}
+            for key, row, page in pages:
+                if page is None or page.content is not None:
+                    # Failed fetch or content cache hit - nothing to parse
+                    yield key, row, page.content if page else None
+                    continue
+                
+                future = executor.submit(extract_page_timed, page.url, page.html, page.headers, page.encoding, HTML_PARSER)
+                in_flight[future] = (key, row, page)
+                
+                # Hand back parsed pages; block only while the queue is full
+                done, _ = wait(in_flight, timeout=0 if len(in_flight) < limit else None,
+                               return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield self._parsed_result(future, *in_flight.pop(future))
             
+            for future in as_completed(list(in_flight)):
+                yield self._parsed_result(future, *in_flight.pop(future))
+    
+    def _parsed_result(self, future, key: Any, row: Dict[str, Any], page: FetchedPage) -> Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Collect a parse worker's result and record it with the content extractor."""
+        try:
+            content, seconds = future.result()
+            self.metrics.record(row['url'], 'fetch', {'parse': seconds})
+            return key, row, self.content_extractor.store_page(page, content)
         except Exception as e:
-            logger.warning(f"Could not resume from existing file: {e}")
-            # Add new columns for fresh start
-            df['description'] = ''
-            df['ai_tags'] = ''
-            df['author'] = ''
-            df['formatted_title'] = ''
-            df['processing_status'] = 'pending'
-            return df
-    
-    def _process_bookmark(self, row: pd.Series) -> dict:
-        """Process a single bookmark."""
-        url = row['url']
-        title = row.get('title', '')
-        existing_tags = row.get('tags', '')
+            logger.error(f"Content extraction failed for {page.url}: {e}")
+            return key, row, None
+    
+    def _iter_near_duplicates(self, fetched: Iterable[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]) -> Iterator[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Fingerprint fetched articles and look them up among the enriched ones.
+        
+        The content gets its MinHash `fingerprint` and, when an enriched article is
+        similar enough, the `near_duplicate` match whose result is reused instead of
+        an AI call. An article is only indexed once its own result is back, so a
+        copy only finds an original whose enrichment finished before the copy got
+        here: copies in the same AI batch, the same batch API submission or AI jobs
+        running at the same time (ai.concurrency > 1) are each enriched.
+        """
+        for key, row, content_data in fetched:
+            if content_data:
+                fingerprint = self.near_duplicates.fingerprint(content_data.get('text', ''))
+                match = self.near_duplicates.find(row['url'], fingerprint)
+                if match:
+                    logger.debug(f"{row['url']} is a near-duplicate of {match.url} ({match.similarity:.2f})")
+                content_data = dict(content_data, fingerprint=fingerprint, near_duplicate=match)
+            yield key, row, content_data
+    
+    def _iter_enriched(self, fetched: Iterable[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]) -> Iterator[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]], Any]]:
+        """
+        Run AI enrichment over fetched bookmarks.
+        
+        With ai_batch_size > 1, bookmarks with content are buffered and sent
+        ai_batch_size articles per request. With AI concurrency > 1, that many AI
+        jobs run on a worker pool while fetching continues; new fetches are only
+        pulled when a worker is free. Yields (key, row, content_data, result) where
+        result is the exception raised if enrichment failed.
+        """
+        jobs = self._iter_ai_jobs(fetched)
+        workers = self.ai_processor.concurrency
+        
+        if workers <= 1:
+            for job in jobs:
+                yield from self._run_ai_job(job)
+            return
         
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ai') as executor:
+            in_flight = set()
+            for job in jobs:
+                in_flight.add(executor.submit(self._run_ai_job, job))
+                
+                # Hand back finished jobs; block only while every worker is busy
+                done, in_flight = wait(in_flight, timeout=0 if len(in_flight) < workers else None,
+                                       return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield from future.result()
+            
+            for future in as_completed(in_flight):
+                yield from future.result()
+    
+    def _iter_batch_api(self, fetched: Iterable[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]) -> Iterator[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]], Any]]:
+        """Enrich all fetched bookmarks with a single provider batch API submission."""
+        fetched = list(fetched)
+        with_content = [(row, content_data) for _, row, content_data in fetched
+                        if content_data and not content_data.get('near_duplicate')]
+        logger.info(f"Fetched {len(fetched)} bookmarks; submitting {len(with_content)} to the batch API")
+        
+        start = time.perf_counter()
+        try:
+            with self.ai_processor.traced() as trace:
+                results = self.ai_processor.process_via_batch_api([self._ai_request(row, content_data)
+                                                                   for row, content_data in with_content])
+        except Exception as e:
+            logger.error(f"Batch API processing failed: {e}")
+            results = [e] * len(with_content)
+        self._record_ai([row['url'] for row, _ in with_content], time.perf_counter() - start, trace)
+        results = iter(results)
+        
+        for key, row, content_data in fetched:
+            if not content_data or content_data.get('near_duplicate'):
+                yield key, row, content_data, self._enrich_bookmark(row, content_data)
+                continue
+            
+            result = next(results)
+            if not isinstance(result, Exception):
+                result['formatted_title'] = self._format_title(row, content_data)
+            yield key, row, content_data, result
+    
+    def _iter_ai_jobs(self, fetched: Iterable[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]) -> Iterator[List[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]]:
+        """Group fetched bookmarks into AI jobs of up to ai_batch_size bookmarks."""
+        batch = []
+        for item in fetched:
+            content_data = item[2]
+            if content_data and self.ai_processor.batch_size > 1 and not content_data.get('near_duplicate'):
+                batch.append(item)
+                if len(batch) >= self.ai_processor.batch_size:
+                    yield batch
+                    batch = []
+            else:
+                yield [item]
+        
+        if batch:
+            yield batch
+    
+    def _run_ai_job(self, job: List[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]) -> List[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]], Any]]:
+        """Enrich the bookmarks of one AI job."""
+        if self.ai_processor.batch_size > 1 and job[0][2] and not job[0][2].get('near_duplicate'):
+            return self._enrich_batch(job)
+        
+        key, row, content_data = job[0]
+        try:
+            result = self._enrich_bookmark(row, content_data)
+        except Exception as e:
+            result = e
+        return [(key, row, content_data, result)]
+    
+    def _enrich_batch(self, batch: List[Tuple[Any, Dict[str, Any], Dict[str, Any]]]) -> List[Tuple[Any, Dict[str, Any], Dict[str, Any], Any]]:
+        """Enrich several fetched bookmarks with one batched AI call."""
+        start = time.perf_counter()
+        try:
+            with self.ai_processor.traced() as trace:
+                results = self.ai_processor.process_batch([self._ai_request(row, content_data)
+                                                           for _, row, content_data in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        self._record_ai([row['url'] for _, row, _ in batch], time.perf_counter() - start, trace)
+        
+        enriched = []
+        for (key, row, content_data), result in zip(batch, results):
+            if not isinstance(result, Exception):
+                result['formatted_title'] = self._format_title(row, content_data)
+            enriched.append((key, row, content_data, result))
+        return enriched
+    
+    def _fetch_content(self, row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Extract content for a bookmark row, treating unexpected errors as a failed fetch."""
+        url = row['url']
         logger.debug(f"Processing: {url}")
         
-        # Extract content
-        content_data = self.content_extractor.extract_content(url)
+        self.metrics.start(url)
+        start = time.perf_counter()
+        try:
+            with self.content_extractor.traced() as trace:
+                return self.content_extractor.extract_content(url)
+        except Exception as e:
+            logger.error(f"Fetch failed for {url}: {e}")
+            return None
+        finally:
+            self.metrics.record(url, 'fetch', dict(trace, fetch=time.perf_counter() - start))
+    
+    def _fetch_page(self, row: Dict[str, Any]) -> Optional[FetchedPage]:
+        """Download the page of a bookmark row for the parse stage."""
+        url = row['url']
+        logger.debug(f"Fetching: {url}")
+        
+        self.metrics.start(url)
+        start = time.perf_counter()
+        try:
+            with self.content_extractor.traced() as trace:
+                return self.content_extractor.fetch_page(url)
+        except Exception as e:
+            logger.error(f"Fetch failed for {url}: {e}")
+            return None
+        finally:
+            self.metrics.record(url, 'fetch', dict(trace, fetch=time.perf_counter() - start))
+    
+    def _process_bookmark(self, row: Dict[str, Any]) -> dict:
+        """Process a single bookmark."""
+        content_data = self._fetch_content(row)
+        return self._enrich_bookmark(row, content_data)
+    
+    def _enrich_bookmark(self, row: Dict[str, Any], content_data: Optional[Dict[str, Any]]) -> dict:
+        """Generate description, tags and formatted title from extracted content."""
+        url = row['url']
+        title = row.get('title', '')
         
         if not content_data:
             return {
@@ -175,35 +790,87 @@ class BookmarkProcessor:
                 'formatted_title': title or url
             }
         
+        # Reuse the result of an enriched copy of the same article
+        near_duplicate = content_data.get('near_duplicate')
+        if near_duplicate:
+            return {
+                'description': near_duplicate.description,
+                'tags': list(near_duplicate.tags),
+                'author': near_duplicate.author,
+                'formatted_title': self._format_title(row, content_data)
+            }
+        
+        # Process with AI
+        start = time.perf_counter()
+        with self.ai_processor.traced() as trace:
+            result = self.ai_processor.process_content(**self._ai_request(row, content_data))
+        self._record_ai([url], time.perf_counter() - start, trace)
+        
+        result['formatted_title'] = self._format_title(row, content_data)
+        return result
+    
+    def _record_ai(self, urls: List[str], seconds: float, trace: Dict[str, Any]):
+        """Record an AI call in the metrics of its bookmarks; a batched call's counters are shared evenly."""
+        if not urls:
+            return
+        values = {key: round(value / len(urls), 2) if len(urls) > 1 and isinstance(value, (int, float)) else value
+                  for key, value in trace.items()}
+        values['ai'] = seconds
+        if len(urls) > 1:
+            values['batch_size'] = len(urls)
+        for url in urls:
+            self.metrics.record(url, 'ai', values)
+    
+    def _reusable(self, result: dict) -> bool:
+        """Whether an enrichment result can be reused for near-duplicates (not a placeholder or mock response)."""
+        return self.near_duplicates is not None and not self.ai_processor.mock and \
+            not result['description'].startswith(PLACEHOLDER_PREFIXES)
+    
+    def _ai_request(self, row: Dict[str, Any], content_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Keyword arguments for AIProcessor.process_content for a fetched bookmark."""
+        url = row['url']
+        title = row.get('title', '')
+        
         # Use extracted title if original is missing or just URL
         if not title or title == url:
             title = content_data['title']
         
-        # Process with AI
-        result = self.ai_processor.process_content(
-            title=title,
-            content=content_data['text'],
-            authors=content_data.get('authors', []),
-            publisher=content_data.get('publisher', ''),
-            existing_tags=existing_tags
-        )
+        return {
+            'title': title,
+            'content': content_data['text'],
+            'authors': content_data.get('authors', []),
+            'publisher': content_data.get('publisher', ''),
+            'existing_tags': row.get('tags', '')
+        }
+    
+    def _fan_out_result(self, result: dict, row: Dict[str, Any], content_data: Optional[Dict[str, Any]]) -> dict:
+        """Adapt the enrichment result of a group's first row to a duplicate row."""
+        if not content_data:
+            return self._enrich_bookmark(row, None)
+        return dict(result, formatted_title=self._format_title(row, content_data))
+    
+    def _format_title(self, row: Dict[str, Any], content_data: Optional[Dict[str, Any]]) -> str:
+        """Format title with publisher if available."""
+        url = row['url']
+        title = row.get('title', '')
+        
+        if not content_data:
+            return title or url
+        
+        # Use extracted title if original is missing or just URL
+        if not title or title == url:
+            title = content_data['title']
         
-        # Format title with publisher if available
         publisher = content_data.get('publisher', '')
         if publisher and title:
-            formatted_title = f"{title} - {publisher}"
-            result['formatted_title'] = formatted_title
-        else:
-            result['formatted_title'] = title
-        
-        return result
+            return f"{title} - {publisher}"
+        return title
     
-    def _save_progress(self, df: pd.DataFrame, output_path: Path, output_format: str = 'csv'):
-        """Save current progress to file."""
-        try:
-            self._write_dataframe(df, output_path, output_format)
-        except Exception as e:
-            logger.error(f"Failed to save progress: {e}")
+    def _journal_entry(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Checkpoint journal entry for a processed record."""
+        entry = {'url': record['url'], 'created': record.get('created')}
+        entry.update((field, record[field]) for field in JOURNAL_FIELDS)
+        return entry
     
     def _save_final_output(self, df: pd.DataFrame, output_path: Path, output_format: str = 'csv'):
         """Save final enriched output."""
@@ -214,13 +881,15 @@ class BookmarkProcessor:
             
             # Also save a summary
             summary_path = output_path.parent / f"{output_path.stem}_summary.txt"
-            self._save_summary(df, summary_path)
+            self._save_summary(df['processing_status'].value_counts().to_dict(), summary_path)
             
         except Exception as e:
             logger.error(f"Failed to save final output: {e}")
     
-    def _write_dataframe(self, df: pd.DataFrame, output_path: Path, output_format: str = 'csv'):
-        """Write dataframe to file with proper formatting."""
+    @staticmethod
+    def _write_dataframe(df: pd.DataFrame, output: Union[Path, TextIO], output_format: str = 'csv',
+                         header: bool = True):
+        """Write dataframe to a file path or an open file (e.g. appending a chunk) with proper formatting."""
         from config import CSV_CONFIG, TSV_CONFIG
         
         if output_format == 'tsv':
@@ -239,33 +908,174 @@ class BookmarkProcessor:
         quoting = quoting_map.get(config['quoting'], 0)
         
         df.to_csv(
-            output_path,
+            output,
             sep=config['delimiter'],
             quotechar=config['quotechar'],
             quoting=quoting,
             index=False,
+            header=header,
             escapechar=config.get('escape_char') if config['quoting'] == 'none' else None
         )
     
-    def _save_summary(self, df: pd.DataFrame, summary_path: Path):
-        """Save processing summary."""
+    @staticmethod
+    def _failure_breakdown(failure_counts: Dict[str, int]) -> str:
+        """Failed fetches by failure class, most frequent first."""
+        counts = sorted(failure_counts.items(), key=lambda item: -item[1])
+        return ', '.join(f"{failure_class} {count}" for failure_class, count in counts) or 'none'
+    
+    def _save_summary(self, status_counts: Dict[str, int], summary_path: Path):
+        """Save processing summary from the number of rows per processing status."""
         try:
-            total = len(df)
-            completed = len(df[df.get('processing_status', '') == 'completed'])
-            failed = len(df[df.get('processing_status', '') == 'failed'])
-            
-            summary = f"""Bookmark Processing Summary
+            self._write_summary(self._summary_report(status_counts), summary_path)
+        except Exception as e:
+            logger.error(f"Failed to save summary: {e}")
+    
+    def _summary_report(self, status_counts: Dict[str, int]) -> Dict[str, Any]:
+        """Figures of the run for the summary, as written to <output>_summary.json."""
+        return {
+            'bookmarks': {'total': sum(status_counts.values()),
+                          **{str(status): int(count) for status, count in status_counts.items()}},
+            'network': self.content_extractor.stats,
+            'failures': self.content_extractor.failure_counts,
+            'duplicates': self.stats,
+            'ai': self.ai_processor.stats,
+            'condense_method': self.ai_processor.condenser.method,
+            'cascade': self.ai_processor.tier_report(),
+            'escalation': {'rate': self.ai_processor.escalation_rate(),
+                           'reasons': self.ai_processor.escalation_reasons} if self.ai_processor.tiers else None,
+            'stages': self.metrics.stage_report(),
+            'slowest_domains': self.metrics.slowest_domains(),
+            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S')
+        }
+    
+    @classmethod
+    def _write_summary(cls, report: Dict[str, Any], summary_path: Path):
+        """Write a summary report as text to summary_path and as JSON next to it."""
+        # Merged reports can lack figures (e.g. shards without a summary); those count as 0
+        bookmarks = report.get('bookmarks', {})
+        total = bookmarks.get('total', 0)
+        completed = bookmarks.get('completed', 0)
+        failed = bookmarks.get('failed', 0)
+        net = defaultdict(int, report.get('network', {}))
+        duplicates = defaultdict(int, report.get('duplicates', {}))
+        ai_stats = defaultdict(int, report.get('ai', {}))
+        
+        cascade = ''
+        if report.get('escalation'):
+            reasons = ', '.join(f"{reason} {count}" for reason, count in
+                                sorted(report['escalation']['reasons'].items(), key=lambda item: -item[1]))
+            cascade = f"\nModel cascade escalation rate: {report['escalation']['rate'] * 100:.1f}% ({reasons or 'no escalations'})\n"
+            cascade += '\n'.join(
+                f"  {tier['tier']}: {tier['articles']} articles, {tier['escalated']} escalated "
+                f"({tier['escalation_rate'] * 100:.1f}%), {tier['latency']:.2f}s per article, "
+                f"{tier['input_tokens']} input / {tier['output_tokens']} output tokens, ${tier['cost']:.4f}"
+                for tier in report['cascade']
+            )
+        
+        timings = '\n'.join(
+            f"  {stage}: {timing['p50']:.3f} / {timing['p95']:.3f} / {timing['p99']:.3f} ({timing['count']} bookmarks)"
+            for stage, timing in report.get('stages', {}).items()
+        ) or '  (no bookmarks processed)'
+        domains = '\n'.join(
+            f"  {domain['domain']}: {domain['mean']:.3f}s ({domain['bookmarks']} bookmarks)"
+            for domain in report.get('slowest_domains', [])
+        ) or '  (no downloads)'
+        
+        summary = f"""Bookmark Processing Summary
 ============================
 Total bookmarks: {total}
 Successfully processed: {completed}
 Failed: {failed}
-Success rate: {(completed/total*100):.1f}%
+Success rate: {(completed / total * 100 if total else 0.0):.1f}%
+
+Network requests: {net['requests']} ({net['bytes_downloaded']} bytes)
+Re-downloads avoided: {net['requests_saved']} ({net['bytes_saved']} bytes)
+Content cache hits: {net['cache_hits']} (revalidated: {net['cache_revalidated']})
+Skipped URLs: {net['skipped']} (pages truncated at max_bytes: {net['truncated']})
+Fetch failures: {cls._failure_breakdown(report.get('failures', {}))} (known failures skipped: {net['known_failures']})
+Transport retries: {net['retries']}
+Duplicate URLs collapsed: {duplicates['duplicate_rows']} (saved {duplicates['fetches_saved']} fetches, {duplicates['llm_calls_saved']} LLM calls)
+Near-duplicate content reused: {duplicates['near_duplicates']} articles (saved {duplicates['near_duplicates']} LLM calls)
+AI requests: {ai_stats['requests']} ({ai_stats['requests'] / max(completed, 1) * 100:.1f} per 100 bookmarks, {ai_stats['batch_retries']} batch retries)
+AI response cache: {ai_stats['cache_hits']} hits, {ai_stats['cache_misses']} misses
+Prompt content tokens: {ai_stats['content_tokens_sent']} sent of {ai_stats['content_tokens']} extracted ({(ai_stats['content_tokens'] - ai_stats['content_tokens_sent']) / max(ai_stats['articles'], 1):.0f} saved per article, {report.get('condense_method', '')})
+AI invalid responses: {ai_stats['invalid']} of {ai_stats['validated']} ({ai_stats['invalid'] / max(ai_stats['validated'], 1) * 100:.1f}% failure rate; re-asks: {ai_stats['reasks']}, fixed: {ai_stats['reasks_fixed']})
+AI rate limited (429): {ai_stats['rate_limited']} (retries: {ai_stats['retries']})
+AI batch API items: {ai_stats['batch_api_items']} (failed: {ai_stats['batch_api_failed']}){cascade}
 
-Generated at: {time.strftime('%Y-%m-%d %H:%M:%S')}
+Stage timings in seconds (p50 / p95 / p99):
+{timings}
+Slowest domains (mean download time):
+{domains}
+
+Generated at: {report.get('generated_at', time.strftime('%Y-%m-%d %H:%M:%S'))}
 """
-            
-            with open(summary_path, 'w') as f:
-                f.write(summary)
-                
-        except Exception as e:
-            logger.error(f"Failed to save summary: {e}")
\ No newline at end of file
+        
+        with open(summary_path, 'w') as f:
+            f.write(summary)
+        
+        # The same figures for scripts and dashboards, e.g. enriched_summary.json
+        with open(summary_path.with_suffix('.json'), 'w') as f:
+            json.dump(report, f, indent=2)
+    
+    @classmethod
+    def merge_shards(cls, input_path: Path, shard_outputs: List[Path], output_path: Path, output_format: str = 'csv'):
+        """
+        Combine the outputs of a sharded run (--shard i/N for i = 1..N, in that
+        order) into one output in the input's row order, with a summary of all shards.
+        
+        Each input row is taken from its shard's output, whose rows are in input
+        order too. A shard output that is missing rows or has other URLs (e.g. an
+        unfinished run or the outputs listed in the wrong order) raises ValueError.
+        """
+        df = cls._load_csv(input_path)
+        if df is None:
+            raise ValueError(f"Could not read input file: {input_path}")
+        
+        count = len(shard_outputs)
+        assigned = df['url'].map(lambda url: shard_of(url, count))
+        parts = []
+        for index, path in enumerate(shard_outputs, start=1):
+            part = cls._read_output(path, output_format)
+            rows = df.index[assigned == index]
+            if len(part) != len(rows):
+                raise ValueError(f"{path} has {len(part)} rows but shard {index}/{count} of {input_path} has "
+                                 f"{len(rows)}; is the shard run finished?")
+            expected = df.loc[rows, 'url'].fillna('').astype(str).to_numpy()
+            if (part['url'].to_numpy() != expected).any():
+                raise ValueError(f"{path} is not the output of shard {index}/{count} of {input_path}")
+            part.index = rows
+            parts.append(part)
+        
+        merged = pd.concat(parts).sort_index()
+        cls._write_dataframe(merged, output_path, output_format)
+        logger.info(f"Merged {count} shards: {len(merged)} rows written to {output_path}")
+        
+        reports = []
+        for path in shard_outputs:
+            summary = path.parent / f"{path.stem}_summary.json"
+            if summary.exists():
+                with open(summary) as f:
+                    reports.append(json.load(f))
+            else:
+                logger.warning(f"No summary {summary}; its figures are missing from the merged summary")
+        if not reports:
+            logger.warning("No shard summaries found; the merged summary is not written")
+            return
+        report = merge_reports(reports, [RunMetrics.path_for(path) for path in shard_outputs])
+        cls._write_summary(report, output_path.parent / f"{output_path.stem}_summary.txt")
+    
+    @staticmethod
+    def _read_output(output_path: Path, output_format: str = 'csv') -> pd.DataFrame:
+        """Read an output file written by _write_dataframe back as strings, exactly as written."""
+        from config import CSV_CONFIG, TSV_CONFIG
+        
+        config = TSV_CONFIG if output_format == 'tsv' else CSV_CONFIG
+        return pd.read_csv(
+            output_path,
+            sep=config['delimiter'],
+            quotechar=config['quotechar'],
+            escapechar=config.get('escape_char') if config['quoting'] == 'none' else None,
+            dtype=str,
+            keep_default_na=False
+        )
@@ -0,0 +1,92 @@
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Any, Iterator
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ('always', 'batch', 'never')
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of processed bookmarks.
+
+    Each processed row is written once as a single line, so checkpoint cost does
+    not grow with the size of the run and a crash can at worst leave a truncated
+    last line, which replay skips. The fsync policy controls durability: 'always'
+    syncs every entry, 'batch' every `fsync_every` entries, 'never' leaves it to
+    the OS.
+    """
+
+    def __init__(self, path: Path, fsync: str = 'batch', fsync_every: int = 10):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unsupported checkpoint fsync policy: {fsync}")
+
+        self.path = Path(path)
+        self.fsync = fsync
+        self.fsync_every = max(1, fsync_every)
+        self._file = None
+        self._unsynced = 0
+
+    def open(self, resume: bool = False):
+        """Open the journal for appending; without resume any previous journal is discarded."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        self._unsynced = 0
+
+        # Terminate a line truncated by a crash so the next entry starts cleanly
+        if resume and self.path.stat().st_size:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+
+    def append(self, entry: Dict[str, Any]):
+        """Write one processed row."""
+        self._file.write(json.dumps(entry, default=str) + '\n')
+        self._unsynced += 1
+
+        if self.fsync == 'always' or (self.fsync == 'batch' and self._unsynced >= self.fsync_every):
+            self.sync()
+
+    def sync(self):
+        """Flush buffered entries and fsync them to disk."""
+        if self._file is None:
+            return
+        self._file.flush()
+        if self.fsync != 'never':
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def replay(self) -> Iterator[Dict[str, Any]]:
+        """Yield the journaled entries in write order, skipping corrupt lines."""
+        if not self.path.exists():
+            return
+
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    logger.warning(f"Skipping corrupt checkpoint entry at {self.path}:{line_number}")
+
+    @staticmethod
+    def path_for(output_path: Path) -> Path:
+        """Journal location for an output file, e.g. enriched.csv -> enriched.journal.jsonl."""
+        return output_path.parent / f"{output_path.stem}.journal.jsonl"
@@ -0,0 +1,142 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Optional, Dict, Any, NamedTuple
+
+from .utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry(NamedTuple):
+    """A cached page and the content extracted from it."""
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    html: bytes
+    content: Dict[str, Any]
+    fetched_at: float
+
+
+class ContentCache:
+    """
+    Persistent SQLite cache of downloaded pages keyed by normalized URL.
+
+    Entries younger than the TTL are served without any network I/O. Older entries
+    are revalidated with If-None-Match / If-Modified-Since. When the stored size
+    exceeds the cap, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path: Path, ttl_seconds: float, max_bytes: int):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    html BLOB,
+                    content TEXT,
+                    size INTEGER,
+                    fetched_at REAL,
+                    accessed_at REAL
+                )
+            """)
+            self._conn.execute('CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at)')
+            # Stored bytes, kept up to date by put and _evict so writes don't sum the table
+            self._total = self._stored_bytes()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Return the cached entry for a URL (fresh or stale), or None."""
+        key = normalize_url(url)
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    'SELECT etag, last_modified, html, content, fetched_at FROM pages WHERE url = ?', (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute('UPDATE pages SET accessed_at = ? WHERE url = ?', (time.time(), key))
+
+            etag, last_modified, html, content, fetched_at = row
+            return CacheEntry(key, etag, last_modified, zlib.decompress(html), json.loads(content), fetched_at)
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            logger.warning(f"Content cache read failed for {url}: {e}")
+            return None
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        """Whether an entry can be used without revalidation."""
+        return time.time() - entry.fetched_at < self.ttl_seconds
+
+    def revalidation_headers(self, entry: CacheEntry) -> Dict[str, str]:
+        """Conditional request headers for a stale entry."""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def put(self, url: str, html: bytes, headers: Dict[str, str], content: Dict[str, Any]):
+        """Store a downloaded page and its extracted content."""
+        key = normalize_url(url)
+        try:
+            blob = zlib.compress(html)
+            content_json = json.dumps(content, default=str)
+            size = len(blob) + len(content_json)
+            now = time.time()
+
+            with self._lock, self._conn:
+                replaced = self._conn.execute('SELECT size FROM pages WHERE url = ?', (key,)).fetchone()
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    (key, headers.get('ETag'), headers.get('Last-Modified'), blob, content_json, size, now, now)
+                )
+                self._total += size - (replaced[0] if replaced else 0)
+                if self._total > self.max_bytes:
+                    self._evict()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Content cache write failed for {url}: {e}")
+
+    def refresh(self, url: str):
+        """Mark an entry as fresh again after a 304 Not Modified."""
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    'UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?', (now, now, normalize_url(url))
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Content cache refresh failed for {url}: {e}")
+
+    def _stored_bytes(self) -> int:
+        return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+
+    def _evict(self):
+        """Drop least recently used entries until the cache fits its size cap. Caller holds the lock."""
+        # Recount: other processes (e.g. shard runs) may share the cache file
+        total = self._stored_bytes()
+        if total <= self.max_bytes:
+            self._total = total
+            return
+
+        evicted = 0
+        for url, size in self._conn.execute('SELECT url, size FROM pages ORDER BY accessed_at').fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+            total -= size
+            evicted += 1
+        self._total = total
+        logger.debug(f"Evicted {evicted} entries from content cache")
@@ -0,0 +1,234 @@
+import logging
+import math
+import re
+from collections import Counter
+from typing import List, NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONDENSE_METHODS = ('textrank', 'tfidf', 'head')
+
+# Passages that are page chrome rather than article text
+BOILERPLATE_PATTERN = re.compile(
+    r'\b(cookies?|subscribe|subscription|newsletter|sign up|log ?in|advertisement|all rights reserved|'
+    r'privacy policy|terms of (use|service)|share this|follow us|read more|related articles|'
+    r'click here|accept all|enable javascript)\b',
+    re.IGNORECASE
+)
+BOILERPLATE_MAX_WORDS = 40  # longer passages that mention e.g. "cookies" are kept
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+(?=["\'“(A-Z0-9])')
+WORD_PATTERN = re.compile(r"[a-z0-9][a-z0-9'-]*")
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers him his how i if in into is it its itself just me more most my no nor not now of off on
+once only or other our ours out over own same she should so some such than that the their theirs them then
+there these they this those through to too under until up very was we were what when where which while who
+whom why will with would you your yours
+""".split())
+
+MAX_PASSAGES = 150  # adjacent passages are merged above this, keeping the similarity graph small
+DAMPING = 0.85
+ITERATIONS = 30
+
+
+class CondensedContent(NamedTuple):
+    """Article text selected for the prompt and its size before and after, in tokens."""
+    text: str
+    original_tokens: int
+    tokens: int
+
+
+class TokenCounter:
+    """
+    Counts tokens with tiktoken when it is installed and its encoding can be loaded.
+
+    Falls back to the usual ~4 characters per token estimate otherwise. tiktoken
+    is exact for OpenAI models and a close approximation for other providers.
+    """
+
+    def __init__(self, model: str = ''):
+        self.name = 'approximate'
+        self._encoding = None
+        try:
+            import tiktoken
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding('cl100k_base')
+            self.name = f"tiktoken/{self._encoding.name}"
+        except ImportError:
+            pass
+        except Exception as e:
+            # tiktoken downloads its encodings on first use
+            logger.debug(f"tiktoken encoding unavailable, estimating tokens: {e}")
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return (len(text) + 3) // 4
+
+
+class ContentCondenser:
+    """
+    Selects the most informative passages of an article for the AI prompt.
+
+    The text is split into paragraphs (or sentences when the extractor returned a
+    single block), boilerplate such as cookie banners and newsletter prompts is
+    dropped, and the remaining passages are scored. The best passages are packed
+    into `token_budget` tokens and returned in their original order.
+
+    Methods:
+        textrank: PageRank over the TF-IDF cosine similarity graph of the passages,
+                  biased towards the lead, so passages central to the article win
+        tfidf:    similarity of each passage to the whole article and to the title
+        head:     passages from the top until the budget is full
+    """
+
+    def __init__(self, token_budget: int, method: str = 'textrank', model: str = ''):
+        if method not in CONDENSE_METHODS:
+            raise ValueError(f"Unsupported condense method: {method} (choose from {', '.join(CONDENSE_METHODS)})")
+
+        self.token_budget = max(1, token_budget)
+        self.method = method
+        self.tokenizer = TokenCounter(model)
+
+    def condense(self, title: str, text: str) -> CondensedContent:
+        """Fit the article text into the token budget."""
+        original_tokens = self.tokenizer.count(text)
+        if original_tokens <= self.token_budget:
+            return CondensedContent(text, original_tokens, original_tokens)
+
+        try:
+            passages = self._passages(text)
+            if self.method == 'head':
+                condensed = self._pack_head(passages)
+            else:
+                vectors, idf = self._vectors(passages)
+                condensed = self._pack(passages, self._score(title, vectors, idf), vectors)
+        except Exception as e:
+            logger.warning(f"Content condensing failed, sending the head of the text: {e}")
+            condensed = ''
+
+        if not condensed:
+            condensed = self._truncate(text, self.token_budget)
+        return CondensedContent(condensed, original_tokens, self.tokenizer.count(condensed))
+
+    def _passages(self, text: str) -> List[str]:
+        """Split the text into paragraphs, or into sentences if there are too few paragraphs."""
+        passages = [line.strip() for line in text.split('\n') if line.strip()]
+        if len(passages) < 3:
+            passages = [sentence for passage in passages for sentence in SENTENCE_SPLIT.split(passage)]
+
+        passages = [passage for passage in passages
+                    if not (BOILERPLATE_PATTERN.search(passage) and len(passage.split()) <= BOILERPLATE_MAX_WORDS)]
+
+        group = math.ceil(len(passages) / MAX_PASSAGES)
+        if group > 1:
+            passages = [' '.join(passages[i:i + group]) for i in range(0, len(passages), group)]
+        return passages
+
+    def _vectors(self, passages: List[str]) -> Tuple[List[dict], dict]:
+        """TF-IDF vectors of the passages, treating each passage as a document, and the IDF table."""
+        terms = [self._terms(passage) for passage in passages]
+        document_frequency = Counter(term for passage_terms in terms for term in set(passage_terms))
+        idf = {term: math.log(len(passages) / count) + 1 for term, count in document_frequency.items()}
+        return [self._tfidf(passage_terms, idf) for passage_terms in terms], idf
+
+    def _score(self, title: str, vectors: List[dict], idf: dict) -> List[float]:
+        """Relevance score per passage (higher is more informative)."""
+        heading = self._tfidf(self._terms(title), idf)
+        title_similarity = [self._similarity(vector, heading) for vector in vectors]
+
+        if self.method == 'tfidf':
+            article = self._tfidf([term for vector in vectors for term in vector], idf)
+            return [self._similarity(vector, article) + similarity
+                    for vector, similarity in zip(vectors, title_similarity)]
+
+        # TextRank with a personalised jump: the lead and passages about the title's
+        # subject usually carry the article, so the random walk restarts there
+        count = len(vectors)
+        prior = [(1 + 2 * similarity) / math.sqrt(i + 1) for i, similarity in enumerate(title_similarity)]
+        total = sum(prior)
+        prior = [weight / total for weight in prior]
+
+        neighbours = [[] for _ in range(count)]
+        for i in range(count):
+            for j in range(i + 1, count):
+                weight = self._similarity(vectors[i], vectors[j])
+                if weight:
+                    neighbours[i].append((j, weight))
+                    neighbours[j].append((i, weight))
+        out_weight = [sum(weight for _, weight in edges) or 1.0 for edges in neighbours]
+
+        scores = prior[:]
+        for _ in range(ITERATIONS):
+            incoming = [0.0] * count
+            for i, edges in enumerate(neighbours):
+                share = scores[i] / out_weight[i]
+                for j, weight in edges:
+                    incoming[j] += share * weight
+            scores = [(1 - DAMPING) * prior[j] + DAMPING * incoming[j] for j in range(count)]
+        return scores
+
+    def _pack(self, passages: List[str], scores: List[float], vectors: List[dict]) -> str:
+        """
+        Greedily fill the budget with the best passages, in document order.
+
+        Each pick is discounted by its similarity to the passages already chosen
+        (maximal marginal relevance), so near-duplicate passages don't crowd out
+        the rest of the article.
+        """
+        tokens = [self.tokenizer.count(passage) + 1 for passage in passages]  # plus the separator
+        redundancy = [0.0] * len(passages)
+        candidates = set(range(len(passages)))
+        chosen, remaining = [], self.token_budget
+
+        while candidates:
+            best = max(candidates, key=lambda i: scores[i] * (1 - redundancy[i]))
+            candidates.discard(best)
+            if tokens[best] > remaining:
+                continue
+
+            chosen.append(best)
+            remaining -= tokens[best]
+            for i in candidates:
+                redundancy[i] = max(redundancy[i], self._similarity(vectors[i], vectors[best]))
+        return '\n'.join(passages[i] for i in sorted(chosen))
+
+    def _pack_head(self, passages: List[str]) -> str:
+        """Passages from the top until the budget is full."""
+        chosen, remaining = [], self.token_budget
+        for passage in passages:
+            tokens = self.tokenizer.count(passage) + 1
+            if tokens > remaining:
+                break
+            chosen.append(passage)
+            remaining -= tokens
+        return '\n'.join(chosen)
+
+    def _truncate(self, text: str, tokens: int) -> str:
+        """Cut the text to roughly `tokens` tokens at a word boundary."""
+        cut = text[:tokens * 4]
+        while cut and self.tokenizer.count(cut) > tokens:
+            cut = cut[:int(len(cut) * 0.9)]
+        return cut.rsplit(' ', 1)[0] if ' ' in cut else cut
+
+    @staticmethod
+    def _terms(text: str) -> List[str]:
+        return [word for word in WORD_PATTERN.findall(text.lower()) if len(word) > 2 and word not in STOPWORDS]
+
+    @staticmethod
+    def _tfidf(terms: List[str], idf) -> dict:
+        """Unit-length TF-IDF vector, so the dot product of two vectors is their cosine similarity."""
+        weights = {term: count * idf.get(term, 1.0) for term, count in Counter(terms).items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        return {term: weight / norm for term, weight in weights.items()} if norm else {}
+
+    @staticmethod
+    def _similarity(a: dict, b: dict) -> float:
+        if len(a) > len(b):
+            a, b = b, a
+        return sum(weight * b[term] for term, weight in a.items() if term in b)
@@ -1,131 +1,367 @@
 import requests
-import time
-from bs4 import BeautifulSoup
-from newspaper import Article
 import logging
-from typing import Optional, Dict, Any
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional, Dict, Any, NamedTuple, Iterator, Tuple
 
-from config import USER_AGENT, REQUEST_DELAY, REQUEST_TIMEOUT
+from config import (USER_AGENT, REQUEST_DELAY, REQUEST_TIMEOUT, MAX_RETRIES, CONTENT_CACHE_CONFIG, HTML_PARSER,
+                    MAX_PAGE_BYTES, ALLOWED_CONTENT_TYPES, FETCH_PREFLIGHT, TRANSPORT_CONFIG, NEGATIVE_CACHE_CONFIG)
+from .content_cache import ContentCache
+from .failure_cache import (FailureCache, classify_exception, classify_response, FAILURE_NON_HTML,
+                            FAILURE_NO_CONTENT)
+from .html_parsers import get_parser
+from .http_transport import HttpTransport
+from .rate_limiter import HostRateLimiter
 
 logger = logging.getLogger(__name__)
 
+# Parser backends by name, created once per process
+_parsers: Dict[str, Any] = {}
+
+# Reason codes for URLs that are skipped rather than fetched (output column skip_reason)
+SKIP_NON_HTML = 'non_html'
+SKIP_KNOWN_FAILURE = 'known_failure'  # failed on an earlier run and its retry window is still open
+
+
+class FetchedPage(NamedTuple):
+    """A downloaded page on its way to the parse stage; `content` is set for cache hits."""
+    url: str
+    html: Optional[bytes]
+    headers: Dict[str, str]
+    encoding: Optional[str]
+    content: Optional[Dict[str, Any]]
+
+
+def extract_page(url: str, html: bytes, headers: Dict[str, str], encoding: Optional[str],
+                 parser_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract content from downloaded HTML.
+    
+    Module-level and free of shared state, so it can run in a worker process:
+    only the raw bytes go in and only the small extracted dict comes out.
+    """
+    # Imported on first use: newspaper3k pulls in nltk and lxml, and cached pages never get here
+    from newspaper import Article
+    from newspaper.network import get_html
+    
+    # Rebuild the response so newspaper3k decodes the page exactly as when fetched
+    response = requests.Response()
+    response._content = html
+    response.headers.update(headers)
+    response.encoding = encoding
+    response.status_code = 200
+    response.url = url
+    
+    # Try newspaper3k first (better for articles)
+    try:
+        # Image fetching would download the page's images with bare requests.get calls
+        article = Article(url, fetch_images=False)
+        article.download(input_html=get_html(url, response=response))
+        article.parse()
+        
+        if article.text and len(article.text.strip()) > 100:
+            # Try to get publisher from newspaper3k or URL
+            publisher = ContentExtractor._extract_publisher_from_url(url)
+            
+            return {
+                'title': article.title or '',
+                'text': article.text,
+                'authors': article.authors,
+                'publisher': publisher,
+                'publish_date': article.publish_date,
+                'method': 'newspaper'
+            }
+    except Exception as e:
+        logger.debug(f"Newspaper extraction failed for {url}: {e}")
+    
+    # Fallback to the HTML parser on the same HTML
+    if parser_name not in _parsers:
+        _parsers[parser_name] = get_parser(parser_name)
+    parser = _parsers[parser_name]
+    
+    page = parser.parse(html)
+    text = page.text
+    
+    if text and len(text.strip()) > 50:
+        return {
+            'title': page.title,
+            'text': text,
+            'authors': [page.author] if page.author else [],
+            'publisher': page.publisher or ContentExtractor._extract_publisher_from_url(url),
+            'publish_date': None,
+            'method': parser.name
+        }
+    
+    logger.warning(f"Insufficient content extracted from {url}")
+    return None
+
+
+def extract_page_timed(url: str, html: bytes, headers: Dict[str, str], encoding: Optional[str],
+                       parser_name: str) -> Tuple[Optional[Dict[str, Any]], float]:
+    """extract_page for the parse workers, also returning the seconds it took in the worker."""
+    start = time.perf_counter()
+    content = extract_page(url, html, headers, encoding, parser_name)
+    return content, time.perf_counter() - start
+
+
 class ContentExtractor:
     """Extracts and processes web content from URLs."""
     
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({'User-Agent': USER_AGENT})
+        self.transport = HttpTransport(USER_AGENT, MAX_RETRIES, TRANSPORT_CONFIG)
+        self.session = self.transport.session
+        self.rate_limiter = HostRateLimiter(REQUEST_DELAY)
+        _parsers[HTML_PARSER] = self.parser = get_parser(HTML_PARSER)
+        
+        self.cache = None
+        if CONTENT_CACHE_CONFIG.get('enabled'):
+            self.cache = ContentCache(
+                path=Path(CONTENT_CACHE_CONFIG.get('path', '.cache/content.sqlite3')),
+                ttl_seconds=CONTENT_CACHE_CONFIG.get('ttl_hours', 168) * 3600,
+                max_bytes=int(CONTENT_CACHE_CONFIG.get('max_size_mb', 500) * 1024 * 1024)
+            )
+        
+        self.failure_cache = None
+        if NEGATIVE_CACHE_CONFIG.get('enabled'):
+            self.failure_cache = FailureCache(
+                path=Path(NEGATIVE_CACHE_CONFIG.get('path', '.cache/failures.sqlite3')),
+                retry_after_hours=NEGATIVE_CACHE_CONFIG.get('retry_after_hours')
+            )
+        
+        # Per-run network counters; *_saved counts the fallback re-downloads avoided
+        self.stats = {'requests': 0, 'bytes_downloaded': 0, 'requests_saved': 0, 'bytes_saved': 0,
+                      'cache_hits': 0, 'cache_revalidated': 0, 'skipped': 0, 'truncated': 0, 'retries': 0,
+                      'known_failures': 0}
+        self.skip_reasons: Dict[str, str] = {}
+        self.failures: Dict[str, str] = {}  # url -> failure class, until popped for the output
+        self.failure_counts: Dict[str, int] = {}
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+    
+    @contextmanager
+    def traced(self) -> Iterator[Dict[str, Any]]:
+        """
+        Collect what the calls in the block do on this thread: the network counters
+        they add and the seconds spent in the rate_limit_wait, download and parse
+        stages.
+        """
+        trace = self._local.trace = {}
+        try:
+            yield trace
+        finally:
+            self._local.trace = None
     
     def extract_content(self, url: str) -> Optional[Dict[str, Any]]:
         """
         Extract content from a URL.
         
+        The page is downloaded once through the shared session; the same HTML is
+        handed to newspaper3k and, if that yields too little text, to the configured
+        HTML parser. Pages in the content cache are served without a request while
+        fresh and revalidated with a conditional GET once stale.
+        
         Returns:
             Dict with 'title', 'text', 'authors', 'publish_date' or None if failed
         """
+        page = self.fetch_page(url)
+        if page is None or page.content is not None:
+            return page.content if page else None
+        
+        start = time.perf_counter()
         try:
-            # Add delay to be respectful
-            time.sleep(REQUEST_DELAY)
-            
-            # Try newspaper3k first (better for articles)
-            try:
-                article = Article(url)
-                article.download()
-                article.parse()
-                
-                if article.text and len(article.text.strip()) > 100:
-                    # Try to get publisher from newspaper3k or URL
-                    publisher = self._extract_publisher_from_url(url)
-                    
-                    return {
-                        'title': article.title or '',
-                        'text': article.text,
-                        'authors': article.authors,
-                        'publisher': publisher,
-                        'publish_date': article.publish_date,
-                        'method': 'newspaper'
-                    }
-            except Exception as e:
-                logger.debug(f"Newspaper extraction failed for {url}: {e}")
-            
-            # Fallback to BeautifulSoup
-            response = self.session.get(url, timeout=REQUEST_TIMEOUT)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract title
-            title_elem = soup.find('title')
-            title = title_elem.get_text().strip() if title_elem else ''
-            
-            # Extract author and publisher
-            author = self._extract_author(soup)
-            publisher = self._extract_publisher(soup, url)
+            content = extract_page(page.url, page.html, page.headers, page.encoding, HTML_PARSER)
+        except Exception as e:
+            logger.error(f"Content extraction failed for {url}: {e}")
+            content = None
+        self._record_time('parse', time.perf_counter() - start)
+        return self.store_page(page, content)
+    
+    def fetch_page(self, url: str) -> Optional[FetchedPage]:
+        """
+        Download a page without parsing it (the network half of extract_content).
+        
+        The body is streamed and downloading stops after MAX_PAGE_BYTES. Responses
+        whose Content-Type is not HTML are dropped before the body is read and the
+        URL is recorded in skip_reasons; with FETCH_PREFLIGHT 'head' that check
+        happens on a HEAD request before the GET.
+        
+        Failures are classified (see failure_cache) and remembered in the negative
+        cache; a URL whose failure is still within its retry window is skipped
+        without a request.
+        
+        Returns:
+            FetchedPage with the raw HTML, with `content` already set when the page
+            was served from the cache, or None if the request failed or was skipped
+        """
+        try:
+            known = self.failure_cache.get(url) if self.failure_cache else None
+            if known:
+                logger.debug(f"Skipping {url} ({known.failure_class} on an earlier run: {known.detail})")
+                self._record_stats(known_failures=1)
+                with self._stats_lock:
+                    self.skip_reasons[url] = SKIP_KNOWN_FAILURE
+                    self.failures[url] = known.failure_class
+                return None
             
-            # Extract main content
-            text = self._extract_main_text(soup)
+            cached = self.cache.get(url) if self.cache else None
+            if cached and self.cache.is_fresh(cached):
+                self._record_stats(cache_hits=1)
+                return FetchedPage(url, None, {}, None, cached.content)
             
-            if text and len(text.strip()) > 50:
-                return {
-                    'title': title,
-                    'text': text,
-                    'authors': [author] if author else [],
-                    'publisher': publisher,
-                    'publish_date': None,
-                    'method': 'beautifulsoup'
-                }
+            # Add per-host delay to be respectful
+            start = time.perf_counter()
+            self.rate_limiter.wait(url)
+            self._record_time('rate_limit_wait', time.perf_counter() - start)
             
-            logger.warning(f"Insufficient content extracted from {url}")
-            return None
+            start = time.perf_counter()
+            self.transport.take_retries()
+            try:
+                return self._download(url, cached)
+            finally:
+                self._record_time('download', time.perf_counter() - start)
+                self._record_stats(retries=self.transport.take_retries())
             
         except requests.RequestException as e:
-            logger.error(f"Request failed for {url}: {e}")
+            self._fail(url, classify_exception(e), str(e))
             return None
         except Exception as e:
             logger.error(f"Content extraction failed for {url}: {e}")
             return None
     
-    def _extract_publisher(self, soup: BeautifulSoup, url: str) -> str:
-        """Extract publisher information from HTML soup and URL."""
-        
-        # Common publisher selectors
-        publisher_selectors = [
-            'meta[property="og:site_name"]',
-            'meta[name="application-name"]',
-            'meta[name="publisher"]',
-            '.site-name',
-            '.publisher',
-            '.source',
-            '[itemprop="publisher"]'
-        ]
-        
-        for selector in publisher_selectors:
-            publisher_elem = soup.select_one(selector)
-            if publisher_elem:
-                if publisher_elem.name == 'meta':
-                    publisher = publisher_elem.get('content', '').strip()
-                else:
-                    publisher = publisher_elem.get_text(strip=True)
-                
-                if publisher and len(publisher) < 100:  # Reasonable publisher name length
-                    return publisher
-        
-        # Fallback: extract from URL domain
+    def _download(self, url: str, cached) -> Optional[FetchedPage]:
+        """The requests of fetch_page: optional HEAD preflight, then the (conditional) GET."""
+        if FETCH_PREFLIGHT == 'head' and self._preflight(url):
+            return None
+        
+        headers = self.cache.revalidation_headers(cached) if cached else {}
+        if FETCH_PREFLIGHT == 'range':
+            headers['Range'] = f"bytes=0-{MAX_PAGE_BYTES - 1}"
+        
+        with self.session.get(url, timeout=REQUEST_TIMEOUT, headers=headers, stream=True) as response:
+            if cached and response.status_code == 304:
+                self._record_stats(requests=1, cache_revalidated=1)
+                self.cache.refresh(url)
+                return FetchedPage(url, None, {}, None, cached.content)
+            
+            if response.ok and not self._is_html(response):
+                self._record_stats(requests=1)
+                self._skip(url, SKIP_NON_HTML, response.headers.get('Content-Type'))
+                return None
+            
+            html = self._read_capped(response)
+            self._record_stats(requests=1, bytes_downloaded=len(html))
+            if not response.ok:
+                self._fail(url, classify_response(response, html), f"HTTP {response.status_code} {response.reason}")
+                return None
+        
+        return FetchedPage(url, html, dict(response.headers), response.encoding, None)
+    
+    def close(self):
+        """Close the HTTP session (and release the DNS cache)."""
+        self.transport.close()
+    
+    def pop_skip_reason(self, url: str) -> str:
+        """Reason code for a URL that was skipped rather than fetched, or ''."""
+        with self._stats_lock:
+            return self.skip_reasons.pop(url, '')
+    
+    def pop_failure_class(self, url: str) -> str:
+        """Failure class of a URL that yielded no content (see failure_cache), or ''."""
+        with self._stats_lock:
+            return self.failures.pop(url, '')
+    
+    def _preflight(self, url: str) -> bool:
+        """Send a HEAD request and skip the URL if it is not HTML. Returns True if skipped."""
         try:
-            from urllib.parse import urlparse
-            domain = urlparse(url).netloc
-            # Remove www. and common subdomains
-            domain = domain.replace('www.', '').replace('m.', '')
-            # Convert domain to title case
-            if '.' in domain:
-                publisher = domain.split('.')[0].title()
-                return publisher
-        except:
-            pass
+            response = self.session.head(url, timeout=REQUEST_TIMEOUT, allow_redirects=True)
+        except requests.RequestException as e:
+            logger.debug(f"HEAD request failed for {url}, falling back to GET: {e}")
+            return False
         
-        return ''
+        self._record_stats(requests=1)
+        # Servers that reject HEAD are checked on the GET instead
+        if response.ok and not self._is_html(response):
+            self._skip(url, SKIP_NON_HTML, response.headers.get('Content-Type'))
+            return True
+        return False
+    
+    def _is_html(self, response: requests.Response) -> bool:
+        """Whether a response's Content-Type is one of ALLOWED_CONTENT_TYPES (a missing type is allowed)."""
+        content_type = response.headers.get('Content-Type', '').split(';')[0].strip().lower()
+        return not content_type or content_type in ALLOWED_CONTENT_TYPES
+    
+    def _read_capped(self, response: requests.Response) -> bytes:
+        """Read a streamed body, stopping after MAX_PAGE_BYTES."""
+        chunks, size = [], 0
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= MAX_PAGE_BYTES:
+                self._record_stats(truncated=1)
+                logger.debug(f"Stopped downloading {response.url} after {MAX_PAGE_BYTES} bytes")
+                break
+        return b''.join(chunks)[:MAX_PAGE_BYTES]
+    
+    def _skip(self, url: str, reason: str, detail: Optional[str] = None):
+        """Record a URL that is deliberately not fetched or parsed."""
+        logger.info(f"Skipping {url} ({reason}{': ' + detail if detail else ''})")
+        with self._stats_lock:
+            self.skip_reasons[url] = reason
+            self.stats['skipped'] += 1
+        if reason == SKIP_NON_HTML:
+            self._remember_failure(url, FAILURE_NON_HTML, detail or '')
+    
+    def _fail(self, url: str, failure_class: str, detail: str):
+        """Log and record a failed fetch."""
+        logger.warning(f"Fetch failed for {url} ({failure_class}): {detail}")
+        self._remember_failure(url, failure_class, detail)
+    
+    def _remember_failure(self, url: str, failure_class: str, detail: str):
+        """Record the failure class of a URL for the output and the negative cache."""
+        with self._stats_lock:
+            self.failures[url] = failure_class
+            self.failure_counts[failure_class] = self.failure_counts.get(failure_class, 0) + 1
+        if self.failure_cache:
+            self.failure_cache.put(url, failure_class, detail)
     
-    def _extract_publisher_from_url(self, url: str) -> str:
+    def store_page(self, page: FetchedPage, content: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Record the outcome of parsing a fetched page and cache it (the bookkeeping half of extract_content)."""
+        if not content or content.get('method') != 'newspaper':
+            # The fallback parser ran on the same HTML - this used to be a second download
+            self._record_stats(requests_saved=1, bytes_saved=len(page.html))
+        
+        if not content:
+            # Paywalls, JavaScript-only pages and the like
+            self._remember_failure(page.url, FAILURE_NO_CONTENT, "insufficient text extracted")
+            return content
+        
+        if self.cache:
+            self.cache.put(page.url, page.html, page.headers, content)
+        if self.failure_cache:
+            self.failure_cache.clear(page.url)
+        return content
+    
+    def _record_stats(self, **increments: int):
+        """Add to the per-run network counters (safe to call from fetch workers)."""
+        with self._stats_lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+        
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            for key, value in increments.items():
+                trace[key] = trace.get(key, 0) + value
+    
+    def _record_time(self, stage: str, seconds: float):
+        """Add the seconds spent in a stage to the trace of this thread, if one is active."""
+        trace = getattr(self._local, 'trace', None)
+        if trace is not None:
+            trace[stage] = trace.get(stage, 0.0) + seconds
+    
+    @staticmethod
+    def _extract_publisher_from_url(url: str) -> str:
         """Extract publisher from URL domain as fallback."""
         try:
             from urllib.parse import urlparse
@@ -139,66 +375,3 @@ class ContentExtractor:
         except:
             pass
         return ''
-    
-    def _extract_author(self, soup: BeautifulSoup) -> str:
-        """Extract author information from HTML soup."""
-        
-        # Common author selectors
-        author_selectors = [
-            '[rel="author"]',
-            '.author',
-            '.byline',
-            '.author-name',
-            '.post-author',
-            '.article-author',
-            '[class*="author"]',
-            '[itemprop="author"]',
-            'meta[name="author"]'
-        ]
-        
-        for selector in author_selectors:
-            author_elem = soup.select_one(selector)
-            if author_elem:
-                if author_elem.name == 'meta':
-                    author = author_elem.get('content', '').strip()
-                else:
-                    author = author_elem.get_text(strip=True)
-                
-                if author and len(author) < 100:  # Reasonable author name length
-                    # Clean up common prefixes
-                    author = author.replace('By ', '').replace('by ', '').strip()
-                    return author
-        
-        return ''
-    
-    def _extract_main_text(self, soup: BeautifulSoup) -> str:
-        """Extract main text content from HTML soup."""
-        
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "header", "footer"]):
-            script.decompose()
-        
-        # Try common content selectors
-        content_selectors = [
-            'article',
-            '[role="main"]',
-            '.content',
-            '.post-content',
-            '.entry-content',
-            '.article-body',
-            'main'
-        ]
-        
-        for selector in content_selectors:
-            content_elem = soup.select_one(selector)
-            if content_elem:
-                text = content_elem.get_text(separator=' ', strip=True)
-                if len(text) > 200:  # Reasonable content length
-                    return text
-        
-        # Fallback to body text
-        body = soup.find('body')
-        if body:
-            return body.get_text(separator=' ', strip=True)
-        
-        return soup.get_text(separator=' ', strip=True)
\ No newline at end of file
@@ -0,0 +1,186 @@
+import logging
+import socket
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, NamedTuple
+
+import requests
+
+from .utils import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# Failure classes (output column failure_class)
+FAILURE_DNS = 'dns'
+FAILURE_CONNECT_TIMEOUT = 'connect_timeout'
+FAILURE_READ_TIMEOUT = 'read_timeout'
+FAILURE_CONNECTION = 'connection_error'
+FAILURE_BOT_WALL = 'bot_wall'
+FAILURE_RATE_LIMITED = 'rate_limited'
+FAILURE_HTTP_4XX = 'http_4xx'
+FAILURE_HTTP_5XX = 'http_5xx'
+FAILURE_NON_HTML = 'non_html'
+FAILURE_NO_CONTENT = 'no_content'
+
+# Hours before a URL that failed with a class is tried again
+DEFAULT_RETRY_AFTER_HOURS = {
+    FAILURE_DNS: 168,
+    FAILURE_CONNECT_TIMEOUT: 24,
+    FAILURE_READ_TIMEOUT: 24,
+    FAILURE_CONNECTION: 24,
+    FAILURE_BOT_WALL: 168,
+    FAILURE_RATE_LIMITED: 1,
+    FAILURE_HTTP_4XX: 720,
+    FAILURE_HTTP_5XX: 6,
+    FAILURE_NON_HTML: 720,
+    FAILURE_NO_CONTENT: 168,
+}
+
+DNS_MESSAGES = ('name or service not known', 'nodename nor servname', 'getaddrinfo failed',
+                'temporary failure in name resolution', 'no address associated')
+
+# Challenge pages served by bot protection (Cloudflare, Akamai, PerimeterX, DataDome, ...)
+BOT_WALL_MARKERS = (b'captcha', b'just a moment', b'attention required', b'access denied',
+                    b'are you a robot', b'verify you are human', b'enable javascript and cookies')
+BOT_WALL_SAMPLE_BYTES = 16 * 1024
+
+
+def _exception_chain(error: BaseException):
+    """The exception and the errors it wraps (requests -> urllib3 -> socket), outermost first."""
+    seen = []
+    pending = [error]
+    while pending:
+        current = pending.pop(0)
+        if current is None or any(current is other for other in seen):
+            continue
+        seen.append(current)
+        pending += [getattr(current, 'reason', None), current.__cause__, current.__context__]
+        pending += [arg for arg in getattr(current, 'args', ()) if isinstance(arg, BaseException)]
+    return seen
+
+
+def classify_exception(error: BaseException) -> str:
+    """Failure class of a request that raised instead of returning a response."""
+    chain = _exception_chain(error)
+    names = [type(e).__name__ for e in chain]
+
+    if 'NameResolutionError' in names or any(isinstance(e, socket.gaierror) for e in chain) \
+            or any(message in str(e).lower() for e in chain for message in DNS_MESSAGES):
+        return FAILURE_DNS
+    if isinstance(error, requests.ConnectTimeout) or 'ConnectTimeout' in names or \
+            ('ConnectTimeoutError' in names and 'NewConnectionError' not in names):
+        return FAILURE_CONNECT_TIMEOUT
+    # requests reports a read timeout that used up the retries as a ConnectionError
+    if isinstance(error, requests.Timeout) or any(name.endswith(('Timeout', 'TimeoutError')) for name in names):
+        return FAILURE_READ_TIMEOUT
+    return FAILURE_CONNECTION
+
+
+def classify_response(response: requests.Response, body: bytes = b'') -> str:
+    """
+    Failure class of an error response.
+
+    403 is what sites answer crawlers they block, so it counts as a bot wall; a 503
+    does when it carries a challenge page (e.g. Cloudflare's "Just a moment...").
+    """
+    status = response.status_code
+    if status == 429:
+        return FAILURE_RATE_LIMITED
+    if status == 403:
+        return FAILURE_BOT_WALL
+    if status == 503:
+        sample = body[:BOT_WALL_SAMPLE_BYTES].lower()
+        if response.headers.get('cf-mitigated') or any(marker in sample for marker in BOT_WALL_MARKERS):
+            return FAILURE_BOT_WALL
+    return FAILURE_HTTP_5XX if status >= 500 else FAILURE_HTTP_4XX
+
+
+class FailureEntry(NamedTuple):
+    """A remembered failure of a URL."""
+    url: str
+    failure_class: str
+    detail: str
+    attempts: int
+    failed_at: float
+    retry_at: float
+
+
+class FailureCache:
+    """
+    Persistent SQLite negative cache of URLs that could not be fetched.
+
+    A failed URL is skipped without any request until the retry window of its
+    failure class has passed (e.g. a week for DNS failures, hours for 5xx). A
+    successful fetch removes the entry. The failed URLs are also kept in memory,
+    so URLs that never failed are answered without touching the database.
+    """
+
+    def __init__(self, path: Path, retry_after_hours: Optional[Dict[str, float]] = None):
+        self.path = Path(path)
+        self.retry_after_hours = dict(DEFAULT_RETRY_AFTER_HOURS, **(retry_after_hours or {}))
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS failures (
+                    url TEXT PRIMARY KEY,
+                    failure_class TEXT,
+                    detail TEXT,
+                    attempts INTEGER,
+                    failed_at REAL,
+                    retry_at REAL
+                )
+            """)
+            self._urls = {url for url, in self._conn.execute('SELECT url FROM failures')}
+
+    def get(self, url: str) -> Optional[FailureEntry]:
+        """Return the failure of a URL while its retry window is open, or None."""
+        key = normalize_url(url)
+        if key not in self._urls:
+            return None
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    'SELECT failure_class, detail, attempts, failed_at, retry_at FROM failures WHERE url = ?', (key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Failure cache read failed for {url}: {e}")
+            return None
+
+        if row is None or row[4] <= time.time():
+            return None
+        return FailureEntry(key, *row)
+
+    def put(self, url: str, failure_class: str, detail: str = ''):
+        """Remember that a URL failed; it is skipped for its class's retry window."""
+        key = normalize_url(url)
+        now = time.time()
+        retry_at = now + self.retry_after_hours.get(failure_class, 24) * 3600
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("""
+                    INSERT INTO failures VALUES (?, ?, ?, 1, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET failure_class = excluded.failure_class,
+                        detail = excluded.detail, attempts = attempts + 1,
+                        failed_at = excluded.failed_at, retry_at = excluded.retry_at
+                """, (key, failure_class, detail[:500], now, retry_at))
+                self._urls.add(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Failure cache write failed for {url}: {e}")
+
+    def clear(self, url: str):
+        """Forget the failure of a URL that has been fetched successfully."""
+        key = normalize_url(url)
+        if key not in self._urls:
+            return
+        try:
+            with self._lock, self._conn:
+                self._conn.execute('DELETE FROM failures WHERE url = ?', (key,))
+                self._urls.discard(key)
+        except sqlite3.Error as e:
+            logger.warning(f"Failure cache update failed for {url}: {e}")
@@ -0,0 +1,301 @@
+import logging
+from typing import Optional, Dict, List, Tuple, NamedTuple, Callable
+
+logger = logging.getLogger(__name__)
+
+# Candidate rules in priority order: (tag, attribute, operator, value).
+# Operators follow CSS attribute selectors: '=' exact, '~=' word in list, '*=' substring.
+Rule = Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]
+
+AUTHOR_RULES: List[Rule] = [
+    (None, 'rel', '=', 'author'),
+    (None, 'class', '~=', 'author'),
+    (None, 'class', '~=', 'byline'),
+    (None, 'class', '~=', 'author-name'),
+    (None, 'class', '~=', 'post-author'),
+    (None, 'class', '~=', 'article-author'),
+    (None, 'class', '*=', 'author'),
+    (None, 'itemprop', '=', 'author'),
+    ('meta', 'name', '=', 'author'),
+]
+
+PUBLISHER_RULES: List[Rule] = [
+    ('meta', 'property', '=', 'og:site_name'),
+    ('meta', 'name', '=', 'application-name'),
+    ('meta', 'name', '=', 'publisher'),
+    (None, 'class', '~=', 'site-name'),
+    (None, 'class', '~=', 'publisher'),
+    (None, 'class', '~=', 'source'),
+    (None, 'itemprop', '=', 'publisher'),
+]
+
+CONTENT_RULES: List[Rule] = [
+    ('article', None, None, None),
+    (None, 'role', '=', 'main'),
+    (None, 'class', '~=', 'content'),
+    (None, 'class', '~=', 'post-content'),
+    (None, 'class', '~=', 'entry-content'),
+    (None, 'class', '~=', 'article-body'),
+    ('main', None, None, None),
+]
+
+# Never part of the text; page chrome is additionally dropped from the main text
+NON_TEXT_TAGS = ('script', 'style', 'template')
+BOILERPLATE_TAGS = ('script', 'style', 'nav', 'header', 'footer')
+
+MAX_NAME_LENGTH = 100  # Reasonable author/publisher name length
+MIN_CONTENT_LENGTH = 200  # Reasonable content length
+
+
+class PageFields(NamedTuple):
+    """Fields extracted from an HTML page; empty strings when not found."""
+    title: str
+    author: str
+    publisher: str
+    text: str
+
+
+def rule_selector(rule: Rule) -> str:
+    """CSS selector equivalent of a candidate rule."""
+    tag, attribute, operator, value = rule
+    return (tag or '') + (f'[{attribute}{operator}"{value}"]' if attribute else '')
+
+
+def rule_matches(rule: Rule, tag: str, attributes: Dict[str, Optional[str]]) -> bool:
+    """Whether an element with the given tag and attributes matches a candidate rule."""
+    rule_tag, attribute, operator, value = rule
+    if rule_tag and tag != rule_tag:
+        return False
+    if not attribute:
+        return True
+
+    actual = attributes.get(attribute)
+    if actual is None:
+        return False
+    if operator == '=':
+        return actual == value
+    if operator == '~=':
+        return value in actual.split()
+    return value in actual
+
+
+def choose(candidates: Dict[int, object], rules: List[Rule], value: Callable[[object], str]) -> str:
+    """Value of the first candidate, in rule priority order, with a reasonable length."""
+    for index in range(len(rules)):
+        if index in candidates:
+            text = value(candidates[index])
+            if text and len(text) < MAX_NAME_LENGTH:
+                return text
+    return ''
+
+
+def collect(candidates: Dict[int, object], rules: List[Rule], tag: str, attributes, element,
+            exclude: Optional[Callable[[object], bool]] = None):
+    """Record `element` as the first match of every rule it matches that has no match yet."""
+    for index, rule in enumerate(rules):
+        if index not in candidates and rule_matches(rule, tag, attributes):
+            if exclude is None or not exclude(element):
+                candidates[index] = element
+
+
+def clean_author(author: str) -> str:
+    """Clean up common byline prefixes."""
+    return author.replace('By ', '').replace('by ', '').strip() if author else ''
+
+
+class BeautifulSoupParser:
+    """Original html.parser backend; one select_one scan per rule."""
+
+    name = 'beautifulsoup'
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def parse(self, html: bytes) -> PageFields:
+        soup = self._soup(html, 'html.parser')
+
+        title_elem = soup.find('title')
+        title = title_elem.get_text().strip() if title_elem else ''
+
+        author = clean_author(choose(self._select(soup, AUTHOR_RULES), AUTHOR_RULES, self._value))
+        publisher = choose(self._select(soup, PUBLISHER_RULES), PUBLISHER_RULES, self._value)
+
+        # Remove script and style elements
+        for element in soup(list(BOILERPLATE_TAGS)):
+            element.decompose()
+
+        text = ''
+        for element in self._select(soup, CONTENT_RULES).values():
+            candidate = element.get_text(separator=' ', strip=True)
+            if len(candidate) > MIN_CONTENT_LENGTH:
+                text = candidate
+                break
+        else:
+            # Fallback to body text
+            body = soup.find('body')
+            text = (body or soup).get_text(separator=' ', strip=True)
+
+        return PageFields(title, author, publisher, text)
+
+    def _select(self, soup, rules: List[Rule]) -> Dict[int, object]:
+        candidates = {}
+        for index, rule in enumerate(rules):
+            element = soup.select_one(rule_selector(rule))
+            if element is not None:
+                candidates[index] = element
+        return candidates
+
+    def _value(self, element) -> str:
+        if element.name == 'meta':
+            return element.get('content', '').strip()
+        return element.get_text(strip=True)
+
+
+class LxmlParser:
+    """lxml backend; a single pass over the tree collects every candidate."""
+
+    name = 'lxml'
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        self._html = lxml.html
+        self._etree = etree
+
+    def parse(self, html: bytes) -> PageFields:
+        try:
+            root = self._html.document_fromstring(html)
+        except (self._etree.ParserError, ValueError):
+            return PageFields('', '', '', '')
+
+        title = None
+        authors, publishers, contents = {}, {}, {}
+        for element in root.iter():
+            tag = element.tag
+            if not isinstance(tag, str):  # comments and processing instructions
+                continue
+            if tag == 'title' and title is None:
+                title = element
+            attributes = element.attrib
+            collect(authors, AUTHOR_RULES, tag, attributes, element)
+            collect(publishers, PUBLISHER_RULES, tag, attributes, element)
+            collect(contents, CONTENT_RULES, tag, attributes, element, self._in_boilerplate)
+
+        title = ''.join(title.itertext()).strip() if title is not None else ''
+        self._etree.strip_elements(root, self._etree.Comment, *NON_TEXT_TAGS, with_tail=False)
+        author = clean_author(choose(authors, AUTHOR_RULES, self._value))
+        publisher = choose(publishers, PUBLISHER_RULES, self._value)
+
+        self._etree.strip_elements(root, *BOILERPLATE_TAGS, with_tail=False)
+        text = ''
+        for index in sorted(contents):
+            candidate = self._text(contents[index], ' ')
+            if len(candidate) > MIN_CONTENT_LENGTH:
+                text = candidate
+                break
+        else:
+            body = root.find('body')
+            text = self._text(body if body is not None else root, ' ')
+
+        return PageFields(title, author, publisher, text)
+
+    @staticmethod
+    def _in_boilerplate(element) -> bool:
+        return element.tag in BOILERPLATE_TAGS or any(
+            ancestor.tag in BOILERPLATE_TAGS for ancestor in element.iterancestors()
+        )
+
+    def _value(self, element) -> str:
+        if element.tag == 'meta':
+            return (element.get('content') or '').strip()
+        return self._text(element, '')
+
+    @staticmethod
+    def _text(element, separator: str) -> str:
+        return separator.join(part.strip() for part in element.itertext() if part.strip())
+
+
+class SelectolaxParser:
+    """selectolax (lexbor) backend; a single pass over the tree collects every candidate."""
+
+    name = 'selectolax'
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self._parser = LexborHTMLParser
+
+    def parse(self, html: bytes) -> PageFields:
+        tree = self._parser(html)
+        if tree.root is None:
+            return PageFields('', '', '', '')
+
+        title = None
+        authors, publishers, contents = {}, {}, {}
+        for node in tree.root.traverse(include_text=False):
+            tag = node.tag
+            if tag.startswith('-'):  # -comment, -text
+                continue
+            if tag == 'title' and title is None:
+                title = node
+            attributes = node.attributes
+            collect(authors, AUTHOR_RULES, tag, attributes, node)
+            collect(publishers, PUBLISHER_RULES, tag, attributes, node)
+            collect(contents, CONTENT_RULES, tag, attributes, node, self._in_boilerplate)
+
+        title = title.text(deep=True).strip() if title is not None else ''
+        tree.strip_tags(list(NON_TEXT_TAGS))
+        author = clean_author(choose(authors, AUTHOR_RULES, self._value))
+        publisher = choose(publishers, PUBLISHER_RULES, self._value)
+
+        tree.strip_tags(list(BOILERPLATE_TAGS))
+        text = ''
+        for index in sorted(contents):
+            candidate = self._text(contents[index], ' ')
+            if len(candidate) > MIN_CONTENT_LENGTH:
+                text = candidate
+                break
+        else:
+            text = self._text(tree.body or tree.root, ' ')
+
+        return PageFields(title, author, publisher, text)
+
+    @staticmethod
+    def _in_boilerplate(node) -> bool:
+        while node is not None:
+            if node.tag in BOILERPLATE_TAGS:
+                return True
+            node = node.parent
+        return False
+
+    def _value(self, node) -> str:
+        if node.tag == 'meta':
+            return (node.attributes.get('content') or '').strip()
+        return self._text(node, '')
+
+    @staticmethod
+    def _text(node, separator: str) -> str:
+        # lexbor keeps whitespace-only text nodes as empty parts; drop them like the other backends
+        parts = node.text(deep=True, separator='\x00', strip=True).split('\x00')
+        return separator.join(part for part in parts if part)
+
+
+PARSERS = {parser.name: parser for parser in (BeautifulSoupParser, LxmlParser, SelectolaxParser)}
+
+
+def get_parser(name: str):
+    """
+    Create the parser backend configured as `name`.
+
+    Falls back to lxml when selectolax is not installed.
+    """
+    if name not in PARSERS:
+        raise ValueError(f"Unsupported HTML parser: {name} (choose from {', '.join(PARSERS)})")
+
+    try:
+        return PARSERS[name]()
+    except ImportError:
+        if name != 'selectolax':
+            raise
+        logger.warning("selectolax is not installed (pip install selectolax) - using the lxml parser")
+        return LxmlParser()
@@ -0,0 +1,360 @@
+import logging
+import os
+import socket
+import ssl
+import threading
+import time
+from typing import Callable, Dict, Any, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter, BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+from urllib3.exceptions import MaxRetryError
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+MAX_RETRY_AFTER = 60  # seconds; longer Retry-After values are capped rather than stalling a worker
+DNS_CACHE_MAX_ENTRIES = 10000
+
+
+def is_name_resolution_error(error: Optional[BaseException]) -> bool:
+    """Whether an error was caused by a failed DNS lookup (socket.gaierror anywhere in its chain)."""
+    seen = set()
+    while error is not None and id(error) not in seen:
+        if isinstance(error, socket.gaierror):
+            return True
+        seen.add(id(error))
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class CappedRetry(Retry):
+    """
+    urllib3 Retry that honours Retry-After up to MAX_RETRY_AFTER seconds and
+    calls `on_retry` for every retry it allows, whatever the error.
+
+    Failed DNS lookups are not retried: a host that doesn't resolve won't a few
+    hundred milliseconds later, and each retry would be another lookup.
+    """
+
+    def __init__(self, *args, on_retry: Optional[Callable[[], None]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.on_retry = on_retry
+
+    def new(self, **kwargs) -> 'CappedRetry':
+        retry = super().new(**kwargs)
+        retry.on_retry = self.on_retry
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, _pool=None,
+                  _stacktrace=None) -> 'CappedRetry':
+        if is_name_resolution_error(error):
+            raise MaxRetryError(_pool, url, error) from error
+        retry = super().increment(method, url, response, error, _pool, _stacktrace)  # raises MaxRetryError once the budget is spent
+        if self.on_retry is not None:
+            self.on_retry()
+        return retry
+
+    def parse_retry_after(self, retry_after: str) -> float:
+        return min(super().parse_retry_after(retry_after), MAX_RETRY_AFTER)
+
+
+class DnsCache:
+    """
+    TTL cache in front of socket.getaddrinfo.
+
+    urllib3 resolves the host on every new connection; with many short-lived
+    connections to the same few sites that is one DNS round trip each. The cache
+    is process-wide (it wraps the socket module), so it also covers connections
+    made outside the session. Only successful lookups are cached; expired entries
+    are dropped when looked up or when the cache reaches `max_entries`.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = DNS_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.stats = {'hits': 0, 'misses': 0}
+        self._entries: Dict[Tuple, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+        self._getaddrinfo = None
+
+    def install(self):
+        """Route socket.getaddrinfo through the cache."""
+        if self._getaddrinfo is None:
+            self._getaddrinfo = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self):
+        """Restore the original socket.getaddrinfo and empty the cache."""
+        self._entries.clear()
+        if self._getaddrinfo is not None:
+            socket.getaddrinfo = self._getaddrinfo
+            self._getaddrinfo = None
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self.stats['hits'] += 1
+                return entry[1]
+            if entry:
+                del self._entries[key]
+            # Counted before the lookup, so failed lookups are counted too
+            self.stats['misses'] += 1
+
+        result = self._getaddrinfo(host, port, family, type, proto, flags)
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._prune(now)
+            self._entries[key] = (now + self.ttl, result)
+        return result
+
+    def _prune(self, now: float):
+        """Drop expired entries, then the oldest ones if the cache is still full. Caller holds the lock."""
+        for key in [key for key, (expires, _) in self._entries.items() if expires <= now]:
+            del self._entries[key]
+        while len(self._entries) >= self.max_entries:
+            del self._entries[next(iter(self._entries))]  # insertion order: the oldest lookup
+
+
+# One cache per process, shared by every transport that enables it
+_dns_cache: Optional[DnsCache] = None
+_dns_cache_users = 0
+
+
+def enable_dns_cache(ttl: float) -> DnsCache:
+    """Install the process-wide DNS cache (the latest ttl wins); each call needs a release_dns_cache."""
+    global _dns_cache, _dns_cache_users
+    if _dns_cache is None:
+        _dns_cache = DnsCache(ttl)
+        _dns_cache.install()
+    _dns_cache.ttl = ttl
+    _dns_cache_users += 1
+    return _dns_cache
+
+
+def release_dns_cache():
+    """Release an enable_dns_cache; the last release restores socket.getaddrinfo."""
+    global _dns_cache, _dns_cache_users
+    _dns_cache_users = max(0, _dns_cache_users - 1)
+    if _dns_cache_users == 0 and _dns_cache is not None:
+        _dns_cache.uninstall()
+        _dns_cache = None
+
+
+class _StreamedBody:
+    """File-like view of an httpx response body, as requests expects in Response.raw."""
+
+    def __init__(self, response, retries: Retry):
+        self.retries = retries
+        self._response = response
+        self._chunks = response.iter_bytes()
+        self._buffer = b''
+
+    def read(self, amt: Optional[int] = None, decode_content: bool = True) -> bytes:
+        while amt is None or len(self._buffer) < amt:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        if amt is None:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def close(self):
+        self._response.close()
+
+    release_conn = close
+
+
+class Http2Adapter(BaseAdapter):
+    """
+    requests adapter that sends through an httpx client with HTTP/2 enabled.
+
+    Each host gets one multiplexed connection when the server negotiates h2 and
+    falls back to HTTP/1.1 otherwise. Retries follow the same Retry policy as
+    the HTTP/1.1 adapter. Requires `pip install httpx[http2]`.
+
+    httpx sets TLS verification, client certificates and the proxy per client
+    rather than per request, so there is one client for each combination of
+    requests' verify, cert and proxy settings in use (normally just one).
+    """
+
+    def __init__(self, pool_maxsize: int, max_retries: Retry):
+        super().__init__()
+        import httpx
+        self._httpx = httpx
+        self.max_retries = max_retries
+        self._pool_maxsize = pool_maxsize
+        self._clients: Dict[Tuple, Any] = {}
+        self._lock = threading.Lock()
+        self._client_for(True, None, None)  # fails here if the h2 package is missing
+
+    def _client_for(self, verify, cert, proxy: Optional[str]):
+        """The httpx client for requests' verify and cert arguments and a proxy URL."""
+        key = (verify, tuple(cert) if isinstance(cert, (list, tuple)) else cert, proxy)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = self._httpx.Client(
+                    http2=True,
+                    limits=self._httpx.Limits(max_keepalive_connections=self._pool_maxsize),
+                    verify=self._ssl_context(verify, cert),
+                    proxy=proxy,
+                    trust_env=False,  # requests has already applied the environment to verify and proxies
+                )
+        return client
+
+    @staticmethod
+    def _ssl_context(verify, cert):
+        """httpx's verify argument for requests' verify (bool or CA bundle path) and cert (path or (cert, key))."""
+        if not cert and isinstance(verify, bool):
+            return verify
+        if verify is False:
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        elif isinstance(verify, str):
+            context = ssl.create_default_context(**{'capath' if os.path.isdir(verify) else 'cafile': verify})
+        else:
+            import certifi  # the CA bundle requests and httpx verify against by default
+            context = ssl.create_default_context(cafile=certifi.where())
+        if isinstance(cert, (list, tuple)):
+            context.load_cert_chain(*cert)
+        elif cert:
+            context.load_cert_chain(cert)
+        return context
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        httpx = self._httpx
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        client = self._client_for(verify, cert, select_proxy(request.url, proxies) if proxies else None)
+
+        retries = self.max_retries
+        while True:
+            try:
+                response = client.send(
+                    client.build_request(request.method, request.url, headers=dict(request.headers),
+                                               content=request.body, timeout=timeout),
+                    stream=True,
+                )
+            except httpx.TimeoutException as e:
+                retries = self._increment(retries, request, e, requests.Timeout)
+                continue
+            except httpx.TransportError as e:
+                retries = self._increment(retries, request, e, requests.ConnectionError)
+                continue
+
+            retry_after = response.headers.get('Retry-After')
+            if not retries.is_retry(request.method, response.status_code, retry_after is not None):
+                break
+            try:
+                retries = retries.increment(request.method, request.url)
+            except MaxRetryError:
+                break  # like raise_on_status=False: hand back the last response
+            response.read()  # drain the error body so the connection goes back to the pool
+            response.close()
+            time.sleep(retries.parse_retry_after(retry_after) if retry_after and retries.respect_retry_after_header
+                       else retries.get_backoff_time())
+
+        resp = requests.Response()
+        resp.status_code = response.status_code
+        resp.reason = response.reason_phrase
+        resp.headers = CaseInsensitiveDict(response.headers.items())
+        resp.encoding = get_encoding_from_headers(resp.headers)
+        resp.raw = _StreamedBody(response, retries)
+        resp.url = request.url
+        resp.request = request
+        resp.connection = self
+        if not stream:
+            resp.content
+        return resp
+
+    def _increment(self, retries: Retry, request, error: Exception, error_class) -> Retry:
+        """Count a failed attempt against the retry budget, raising error_class when it is spent."""
+        try:
+            retries = retries.increment(request.method, request.url, error=error)
+        except MaxRetryError:
+            raise error_class(error, request=request)
+        time.sleep(retries.get_backoff_time())
+        return retries
+
+    def close(self):
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+
+
+class HttpTransport:
+    """
+    Shared HTTP session for every page fetch.
+
+    Connection pools are kept for `pool_connections` hosts with up to
+    `pool_maxsize` keep-alive connections each, so repeated hosts reuse their
+    TCP/TLS connections instead of reconnecting once more than requests' default
+    10 hosts are in rotation. Failed connections and 429/5xx responses are
+    retried `max_retries` times with exponential backoff (Retry-After is
+    honoured). HTTPS can optionally go over HTTP/2, and DNS lookups can be
+    cached for `dns_cache_ttl` seconds.
+    """
+
+    def __init__(self, user_agent: str, max_retries: int, settings: Optional[Dict[str, Any]] = None):
+        settings = settings or {}
+        pool_connections = settings.get('pool_connections', 100)
+        pool_maxsize = settings.get('pool_maxsize', 10)
+
+        self._local = threading.local()
+        self.retry = CappedRetry(
+            total=max_retries,
+            backoff_factor=settings.get('backoff_factor', 0.5),
+            status_forcelist=settings.get('retry_statuses', RETRY_STATUSES),
+            allowed_methods=('GET', 'HEAD'),
+            raise_on_status=False,
+            on_retry=self._count_retry,
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': user_agent})
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              pool_block=settings.get('pool_block', False), max_retries=self.retry)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.http2 = False
+        if settings.get('http2'):
+            try:
+                self.session.mount('https://', Http2Adapter(pool_maxsize, self.retry))
+                self.http2 = True
+            except ImportError:
+                logger.warning("httpx is not installed (pip install 'httpx[http2]') - using HTTP/1.1")
+
+        dns_cache_ttl = settings.get('dns_cache_ttl', 0)
+        self.dns_cache = enable_dns_cache(dns_cache_ttl) if dns_cache_ttl > 0 else None
+
+    def _count_retry(self):
+        # Retries happen on the thread that sent the request
+        self._local.retries = getattr(self._local, 'retries', 0) + 1
+
+    def take_retries(self) -> int:
+        """
+        Retries of this thread's requests since the last call: status, connect and
+        read retries, including those of requests that failed in the end.
+        """
+        retries, self._local.retries = getattr(self._local, 'retries', 0), 0
+        return retries
+
+    def close(self):
+        self.session.close()
+        if self.dns_cache is not None:
+            release_dns_cache()
+            self.dns_cache = None
@@ -0,0 +1,165 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# MinHash signature: NUM_PERM hash functions over shingles of SHINGLE_WORDS words.
+# The LSH index splits a signature into BANDS bands of NUM_PERM / BANDS rows; two
+# articles become candidates when one band matches, which catches a pair with
+# similarity 0.8 with probability 1 - (1 - 0.8^4)^16 > 0.999.
+NUM_PERM = 64
+BANDS = 16
+SHINGLE_WORDS = 5
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20240501)  # fixed, so signatures stay comparable across runs
+_A = _rng.randint(1, _PRIME, NUM_PERM).astype(np.uint64)
+_B = _rng.randint(0, _PRIME, NUM_PERM).astype(np.uint64)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def minhash(text: str, min_words: int = 0) -> Optional[np.ndarray]:
+    """
+    MinHash signature of a text's word shingles (NUM_PERM uint32 values).
+
+    Case and punctuation are ignored. Texts shorter than `min_words` words get
+    None: a few sentences of boilerplate would match too many articles.
+    """
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < max(min_words, 1):
+        return None
+
+    size = min(SHINGLE_WORDS, len(words))
+    shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                         dtype=np.uint64, count=len(shingles)) % np.uint64(_PRIME)
+    # (a * x + b) mod p for every hash function and shingle; a, x < 2^31 so nothing overflows
+    permuted = (np.outer(_A, hashes) + _B[:, None]) % np.uint64(_PRIME)
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures' shingle sets."""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class NearDuplicate(NamedTuple):
+    """An enriched bookmark whose content matches a new one."""
+    url: str
+    similarity: float
+    description: str
+    tags: List[str]
+    author: str
+
+
+class NearDuplicateIndex:
+    """
+    Persistent MinHash/LSH index of enriched article text.
+
+    Syndicated articles, AMP copies and reposts live under unrelated URLs, so
+    canonical URLs don't catch them. Every enriched article's signature is stored
+    with its result, and an article whose text is at least `threshold` similar to
+    one already enriched reuses that description and tags instead of an AI call.
+    The signatures and band buckets are kept in memory; results are read from the
+    database on a match.
+    """
+
+    def __init__(self, path: Path, threshold: float = 0.8, min_words: int = 100):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.min_words = min_words
+        self._lock = threading.Lock()
+        self._signatures: Dict[str, np.ndarray] = {}
+        self._sequence: Dict[str, int] = {}  # indexing order, to break ties
+        self._buckets: Dict[Tuple[int, bytes], List[str]] = {}
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    key TEXT PRIMARY KEY,
+                    url TEXT,
+                    signature BLOB,
+                    description TEXT,
+                    tags TEXT,
+                    author TEXT,
+                    created_at REAL
+                )
+            """)
+            for key, signature in self._conn.execute('SELECT key, signature FROM fingerprints ORDER BY created_at'):
+                self._index(key, np.frombuffer(signature, dtype=np.uint32))
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def fingerprint(self, text: str) -> Optional[np.ndarray]:
+        """Signature of an article's text, or None if it is too short to compare."""
+        return minhash(text or '', self.min_words)
+
+    def find(self, url: str, signature: Optional[np.ndarray]) -> Optional[NearDuplicate]:
+        """The most similar enriched article at or above the threshold, other than `url` itself."""
+        if signature is None:
+            return None
+        own_key = canonicalize_url(url)
+        with self._lock:
+            candidates = {key for band, value in self._bands(signature)
+                          for key in self._buckets.get((band, value), ()) if key != own_key}
+            scored = [(similarity(signature, self._signatures[key]), -self._sequence[key], key) for key in candidates]
+        # Highest similarity; ties go to the earliest indexed article
+        score, _, key = max(scored, default=(0.0, 0, None))
+        if key is None or score < self.threshold:
+            return None
+
+        try:
+            with self._lock:
+                row = self._conn.execute('SELECT url, description, tags, author FROM fingerprints WHERE key = ?',
+                                         (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Near-duplicate index read failed for {url}: {e}")
+            return None
+        if row is None:
+            return None
+        matched_url, description, tags, author = row
+        return NearDuplicate(matched_url, round(score, 3), description, [tag for tag in tags.split('\n') if tag],
+                             author)
+
+    def add(self, url: str, signature: Optional[np.ndarray], result: Dict[str, Any]):
+        """Index an enriched article with its description, tags and author."""
+        if signature is None:
+            return
+        key = canonicalize_url(url)
+        try:
+            with self._lock, self._conn:
+                self._conn.execute('INSERT OR REPLACE INTO fingerprints VALUES (?, ?, ?, ?, ?, ?, ?)',
+                                   (key, url, signature.tobytes(), result['description'],
+                                    '\n'.join(result.get('tags', [])), result.get('author', ''), time.time()))
+                self._index(key, signature)
+        except sqlite3.Error as e:
+            logger.warning(f"Near-duplicate index write failed for {url}: {e}")
+
+    def _index(self, key: str, signature: np.ndarray):
+        if key in self._signatures:
+            for band in self._bands(self._signatures.pop(key)):
+                self._buckets[band].remove(key)
+        self._signatures[key] = signature
+        self._sequence.setdefault(key, len(self._sequence))
+        for band in self._bands(signature):
+            self._buckets.setdefault(band, []).append(key)
+
+    @staticmethod
+    def _bands(signature: np.ndarray):
+        rows = len(signature) // BANDS
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(BANDS)]
@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Optional, Set
+from urllib.parse import urlparse
+
+
+class HostRateLimiter:
+    """Enforces a minimum delay between requests to the same host."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self._next_slot: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> float:
+        """
+        Block until a request to the URL's host is allowed.
+
+        Slots are reserved under a lock, so concurrent callers for the same host
+        are spaced `delay` seconds apart while other hosts proceed immediately.
+
+        Returns:
+            Seconds spent sleeping
+        """
+        host = self.host(url)
+
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.delay
+
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    def ready_in(self, host: str) -> float:
+        """Seconds until a request to `host` is allowed, without reserving the slot."""
+        with self._lock:
+            return max(0.0, self._next_slot.get(host, 0.0) - time.monotonic())
+
+    @staticmethod
+    def host(url: str) -> str:
+        """The key requests are spaced by; a malformed URL is its own host."""
+        try:
+            return urlparse(url).netloc.lower()
+        except ValueError:
+            return url
+
+
+class HostQueue:
+    """
+    Scheduler for fetches under a HostRateLimiter.
+
+    Sleeping in wait() inside a fetch worker holds the worker, so a run of rows
+    for one host would fill every worker while rows for other hosts wait behind
+    them. Instead, a row is only started when its host is ready (its next slot
+    has come and no other fetch for it is running); the others are queued per
+    host, in input order, until it is. Without a delay every row is ready.
+    """
+
+    def __init__(self, limiter: HostRateLimiter):
+        self.limiter = limiter
+        self._queued: Dict[str, Deque[Any]] = OrderedDict()
+        self._running: Set[str] = set()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def offer(self, item: Any, url: str) -> bool:
+        """Start `item` (returns True, the caller submits it) if its host is ready, else queue it."""
+        host = self.limiter.host(url) if isinstance(url, str) else ''
+        if host not in self._queued and self._ready(host):
+            self._start(host)
+            return True
+        self._queued.setdefault(host, deque()).append((item, url))
+        self._size += 1
+        return False
+
+    def pop_ready(self) -> Optional[Any]:
+        """The first queued item whose host is ready, now started; None if there is none."""
+        for host, items in self._queued.items():
+            if self._ready(host):
+                item, url = items.popleft()
+                if not items:
+                    del self._queued[host]
+                self._size -= 1
+                self._start(host)
+                return item
+        return None
+
+    def finish(self, url: str):
+        """Mark the fetch of a started item done, so its host's next item can start."""
+        self._running.discard(self.limiter.host(url) if isinstance(url, str) else '')
+
+    def next_ready_in(self) -> Optional[float]:
+        """Seconds until a queued item can start without waiting for a running fetch, or None."""
+        waits = [self.limiter.ready_in(host) for host in self._queued if host not in self._running]
+        return min(waits, default=None)
+
+    def _ready(self, host: str) -> bool:
+        if self.limiter.delay <= 0:
+            return True
+        return host not in self._running and self.limiter.ready_in(host) <= 0
+
+    def _start(self, host: str):
+        if self.limiter.delay > 0:
+            self._running.add(host)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`."""
+
+    def __init__(self, rate_per_minute: float):
+        self.capacity = float(rate_per_minute)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1) -> float:
+        """
+        Block until `amount` tokens are available and take them.
+
+        Requests larger than the bucket are clamped to its capacity so they can
+        still proceed once the bucket is full.
+
+        Returns:
+            Seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.capacity / 60)
+                self._updated = now
+
+                if now >= self._paused_until and self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+
+                delay = max(self._paused_until - now, (amount - self._tokens) * 60 / self.capacity)
+
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Hold back every caller for `seconds`, e.g. after a 429 with Retry-After."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
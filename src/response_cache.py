@@ -0,0 +1,88 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Persistent SQLite cache of AI responses keyed by a hash of the request.
+
+    Stores both the raw model output and the parsed result, tagged with model and
+    prompt version so either can be invalidated.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    provider TEXT,
+                    model TEXT,
+                    prompt_version TEXT,
+                    raw TEXT,
+                    result TEXT,
+                    created_at REAL
+                )
+            """)
+
+    @staticmethod
+    def make_key(provider: str, model: str, temperature: float, max_tokens: int,
+                 prompt_version: str, prompt: str) -> str:
+        """Hash of everything that determines the model output."""
+        payload = json.dumps([provider, model, temperature, max_tokens, prompt_version, prompt])
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached parsed result, or None."""
+        try:
+            with self._lock:
+                row = self._conn.execute('SELECT result FROM responses WHERE key = ?', (key,)).fetchone()
+            return json.loads(row[0]) if row else None
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+
+    def put(self, key: str, provider: str, model: str, prompt_version: str, raw: str, result: Dict[str, Any]):
+        """Store a raw response and its parsed result."""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    (key, provider, model, prompt_version, raw, json.dumps(result), time.time())
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    def invalidate(self, model: Optional[str] = None, prompt_version: Optional[str] = None) -> int:
+        """Delete entries for a model and/or prompt version (all entries if neither is given)."""
+        clauses, params = [], []
+        if model:
+            clauses.append('model = ?')
+            params.append(model)
+        if prompt_version:
+            clauses.append('prompt_version = ?')
+            params.append(prompt_version)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+
+        with self._lock, self._conn:
+            return self._conn.execute(f'DELETE FROM responses{where}', params).rowcount
+
+    def prune(self, current_prompt_version: str) -> int:
+        """Delete entries written by other prompt versions, which can no longer be hit."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                'DELETE FROM responses WHERE prompt_version != ?', (current_prompt_version,)
+            ).rowcount
@@ -0,0 +1,144 @@
+import json
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+
+# Per-bookmark stages, in pipeline order. fetch is the whole fetch call and
+# includes rate_limit_wait, download and (without parse workers) parse.
+STAGES = ('fetch', 'rate_limit_wait', 'download', 'parse', 'ai', 'total')
+PERCENTILES = (50, 95, 99)
+SLOWEST_DOMAINS = 5
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of sorted values (0.0 for none)."""
+    if not values:
+        return 0.0
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+class RunMetrics:
+    """
+    Per-bookmark timings and counters of a run.
+
+    The stages of a bookmark are recorded as it moves through the pipeline (from
+    whichever thread runs the stage) and the finished record is written as one
+    JSONL line. Only the stage durations and per-domain download times are kept
+    in memory, for the percentiles and slowest domains in the run summary. With
+    no path nothing is written but the summary figures are still collected.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path) if path else None
+        self.durations: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+        self.domains: Dict[str, List[float]] = {}  # domain -> [bookmarks downloaded, download seconds]
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._file = None
+        self._lock = threading.Lock()
+
+    def open(self, resume: bool = False):
+        """Open the metrics file; on resume the records of previous runs are kept."""
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def start(self, url: str):
+        """Start the clock of a bookmark; its total runs until finish."""
+        with self._lock:
+            self._pending[url] = self._new_entry(url)
+
+    def record(self, url: str, section: str, values: Dict[str, Any]):
+        """
+        Add the counters of one stage to a bookmark's record.
+
+        Keys named after a stage are durations in seconds and go to `stages`; the
+        rest go to `section`. Numbers are added to what is already recorded (a
+        bookmark can be retried or re-asked), anything else replaces it.
+        """
+        with self._lock:
+            entry = self._pending.get(url)
+            if entry is None:
+                entry = self._pending[url] = self._new_entry(url)
+
+            for key, value in values.items():
+                target = entry['stages'] if key in STAGES else entry.setdefault(section, {})
+                if isinstance(value, (int, float)) and not isinstance(value, bool) \
+                        and isinstance(target.get(key), (int, float)):
+                    target[key] += value
+                else:
+                    target[key] = value
+
+    def finish(self, url: str, **fields: Any):
+        """Complete a bookmark's record with `fields`, write it and add it to the run figures."""
+        with self._lock:
+            entry = self._pending.pop(url, None) or self._new_entry(url)
+            entry['stages']['total'] = time.perf_counter() - entry.pop('_started')
+            entry.update(fields)
+            self._add(entry)
+
+            if self._file is not None:
+                entry['stages'] = {stage: round(seconds, 4) for stage, seconds in entry['stages'].items()}
+                self._file.write(json.dumps(entry, default=str) + '\n')
+
+    def load(self, path: Path):
+        """Add the records of a metrics file (e.g. of another shard) to the run figures."""
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # a line cut short by an interrupted run
+                with self._lock:
+                    self._add(entry)
+
+    def _add(self, entry: Dict[str, Any]):
+        for stage, seconds in entry['stages'].items():
+            self.durations.setdefault(stage, []).append(seconds)
+        if 'download' in entry['stages']:
+            domain = self.domains.setdefault(entry['domain'], [0, 0.0])
+            domain[0] += 1
+            domain[1] += entry['stages']['download']
+
+    def stage_report(self) -> Dict[str, Dict[str, float]]:
+        """Bookmarks timed and p50/p95/p99 seconds per stage (stages no bookmark went through are left out)."""
+        report = {}
+        for stage in STAGES:
+            values = sorted(self.durations[stage])
+            if values:
+                report[stage] = {'count': len(values), 'mean': sum(values) / len(values)}
+                report[stage].update((f"p{pct}", percentile(values, pct)) for pct in PERCENTILES)
+        return report
+
+    def slowest_domains(self, limit: int = SLOWEST_DOMAINS) -> List[Dict[str, Any]]:
+        """Domains with the longest mean download time."""
+        ranked = sorted(self.domains.items(), key=lambda item: -item[1][1] / item[1][0])
+        return [{'domain': domain, 'bookmarks': count, 'mean': seconds / count, 'seconds': seconds}
+                for domain, (count, seconds) in ranked[:limit]]
+
+    @staticmethod
+    def _new_entry(url: str) -> Dict[str, Any]:
+        try:
+            domain = (urlparse(url).hostname or '') if isinstance(url, str) else ''
+        except ValueError:  # malformed, e.g. an unclosed IPv6 bracket; the fetch fails on its own
+            domain = ''
+        return {'url': url, 'domain': domain, 'stages': {}, '_started': time.perf_counter()}
+
+    @staticmethod
+    def path_for(output_path: Path) -> Path:
+        """Metrics location for an output file, e.g. enriched.csv -> enriched.metrics.jsonl."""
+        return output_path.parent / f"{output_path.stem}.metrics.jsonl"
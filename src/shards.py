@@ -0,0 +1,103 @@
+import hashlib
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .run_metrics import RunMetrics
+from .utils import canonicalize_url
+
+logger = logging.getLogger(__name__)
+
+# A shard as (index, count), index counting from 1 as in --shard 2/4
+Shard = Tuple[int, int]
+
+
+def parse_shard(spec: str) -> Shard:
+    """Parse 'i/N' (1 <= i <= N) into (i, N)."""
+    try:
+        index, count = (int(part) for part in spec.split('/'))
+    except ValueError:
+        raise ValueError(f"expected i/N, e.g. 1/4, got {spec!r}") from None
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"shard {spec!r} is out of range: i must be between 1 and N")
+    return index, count
+
+
+def shard_of(url: Any, count: int) -> int:
+    """
+    Shard (1..count) of a bookmark, by a hash of its canonical URL.
+
+    The hash does not depend on the Python process (unlike hash()), so every
+    worker and machine assigns each bookmark to the same shard, and duplicate
+    URLs always land together.
+    """
+    key = canonicalize_url(url) if isinstance(url, str) else ''
+    digest = hashlib.sha1(key.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count + 1
+
+
+def shard_path(output_path: Path, shard: Shard) -> Path:
+    """Output location of a shard, e.g. enriched.csv -> enriched_shard2of4.csv."""
+    index, count = shard
+    return output_path.parent / f"{output_path.stem}_shard{index}of{count}{output_path.suffix}"
+
+
+def _add_counts(total: Dict[str, Any], counts: Dict[str, Any]):
+    for key, value in counts.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            total[key] = total.get(key, 0) + value
+
+
+def merge_reports(reports: List[Dict[str, Any]], metrics_paths: List[Optional[Path]]) -> Dict[str, Any]:
+    """
+    Combine the summary reports (<output>_summary.json) of shard runs into one.
+
+    Counters are added up and cascade rates recomputed from the summed counts.
+    Stage percentiles and the slowest domains can't be combined from the shard
+    summaries, so they are recomputed from the shards' per-bookmark metrics files;
+    shards without one are left out of those figures.
+    """
+    merged: Dict[str, Any] = {section: {} for section in ('bookmarks', 'network', 'failures', 'duplicates', 'ai')}
+    tiers: Dict[str, Dict[str, Any]] = {}
+    reasons: Dict[str, int] = {}
+    for report in reports:
+        for section in merged:
+            _add_counts(merged[section], report.get(section, {}))
+        for tier in report.get('cascade', []):
+            total = tiers.setdefault(tier['tier'], {'tier': tier['tier'], 'seconds': 0.0})
+            total['seconds'] += tier['latency'] * tier['articles']
+            _add_counts(total, {key: tier[key] for key in ('articles', 'escalated', 'input_tokens', 'output_tokens', 'cost')})
+        _add_counts(reasons, (report.get('escalation') or {}).get('reasons', {}))
+
+    cascade = []
+    for tier in tiers.values():
+        seconds = tier.pop('seconds')
+        tier['escalation_rate'] = tier['escalated'] / tier['articles'] if tier['articles'] else 0.0
+        tier['latency'] = seconds / tier['articles'] if tier['articles'] else 0.0
+        cascade.append(tier)
+
+    escalation = None
+    if cascade:
+        # As AIProcessor.escalation_rate: articles that reached the last tier, of all that entered the cascade
+        entered = cascade[0]['articles'] + reasons.get('short_input', 0)
+        rate = cascade[-1]['articles'] / entered if len(cascade) > 1 and entered else 0.0
+        escalation = {'rate': rate, 'reasons': reasons}
+
+    metrics = RunMetrics()
+    for path in metrics_paths:
+        if path is not None and path.exists():
+            metrics.load(path)
+        else:
+            logger.warning(f"No metrics file {path}; its bookmarks are left out of the stage timings")
+
+    merged.update({
+        'condense_method': next((report['condense_method'] for report in reports if report.get('condense_method')), ''),
+        'cascade': cascade,
+        'escalation': escalation,
+        'stages': metrics.stage_report(),
+        'slowest_domains': metrics.slowest_domains(),
+        'shards': len(reports),
+        'generated_at': time.strftime('%Y-%m-%d %H:%M:%S')
+    })
+    return merged
@@ -1,6 +1,7 @@
 import logging
 import sys
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
 
 def setup_logging(verbose: bool = False):
     """Setup logging configuration."""
@@ -60,4 +61,44 @@ def truncate_text(text: str, max_length: int = 200) -> str:
     if last_space > max_length * 0.8:  # If space is reasonably close to end
         return truncated[:last_space] + '...'
     else:
-        return truncated + '...'
\ No newline at end of file
+        return truncated + '...'
+
+def normalize_url(url: str) -> str:
+    """Normalize a URL for use as a cache key (case, default ports, fragment)."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    
+    port = parts.port
+    if port and (scheme, port) not in (('http', 80), ('https', 443)):
+        host = f"{host}:{port}"
+    
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+# Query parameters that only identify the referral source, not the page
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'msclkid', 'mc_cid', 'mc_eid', 'igshid', 'ref_src', '_hsenc', '_hsmi'}
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for duplicate detection.
+    
+    Builds on normalize_url and additionally drops tracking parameters (utm_* and
+    common click ids), a leading 'www.' and trailing slashes, and sorts the query.
+    A malformed URL (e.g. a non-numeric port) is returned stripped but otherwise
+    as is, so it only matches itself and fails at fetch time like any bad row.
+    """
+    try:
+        parts = urlsplit(normalize_url(url))
+    except ValueError:
+        return url.strip()
+    
+    host = parts.netloc
+    if host.startswith('www.'):
+        host = host[4:]
+    
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    
+    return urlunsplit((parts.scheme, host, parts.path.rstrip('/'), urlencode(query), ''))
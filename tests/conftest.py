@@ -0,0 +1,46 @@
+import socket
+from pathlib import Path
+
+import pytest
+
+import src.ai_processor as ai_processor
+import src.bookmark_processor as bookmark_processor
+import src.content_extractor as content_extractor
+from src.bookmark_processor import BookmarkProcessor
+
+# (module, setting, key) of every on-disk location a processor writes to
+CACHE_SETTINGS = [
+    (content_extractor, 'CONTENT_CACHE_CONFIG', 'path'),
+    (content_extractor, 'NEGATIVE_CACHE_CONFIG', 'path'),
+    (ai_processor, 'AI_CACHE_CONFIG', 'path'),
+    (ai_processor, 'AI_BATCH_API_CONFIG', 'work_dir'),
+    (bookmark_processor, 'NEAR_DUPLICATE_CONFIG', 'path'),
+]
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch) -> Path:
+    """Keep the caches of processors made in a test under tmp_path instead of the working tree's .cache."""
+    directory = tmp_path / '.cache'
+    for module, name, key in CACHE_SETTINGS:
+        settings = getattr(module, name)
+        location = directory / Path(settings.get(key, name.lower())).name
+        monkeypatch.setattr(module, name, dict(settings, **{key: str(location)}))
+    return directory
+
+
+@pytest.fixture
+def make_processor(cache_dir):
+    """BookmarkProcessor factory; every processor is closed after the test, restoring socket.getaddrinfo."""
+    getaddrinfo = socket.getaddrinfo
+    processors = []
+
+    def make(**kwargs) -> BookmarkProcessor:
+        processor = BookmarkProcessor(**kwargs)
+        processors.append(processor)
+        return processor
+
+    yield make
+    for processor in processors:
+        processor.close()
+    assert socket.getaddrinfo is getaddrinfo
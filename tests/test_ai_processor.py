@@ -0,0 +1,180 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+import src.ai_processor as ai_processor
+from src.ai_processor import AIProcessor
+
+VALID = json.dumps({'description': 'A summary of the article.', 'tags': ['python', 'testing'], 'author': 'Ada'})
+
+
+class StubClient:
+    """OpenAI-style client answering chat completions with queued replies (strings or exceptions to raise)."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, **params):
+        self.requests.append(params)
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=reply))],
+                               usage=SimpleNamespace(prompt_tokens=100, completion_tokens=20))
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+@pytest.fixture
+def make_ai(cache_dir, monkeypatch):
+    """AIProcessor factory for the openai provider answering from a StubClient, without the cascade."""
+    monkeypatch.setattr(ai_processor, 'AI_CASCADE_CONFIG', {'enabled': False})
+
+    def make(*replies, reasks=1) -> AIProcessor:
+        processor = AIProcessor('openai', 'gpt-4o-mini')
+        processor.client = StubClient(*replies)
+        processor.reasks = reasks
+        processor.structured_output = True
+        return processor
+
+    return make
+
+
+def test_valid_first_reply(make_ai):
+    ai = make_ai(VALID)
+
+    result = ai.process_content('Title', 'Some article text.')
+
+    assert result == json.loads(VALID)
+    assert len(ai.client.requests) == 1
+    assert ai.stats['invalid'] == ai.stats['reasks'] == 0
+
+
+def test_invalid_reply_fixed_on_reask(make_ai):
+    ai = make_ai('not JSON at all', VALID)
+
+    result = ai.process_content('Title', 'Some article text.')
+
+    assert result == json.loads(VALID)
+    reask = ai.client.requests[1]['messages']
+    assert reask[-2] == {'role': 'assistant', 'content': 'not JSON at all'}
+    assert 'not valid JSON' in reask[-1]['content']
+    assert (ai.stats['invalid'], ai.stats['reasks'], ai.stats['reasks_fixed']) == (1, 1, 1)
+
+
+def test_invalid_after_max_reasks(make_ai):
+    invalid = json.dumps({'description': '', 'tags': []})
+    ai = make_ai(invalid, invalid, invalid, VALID, reasks=2)
+
+    result = ai.process_content('Title', 'Some article text.')
+
+    assert result['description'] == 'Content summary not available'
+    assert len(ai.client.requests) == 3
+    assert (ai.stats['invalid'], ai.stats['reasks'], ai.stats['reasks_fixed']) == (1, 2, 0)
+    # Placeholder results are not cached, so the article is asked for again
+    assert ai.process_content('Title', 'Some article text.') == json.loads(VALID)
+
+
+def test_rejected_structured_output_is_turned_off(make_ai):
+    ai = make_ai(BadRequest("Invalid parameter: 'response_format' of type 'json_schema' is not supported"), VALID,
+                 VALID)
+
+    assert ai.process_content('Title', 'Some article text.') == json.loads(VALID)
+    assert ai.process_content('Other title', 'Other article text.') == json.loads(VALID)
+
+    assert ai.structured_output is False
+    assert 'response_format' in ai.client.requests[0]
+    assert all('response_format' not in params for params in ai.client.requests[1:])
+    assert ai.stats['retries'] == 0
+
+
+def test_other_bad_requests_are_not_retried(make_ai):
+    ai = make_ai(BadRequest("context length exceeded"))
+
+    result = ai.process_content('Title', 'Some article text.')
+
+    assert result['description'] == 'Content from: Title'
+    assert ai.structured_output is True
+    assert len(ai.client.requests) == 1
+
+
+def words(n: int) -> str:
+    return ' '.join(['word'] * n)
+
+
+def result_json(description: str = words(150), tags=('python', 'testing', 'tools'), author: str = 'Ada') -> str:
+    return json.dumps({'description': description, 'tags': list(tags), 'author': author})
+
+
+@pytest.fixture
+def make_cascade(cache_dir, monkeypatch):
+    """AIProcessor with a cheap openai tier before gpt-4o-mini; each tier answers from its own StubClient."""
+    monkeypatch.setattr(ai_processor, 'AI_CASCADE_CONFIG', {
+        'enabled': True,
+        'tiers': [{'provider': 'openai', 'model': 'cheap'}],
+        'escalate_on': {'min_tags': 3, 'length_tolerance': 0.25, 'min_input_words': 20},
+        'costs': {'cheap': {'input': 1.0, 'output': 2.0}, 'gpt-4o-mini': {'input': 10.0, 'output': 40.0}}
+    })
+
+    def make(cheap_replies, strong_replies) -> AIProcessor:
+        processor = AIProcessor('openai', 'gpt-4o-mini')
+        for tier, replies in zip(processor.tiers, (cheap_replies, strong_replies)):
+            tier.client = StubClient(*replies)
+            tier.reasks = 0
+        return processor
+
+    return make
+
+
+def test_cascade_escalates_only_failed_results(make_cascade):
+    strong = result_json(author='Grace')
+    ai = make_cascade([result_json(), result_json(author=''), result_json(tags=['python']), 'not JSON'],
+                      [strong, strong, strong])
+    results = [ai.process_content(f"Article {i}", words(50)) for i in range(4)]
+
+    assert results[0]['author'] == 'Ada'
+    assert [result['author'] for result in results[1:]] == ['Grace'] * 3
+    assert ai.escalation_reasons == {'missing_author': 1, 'too_few_tags': 1, 'no_result': 1}
+    assert ai.escalation_rate() == 0.75
+
+
+def test_cascade_sends_short_articles_to_the_last_tier(make_cascade):
+    ai = make_cascade([], [result_json(author='Grace')])
+
+    result = ai.process_content('Short', words(5))
+
+    assert result['author'] == 'Grace'
+    assert ai.escalation_reasons == {'short_input': 1}
+    assert [(row['articles'], row['escalated']) for row in ai.tier_report()] == [(0, 0), (1, 0)]
+    assert ai.escalation_rate() == 1.0
+
+
+def test_cascade_description_length_tolerance(make_cascade):
+    ai = make_cascade([], [])
+    item = {'title': 'Article', 'content': words(50)}
+
+    # DESCRIPTION_LENGTH is 100-200 words; 25% slack accepts 75-250
+    assert ai._escalation_reasons(json.loads(result_json(words(80))), item) == []
+    assert ai._escalation_reasons(json.loads(result_json(words(60))), item) == ['description_length']
+    assert ai._escalation_reasons(json.loads(result_json(words(260))), item) == ['description_length']
+    assert ai._escalation_reasons({'description': 'Content from: Article', 'tags': [], 'author': ''}, item) == ['no_result']
+
+
+def test_tier_report_splits_cost_per_tier(make_cascade):
+    ai = make_cascade([result_json(), result_json(author='')], [result_json(author='Grace')])
+    for i in range(2):
+        ai.process_content(f"Article {i}", words(50))
+    cheap, strong = ai.tier_report()
+
+    # Every stub reply uses 100 input and 20 output tokens
+    assert (cheap['tier'], cheap['articles'], cheap['escalated'], cheap['escalation_rate']) == ('openai/cheap', 2, 1, 0.5)
+    assert (cheap['input_tokens'], cheap['output_tokens']) == (200, 40)
+    assert cheap['cost'] == pytest.approx((200 * 1.0 + 40 * 2.0) / 1e6)
+    assert (strong['tier'], strong['articles'], strong['escalated']) == ('openai/gpt-4o-mini', 1, 0)
+    assert (strong['input_tokens'], strong['output_tokens']) == (100, 20)
+    assert strong['cost'] == pytest.approx((100 * 10.0 + 20 * 40.0) / 1e6)
@@ -0,0 +1,27 @@
+from src.ai_schema import MAX_TAG_WORDS, parse_json, validate_result
+
+
+def test_parse_json_finds_the_object_around_prose():
+    assert parse_json('{"tags": []}') == ({'tags': []}, None)
+    assert parse_json('Here it is:\n```json\n{"author": "Ada"}\n```') == ({'author': 'Ada'}, None)
+
+    data, error = parse_json('Description: no JSON here')
+    assert data is None and error
+
+
+def test_validate_result_cleans_tags():
+    long_tag = ' '.join(['word'] * (MAX_TAG_WORDS + 1))
+    result, errors = validate_result({'description': ' A summary. ', 'tags': ['python', long_tag, '  ', 3],
+                                      'author': None})
+
+    assert errors == []
+    assert result.as_dict() == {'description': 'A summary.', 'tags': ['python'], 'author': ''}
+
+
+def test_validate_result_reports_every_problem():
+    result, errors = validate_result({'description': '', 'tags': 'python'})
+    assert result is None
+    assert len(errors) == 2
+
+    result, errors = validate_result(['not', 'an', 'object'])
+    assert result is None and len(errors) == 1
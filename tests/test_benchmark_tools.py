@@ -0,0 +1,78 @@
+import csv
+import importlib.util
+import json
+import threading
+from pathlib import Path
+
+import requests
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def load_script(path: Path):
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+fixture_server = load_script(ROOT / 'tools' / 'fixture_server.py')
+mock_llm_server = load_script(ROOT / 'tools' / 'mock_llm_server.py')
+bench_pipeline = load_script(ROOT / 'benchmarks' / 'bench_pipeline.py')
+
+
+def serve(server):
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_fixture_server_replays_pages_and_injected_errors():
+    pages = fixture_server.create_server(port=0)
+    failing = fixture_server.create_server(port=0, error_rate=1.0, errors=('404',))
+    try:
+        url, failing_url = serve(pages), serve(failing)
+        first = requests.get(f"{url}/site1/articles/1", timeout=5)
+        again = requests.get(f"{url}/site1/articles/1?utm_source=pocket", timeout=5)
+        error = requests.get(f"{failing_url}/site1/articles/1", timeout=5)
+    finally:
+        pages.shutdown()
+        failing.shutdown()
+
+    assert first.status_code == 200 and first.headers['Content-Type'].startswith('text/html')
+    assert again.content == first.content
+    assert error.status_code == 404
+
+
+def test_mock_llm_answers_from_the_prompt_titles():
+    server = mock_llm_server.create_server(port=0, batch_delay=0)
+    try:
+        response = requests.post(f"{serve(server)}/v1/chat/completions", timeout=5, json={
+            'model': 'mock', 'messages': [{'role': 'user', 'content': 'Title: Notes on Typography\nContent: ...'}]})
+    finally:
+        server.shutdown()
+
+    answer = json.loads(response.json()['choices'][0]['message']['content'])
+    assert answer['description'] == "Mock summary of the article 'Notes on Typography'."
+    assert answer['tags'] == ['notes', 'typography']
+
+
+def test_synthetic_export_format(tmp_path):
+    path = tmp_path / 'synthetic.csv'
+    bench_pipeline.write_export(path, 1000, 'http://127.0.0.1:8002', duplicate_rate=0.05)
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f, delimiter=';'))
+    assert len(rows) == 1000 and list(rows[0]) == ['title', 'url', 'tags', 'created']
+    duplicates = sum(row['url'].endswith(bench_pipeline.TRACKING) for row in rows)
+    assert 20 < duplicates < 80
+
+
+def test_compare_flags_regressions_beyond_tolerance(tmp_path):
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps([{'rows': 1000, 'bookmarks_per_sec': 100.0, 'p95': 1.0, 'peak_rss_mb': 200.0}]))
+
+    within = [{'rows': 1000, 'bookmarks_per_sec': 95.0, 'p95': 1.05, 'peak_rss_mb': 210.0}]
+    worse = [{'rows': 1000, 'bookmarks_per_sec': 80.0, 'p95': 1.5, 'peak_rss_mb': 200.0}]
+    assert bench_pipeline.compare(within, baseline, tolerance=0.1) == []
+    assert [message.split(':')[1].split()[0] for message in bench_pipeline.compare(worse, baseline, 0.1)] == \
+        ['bookmarks_per_sec', 'p95']
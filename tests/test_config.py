@@ -0,0 +1,62 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+import config
+from config import ConfigError
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def write_config(tmp_path, **changes) -> Path:
+    """The repository's config.yaml with `changes` ('section.key': value) applied."""
+    values = yaml.safe_load(config.CONFIG_PATH.read_text())
+    for name, value in changes.items():
+        section, key = name.split('.')
+        values[section][key] = value
+    path = tmp_path / 'config.yaml'
+    path.write_text(yaml.safe_dump(values))
+    return path
+
+
+def test_shipped_config_is_valid():
+    assert config.load()['OUTPUT_FORMAT'] in config.OUTPUT_FORMATS
+
+
+@pytest.mark.parametrize('fmt', config.OUTPUT_FORMATS)
+def test_output_formats_are_accepted(tmp_path, fmt):
+    assert config.load(write_config(tmp_path, **{'output.format': fmt}))['OUTPUT_FORMAT'] == fmt
+
+
+def test_invalid_settings_are_reported_together(tmp_path):
+    path = write_config(tmp_path, **{'output.format': 'xml', 'scraping.concurrency': 0})
+    with pytest.raises(ConfigError) as error:
+        config.load(path)
+
+    assert "output.format is 'xml'" in str(error.value)
+    assert 'scraping.concurrency must be a positive integer' in str(error.value)
+
+
+def test_unknown_html_parser_is_rejected(tmp_path):
+    with pytest.raises(ConfigError, match="scraping.parser is 'html5lib'"):
+        config.load(write_config(tmp_path, **{'scraping.parser': 'html5lib'}))
+
+
+def test_unknown_setting_is_an_attribute_error():
+    with pytest.raises(AttributeError):
+        config.NOT_A_SETTING
+
+
+def test_import_does_not_read_the_config():
+    code = "import sys, config; assert config._settings is None and 'yaml' not in sys.modules"
+    subprocess.run([sys.executable, '-c', code], cwd=str(ROOT), check=True)
+
+
+def test_startup_stays_within_budget():
+    # Fails when main.py --help or the processor import gets slower or loads a deferred module
+    result = subprocess.run([sys.executable, str(ROOT / 'benchmarks' / 'check_startup.py')], cwd=str(ROOT),
+                            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+    assert result.returncode == 0, result.stdout
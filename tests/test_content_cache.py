@@ -0,0 +1,26 @@
+import os
+
+from src.content_cache import ContentCache
+
+
+def test_evicts_least_recently_used_over_cap(tmp_path):
+    cache = ContentCache(tmp_path / 'pages.sqlite3', ttl_seconds=3600, max_bytes=3500)
+    html = os.urandom(1000)  # doesn't compress, so every entry takes about 1 KB
+    for i in range(3):
+        cache.put(f"https://example.com/{i}", html, {}, {'title': str(i)})
+    assert cache.get('https://example.com/0') is not None  # now the most recently used
+
+    cache.put('https://example.com/3', html, {}, {'title': '3'})
+
+    assert cache.get('https://example.com/1') is None
+    assert cache.get('https://example.com/0') is not None
+    assert cache._total == cache._stored_bytes() <= 3500
+
+
+def test_replacing_an_entry_keeps_the_total(tmp_path):
+    cache = ContentCache(tmp_path / 'pages.sqlite3', ttl_seconds=3600, max_bytes=10 ** 6)
+    for _ in range(3):
+        cache.put('https://example.com/', b'<html>page</html>', {}, {'title': 'page'})
+
+    assert cache._total == cache._stored_bytes()
+    assert ContentCache(tmp_path / 'pages.sqlite3', ttl_seconds=3600, max_bytes=10 ** 6)._total == cache._total
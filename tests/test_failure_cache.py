@@ -0,0 +1,111 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NameResolutionError, ReadTimeoutError
+
+import src.content_extractor as content_extractor
+import src.failure_cache as failure_cache
+from src.content_extractor import SKIP_KNOWN_FAILURE, ContentExtractor
+from src.failure_cache import (FAILURE_BOT_WALL, FAILURE_CONNECT_TIMEOUT, FAILURE_CONNECTION, FAILURE_DNS,
+                               FAILURE_HTTP_4XX, FAILURE_HTTP_5XX, FAILURE_RATE_LIMITED, FAILURE_READ_TIMEOUT,
+                               classify_exception, classify_response)
+
+
+def response(status: int, **headers) -> requests.Response:
+    result = requests.Response()
+    result.status_code = status
+    result.headers.update(headers)
+    return result
+
+
+def test_dns_failures():
+    gaierror = socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+    assert classify_exception(requests.ConnectionError(gaierror)) == FAILURE_DNS
+
+    # What requests raises: ConnectionError(MaxRetryError(reason=NameResolutionError(...)))
+    resolution = NameResolutionError('missing.invalid', None, gaierror)
+    wrapped = requests.ConnectionError(MaxRetryError(None, 'http://missing.invalid/', resolution))
+    assert classify_exception(wrapped) == FAILURE_DNS
+
+
+def test_timeouts():
+    assert classify_exception(requests.ConnectTimeout('timed out')) == FAILURE_CONNECT_TIMEOUT
+    assert classify_exception(requests.ReadTimeout('timed out')) == FAILURE_READ_TIMEOUT
+
+    # A read timeout that used up the retries arrives as a ConnectionError
+    exhausted = MaxRetryError(None, 'http://example.com/', ReadTimeoutError(None, 'http://example.com/', 'timed out'))
+    assert classify_exception(requests.ConnectionError(exhausted)) == FAILURE_READ_TIMEOUT
+
+    assert classify_exception(requests.ConnectionError('Connection refused')) == FAILURE_CONNECTION
+
+
+def test_error_responses():
+    assert classify_response(response(403)) == FAILURE_BOT_WALL
+    assert classify_response(response(429)) == FAILURE_RATE_LIMITED
+    assert classify_response(response(404)) == FAILURE_HTTP_4XX
+
+
+def test_503_is_a_bot_wall_only_with_a_challenge_page():
+    challenge = b'<html><head><title>Just a moment...</title></head><body>Checking your browser</body></html>'
+    assert classify_response(response(503), challenge) == FAILURE_BOT_WALL
+    assert classify_response(response(503, **{'cf-mitigated': 'challenge'})) == FAILURE_BOT_WALL
+    assert classify_response(response(503), b'<html><body>Down for maintenance</body></html>') == FAILURE_HTTP_5XX
+
+
+@pytest.fixture
+def blocking_site():
+    """Local site answering 403 until `blocked` is cleared; `requests` counts the GETs it received."""
+    site = SimpleNamespace(blocked=True, requests=0)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            site.requests += 1
+            body = b'Forbidden' if site.blocked else b'<html><body><p>Hello</p></body></html>'
+            self.send_response(403 if site.blocked else 200)
+            self.send_header('Content-Type', 'text/html')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    site.url = f"http://127.0.0.1:{server.server_address[1]}/article"
+    yield site
+    server.shutdown()
+
+
+def test_known_failure_is_skipped_within_its_retry_window(cache_dir, monkeypatch, blocking_site):
+    clock = SimpleNamespace(now=1_000_000.0)
+    monkeypatch.setattr(failure_cache, 'time', SimpleNamespace(time=lambda: clock.now))
+    monkeypatch.setattr(content_extractor, 'REQUEST_DELAY', 0)
+    monkeypatch.setattr(content_extractor, 'NEGATIVE_CACHE_CONFIG',
+                        dict(content_extractor.NEGATIVE_CACHE_CONFIG, enabled=True,
+                             retry_after_hours={FAILURE_BOT_WALL: 168}))
+    extractor = ContentExtractor()
+    try:
+        assert extractor.fetch_page(blocking_site.url) is None
+        assert extractor.pop_failure_class(blocking_site.url) == FAILURE_BOT_WALL
+        blocking_site.blocked = False
+
+        # Inside the window: skipped without a request
+        clock.now += 167 * 3600
+        assert extractor.fetch_page(blocking_site.url) is None
+        assert blocking_site.requests == 1
+        assert extractor.pop_skip_reason(blocking_site.url) == SKIP_KNOWN_FAILURE
+        assert extractor.pop_failure_class(blocking_site.url) == FAILURE_BOT_WALL
+        assert extractor.stats['known_failures'] == 1
+
+        # After it: tried again
+        clock.now += 2 * 3600
+        page = extractor.fetch_page(blocking_site.url)
+        assert page is not None and b'Hello' in page.html
+        assert blocking_site.requests == 2
+    finally:
+        extractor.close()
@@ -0,0 +1,42 @@
+import pytest
+
+from src import html_parsers
+from src.html_parsers import PARSERS, LxmlParser, get_parser
+
+PAGE = b"""<html><head>
+<title>A Long Read</title>
+<meta property="og:site_name" content="Example Times">
+</head><body>
+<nav>Home | World | Sport</nav>
+<span class="byline">Jane Writer</span>
+<article><p>""" + b"Paragraph of the article body with enough words to count as content. " * 5 + b"""</p>
+<script>var tracking = true;</script></article>
+<footer>Copyright</footer>
+</body></html>"""
+
+
+def test_unknown_parser_is_rejected():
+    # config validation reports unknown scraping.parser values before any parser is created
+    with pytest.raises(ValueError):
+        get_parser('html5lib')
+
+
+def test_missing_selectolax_falls_back_to_lxml(monkeypatch):
+    def missing():
+        raise ImportError('No module named selectolax')
+
+    monkeypatch.setitem(PARSERS, 'selectolax', missing)
+    assert isinstance(html_parsers.get_parser('selectolax'), LxmlParser)
+
+
+@pytest.mark.parametrize('name', list(PARSERS))
+def test_parsers_extract_the_same_fields(name):
+    try:
+        parser = PARSERS[name]()
+    except ImportError:
+        pytest.skip(f"{name} is not installed")
+    fields = parser.parse(PAGE)
+
+    assert (fields.title, fields.author, fields.publisher) == ('A Long Read', 'Jane Writer', 'Example Times')
+    assert fields.text.startswith('Paragraph of the article body')
+    assert 'tracking' not in fields.text and 'Copyright' not in fields.text
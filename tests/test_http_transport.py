@@ -0,0 +1,111 @@
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.http_transport import CappedRetry, DnsCache, Http2Adapter, HttpTransport
+
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def test_dns_cache_counts_failed_lookups():
+    cache = DnsCache(ttl=60)
+
+    def failing_lookup(*args):
+        raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+
+    cache._getaddrinfo = failing_lookup
+    with pytest.raises(socket.gaierror):
+        cache.getaddrinfo('missing.invalid', 443)
+    assert cache.stats == {'hits': 0, 'misses': 1}
+
+
+def test_retries_of_failed_requests_are_counted():
+    transport = HttpTransport('test', max_retries=2, settings={'backoff_factor': 0})
+    with pytest.raises(requests.ConnectionError):
+        transport.session.get(f"http://127.0.0.1:{unused_port()}/", timeout=5)
+
+    assert transport.take_retries() == 2
+    assert transport.take_retries() == 0
+
+
+def test_retries_of_error_responses_are_counted():
+    class Unavailable(BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(503)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Unavailable)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        transport = HttpTransport('test', max_retries=2, settings={'backoff_factor': 0})
+        response = transport.session.get(f"http://127.0.0.1:{server.server_address[1]}/", timeout=5)
+    finally:
+        server.shutdown()
+
+    assert response.status_code == 503
+    assert transport.take_retries() == 2
+
+
+def test_failed_dns_lookups_are_not_retried(monkeypatch):
+    lookups = []
+
+    def failing_lookup(host, *args, **kwargs):
+        lookups.append(host)
+        raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+
+    monkeypatch.setattr(socket, 'getaddrinfo', failing_lookup)
+    transport = HttpTransport('test', max_retries=3, settings={'backoff_factor': 0})
+    with pytest.raises(requests.ConnectionError):
+        transport.session.get('http://missing.invalid/', timeout=5)
+
+    assert lookups == ['missing.invalid']
+    assert transport.take_retries() == 0
+
+
+def test_dns_cache_drops_expired_and_oldest_entries():
+    cache = DnsCache(ttl=60, max_entries=3)
+    cache._getaddrinfo = lambda host, *args: [host]
+    for host in ('a', 'b', 'c', 'd'):
+        cache.getaddrinfo(host, 443)
+    assert [key[0] for key in cache._entries] == ['b', 'c', 'd']
+
+    cache.ttl = 0
+    cache.getaddrinfo('e', 443)
+    cache.getaddrinfo('e', 443)  # expired at once, so looked up again
+    assert cache.stats == {'hits': 0, 'misses': 6}
+    assert len(cache._entries) <= 3
+
+
+def test_closing_the_last_transport_restores_getaddrinfo():
+    original = socket.getaddrinfo
+    transports = [HttpTransport('test', max_retries=0, settings={'dns_cache_ttl': 60}) for _ in range(2)]
+    assert socket.getaddrinfo is not original
+
+    transports[0].close()
+    assert socket.getaddrinfo is not original
+    transports[1].close()
+    assert socket.getaddrinfo is original
+
+
+def test_http2_clients_follow_verify_cert_and_proxies():
+    pytest.importorskip('h2')
+    adapter = Http2Adapter(pool_maxsize=2, max_retries=CappedRetry(total=0))
+    default = adapter._client_for(True, None, None)
+
+    assert adapter._client_for(True, None, None) is default
+    assert adapter._client_for(False, None, None) is not default
+    assert adapter._client_for(True, None, 'http://proxy.example:3128') is not default
+    assert len(adapter._clients) == 3
+    adapter.close()
+    assert not adapter._clients
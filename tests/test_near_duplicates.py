@@ -0,0 +1,27 @@
+from src.near_duplicates import NearDuplicateIndex
+
+ARTICLE = ' '.join(f"word{i % 37} token{i % 11} item{i}" for i in range(150))
+OTHER = ' '.join(f"other{i % 23} text{i}" for i in range(200))
+
+
+def test_finds_a_copy_under_another_url(tmp_path):
+    index = NearDuplicateIndex(tmp_path / 'fingerprints.sqlite3')
+    index.add('https://example.com/story', index.fingerprint(ARTICLE),
+              {'description': 'A story', 'tags': ['news', 'example'], 'author': 'A. Writer'})
+
+    match = index.find('https://amp.example.net/story', index.fingerprint(ARTICLE.upper() + '!'))
+    assert match is not None
+    assert (match.url, match.similarity, match.tags) == ('https://example.com/story', 1.0, ['news', 'example'])
+    # Not a match for itself, nor for unrelated or short texts
+    assert index.find('https://example.com/story?utm_source=feed', index.fingerprint(ARTICLE)) is None
+    assert index.find('https://example.com/other', index.fingerprint(OTHER)) is None
+    assert index.fingerprint('too short to compare') is None
+
+
+def test_index_persists_across_runs(tmp_path):
+    index = NearDuplicateIndex(tmp_path / 'fingerprints.sqlite3')
+    index.add('https://example.com/story', index.fingerprint(ARTICLE), {'description': 'A story', 'tags': []})
+
+    reopened = NearDuplicateIndex(tmp_path / 'fingerprints.sqlite3')
+    assert len(reopened) == 1
+    assert reopened.find('https://example.net/copy', reopened.fingerprint(ARTICLE)).description == 'A story'
@@ -0,0 +1,28 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import src.bookmark_processor as bookmark_processor
+from src.content_extractor import FetchedPage
+
+PAGE = Path(__file__).resolve().parent.parent / 'benchmarks' / 'fixtures' / 'pages' / 'news_article.html'
+
+
+def test_parse_workers_are_not_forked_from_the_threaded_parent(make_processor, monkeypatch):
+    start_methods = []
+
+    class RecordingPool(ProcessPoolExecutor):
+        def __init__(self, *args, mp_context=None, **kwargs):
+            start_methods.append(mp_context.get_start_method() if mp_context else 'fork')
+            super().__init__(*args, mp_context=mp_context, **kwargs)
+
+    monkeypatch.setattr(bookmark_processor, 'ProcessPoolExecutor', RecordingPool)
+    processor = make_processor(concurrency=2, parse_workers=1)
+    url = 'https://news.example/article'
+    pages = [(0, {'url': url}, FetchedPage(url, PAGE.read_bytes(), {'Content-Type': 'text/html'}, 'utf-8', None)),
+             (1, {'url': 'https://news.example/missing'}, None)]
+
+    parsed = {key: content for key, _, content in processor._iter_parsed(iter(pages))}
+
+    assert start_methods == [bookmark_processor.PARSE_START_METHOD] and start_methods[0] != 'fork'
+    assert parsed[1] is None
+    assert parsed[0]['title'] and len(parsed[0]['text']) > 200
@@ -0,0 +1,73 @@
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+from src.bookmark_processor import BookmarkProcessor
+
+BENCHMARK = Path(__file__).resolve().parent.parent / 'benchmarks' / 'bench_process_loop.py'
+spec = importlib.util.spec_from_file_location('bench_process_loop', BENCHMARK)
+bench_process_loop = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bench_process_loop)
+
+
+@pytest.fixture
+def processor_with_stand_ins(make_processor):
+    """Processor factory with the benchmark's fetch and AI stand-ins; the AI fails for article 7."""
+    return lambda: with_stand_ins(make_processor(concurrency=1))
+
+
+def with_stand_ins(processor):
+    def flaky_ai(title, **kwargs):
+        if title == 'Synthetic article 7':
+            raise RuntimeError('model unavailable')
+        return bench_process_loop.fake_ai(title, **kwargs)
+
+    processor.content_extractor.extract_content = bench_process_loop.fake_extract
+    processor.ai_processor.process_content = flaky_ai
+    return processor
+
+
+def test_running_counters(tmp_path, processor_with_stand_ins):
+    input_path, output_path = tmp_path / 'export.csv', tmp_path / 'enriched.csv'
+    bench_process_loop.write_export(input_path, 200)
+
+    processor = processor_with_stand_ins()
+    processor.process_file(input_path, output_path)
+
+    assert processor.progress == {'processed': 200, 'failed': 1}
+    report = json.loads((tmp_path / 'enriched_summary.json').read_text())
+    assert report['bookmarks'] == {'total': 200, 'completed': 199, 'failed': 1}
+    output = BookmarkProcessor._read_output(output_path)
+    assert list(output['title']) == [f"Synthetic article {i}" for i in range(200)]
+    assert output.loc[7, 'description'] == 'Processing failed'
+    assert output.loc[8, 'description'] == 'Summary of Synthetic article 8'
+
+
+def test_resume_counts_only_new_work(tmp_path, processor_with_stand_ins):
+    input_path, output_path = tmp_path / 'export.csv', tmp_path / 'enriched.csv'
+    bench_process_loop.write_export(input_path, 50)
+    processor_with_stand_ins().process_file(input_path, output_path)
+
+    processor = processor_with_stand_ins()
+    processor.process_file(input_path, output_path, resume=True)
+
+    assert processor.progress == {'processed': 0, 'failed': 0}
+    assert len(BookmarkProcessor._read_output(output_path)) == 50
+
+
+def test_resume_with_malformed_urls(tmp_path, processor_with_stand_ins):
+    input_path, output_path = tmp_path / 'export.csv', tmp_path / 'enriched.csv'
+    bench_process_loop.write_export(input_path, 20)
+    with open(input_path, 'a', encoding='utf-8') as f:
+        f.write('Bad port;http://a.com:abc/x;NA;1700000000\nBad host;http://[::1/x;NA;1700000001\n')
+    processor_with_stand_ins().process_file(input_path, output_path)
+
+    processor = processor_with_stand_ins()
+    processor.process_file(input_path, output_path, resume=True)
+
+    assert processor.progress == {'processed': 0, 'failed': 0}
+    output = BookmarkProcessor._read_output(output_path)
+    assert list(output['url'][-2:]) == ['http://a.com:abc/x', 'http://[::1/x']
+    assert output.loc[21, 'description'] == 'Summary of Bad host'
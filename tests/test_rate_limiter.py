@@ -0,0 +1,55 @@
+import time
+
+from src.rate_limiter import HostQueue, HostRateLimiter
+
+
+def test_requests_to_one_host_are_spaced():
+    limiter = HostRateLimiter(0.2)
+    assert limiter.wait('https://a.example/1') == 0
+    assert limiter.wait('https://b.example/1') == 0
+    assert 0.15 < limiter.wait('https://a.example/2') <= 0.2
+    assert limiter.host('http://[::1/x') == 'http://[::1/x'
+
+
+def test_host_queue_holds_rows_until_their_host_is_ready():
+    limiter = HostRateLimiter(0.2)
+    queue = HostQueue(limiter)
+
+    assert queue.offer('a1', 'https://a.example/1')
+    limiter.wait('https://a.example/1')  # what the fetch of a1 does
+    assert not queue.offer('a2', 'https://a.example/2')
+    assert queue.offer('b1', 'https://b.example/1')
+    assert (queue.pop_ready(), len(queue), queue.next_ready_in()) == (None, 1, None)  # a1 is still running
+
+    queue.finish('https://a.example/1')
+    assert queue.pop_ready() is None and 0.1 < queue.next_ready_in() <= 0.2
+    time.sleep(queue.next_ready_in())
+    assert (queue.pop_ready(), len(queue)) == ('a2', 0)
+
+
+def test_without_delay_every_row_starts():
+    queue = HostQueue(HostRateLimiter(0))
+    assert all(queue.offer(i, 'https://a.example/') for i in range(5))
+    assert len(queue) == 0
+
+
+def test_rows_of_a_waiting_host_dont_block_other_hosts(make_processor):
+    processor = make_processor(concurrency=4)
+    limiter = processor.content_extractor.rate_limiter = HostRateLimiter(0.15)
+    # Enough rows for one host to fill every worker and in-flight slot
+    urls = [f"https://same.example/{i}" for i in range(8)] + [f"https://host{i}.example/" for i in range(8)]
+    started = {}
+    start = time.monotonic()
+
+    def fetch(row):
+        limiter.wait(row['url'])  # as ContentExtractor.fetch_page does
+        started[row['url']] = time.monotonic() - start
+        time.sleep(0.01)
+        return row['url']
+
+    fetched = list(processor._iter_fetch_stage(((i, {'url': url}) for i, url in enumerate(urls)), fetch))
+
+    assert sorted(url for _, _, url in fetched) == sorted(urls)
+    assert max(started[url] for url in urls[8:]) < 0.1
+    same_host = sorted(started[url] for url in urls[:8])
+    assert all(later - earlier >= 0.14 for earlier, later in zip(same_host, same_host[1:]))
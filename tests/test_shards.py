@@ -0,0 +1,56 @@
+import json
+
+import pandas as pd
+
+from src.bookmark_processor import BookmarkProcessor
+from src.shards import merge_reports, parse_shard, shard_of, shard_path
+
+
+def test_parse_shard():
+    assert parse_shard('2/4') == (2, 4)
+    for spec in ('0/4', '5/4', '1', 'a/b'):
+        try:
+            parse_shard(spec)
+        except ValueError:
+            continue
+        raise AssertionError(f"{spec!r} was accepted")
+
+
+def test_duplicate_urls_share_a_shard():
+    assert shard_of('https://example.com/a?utm_source=x', 4) == shard_of('https://example.com/a', 4)
+
+
+def test_malformed_urls_have_a_shard():
+    for url in ('http://a.com:abc/x', 'http://[::1/x'):
+        assert shard_of(url, 4) == shard_of(f" {url} ", 4)
+
+
+def test_merge_without_shard_summaries(tmp_path):
+    # Malformed URLs are sharded and merged like the others
+    urls = [f"https://example.com/article/{i}" for i in range(18)] + ['http://a.com:abc/x', 'http://[::1/x']
+    df = pd.DataFrame({'title': [f"Article {i}" for i in range(20)], 'url': urls, 'tags': '', 'created': 0})
+    input_path = tmp_path / 'bookmarks.csv'
+    df.to_csv(input_path, sep=';', index=False)
+
+    output_path = tmp_path / 'enriched.csv'
+    outputs = []
+    for index in (1, 2, 3):
+        # _select_shard only reads the dataframe, as a --shard run selects its rows
+        part = BookmarkProcessor._select_shard(None, df, (index, 3)).assign(description='enriched')
+        path = shard_path(output_path, (index, 3))
+        BookmarkProcessor._write_dataframe(part, path)
+        outputs.append(path)
+
+    BookmarkProcessor.merge_shards(input_path, outputs, output_path)
+
+    merged = BookmarkProcessor._read_output(output_path)
+    assert list(merged['url']) == urls
+    assert not (tmp_path / 'enriched_summary.txt').exists()
+
+
+def test_summary_of_empty_merge(tmp_path):
+    summary_path = tmp_path / 'enriched_summary.txt'
+    BookmarkProcessor._write_summary(merge_reports([], [None]), summary_path)
+
+    assert 'Total bookmarks: 0' in summary_path.read_text()
+    assert json.loads(summary_path.with_suffix('.json').read_text())['shards'] == 0
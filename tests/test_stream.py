@@ -0,0 +1,41 @@
+import pandas as pd
+
+import src.bookmark_processor as bookmark_processor
+from src.bookmark_processor import BookmarkProcessor
+
+
+def test_stream_reuses_results_across_chunks(tmp_path, monkeypatch, make_processor):
+    monkeypatch.setattr(bookmark_processor, 'STREAM_CHUNK_SIZE', 7)
+    # 10 articles, each bookmarked 3 times with different tracking parameters, spread over 5 chunks
+    urls = [f"https://example.com/article/{i % 10}?utm_source=feed{i}" for i in range(30)]
+    input_path = tmp_path / 'bookmarks.csv'
+    pd.DataFrame({'title': [f"Bookmark {i}" for i in range(30)], 'url': urls, 'tags': '', 'created': range(30)}) \
+        .to_csv(input_path, sep=';', index=False)
+
+    processor = make_processor(concurrency=1, parse_workers=0)
+    processor.near_duplicates = None
+    fetched, enriched = [], []
+
+    def fetch(row):
+        fetched.append(row['url'])
+        return {'title': 'Article', 'text': 'Article text', 'publisher': 'Example'}
+
+    def process_content(**request):
+        enriched.append(request['title'])
+        return {'description': f"About {request['title']}", 'tags': ['example'], 'author': ''}
+
+    monkeypatch.setattr(processor, '_fetch_content', fetch)
+    monkeypatch.setattr(processor.ai_processor, 'process_content', process_content)
+
+    output_path = tmp_path / 'enriched.csv'
+    processor.process_file(input_path, output_path, stream=True)
+
+    assert len(fetched) == 10
+    assert len(enriched) == 10
+    assert processor.stats['duplicate_rows'] == 20
+    assert processor.stats['fetches_saved'] == 20
+    output = BookmarkProcessor._read_output(output_path)
+    assert list(output['url']) == urls
+    # Each row keeps its own title; the description is its article's
+    assert list(output['formatted_title']) == [f"Bookmark {i} - Example" for i in range(30)]
+    assert list(output['description']) == [f"About Bookmark {i % 10}" for i in range(30)]
@@ -0,0 +1,28 @@
+import pytest
+
+from src.bookmark_processor import BookmarkProcessor
+from src.utils import canonicalize_url, normalize_url
+
+MALFORMED = ['http://a.com:abc/x', 'http://[::1/x']
+
+
+def test_canonical_url_drops_tracking_and_cosmetic_differences():
+    assert canonicalize_url(' HTTPS://www.Example.com:443/a/?utm_source=x&b=2&a=1#top ') == \
+        'https://example.com/a?a=1&b=2'
+    assert normalize_url('http://example.com:8080') == 'http://example.com:8080/'
+
+
+@pytest.mark.parametrize('url', MALFORMED)
+def test_malformed_url_is_its_own_canonical_form(url):
+    with pytest.raises(ValueError):
+        normalize_url(url)
+    assert canonicalize_url(f" {url} ") == url
+
+
+def test_malformed_urls_are_grouped_on_their_own():
+    urls = ['https://example.com/a', MALFORMED[0], 'https://example.com/a?utm_source=feed', MALFORMED[1],
+            MALFORMED[0]]
+    records = [{'url': url, 'processing_status': 'pending'} for url in urls]
+
+    # _group_duplicates only reads the records, so no processor needs to be set up
+    assert BookmarkProcessor._group_duplicates(None, records) == [[0, 2], [1, 4], [3]]
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Fixture Page Server
+Local stand-in for the web: replays a corpus of saved HTML pages for any URL path,
+with configurable latency and injected errors, so fetching and parsing can be
+benchmarked without network access.
+
+    python tools/fixture_server.py --port 8002
+    python tools/fixture_server.py --port 8002 --latency 0.2 --jitter 0.5 --error-rate 0.05
+
+Every path maps to one of the pages (by a hash of the path), so the same URL
+always gets the same page, latency and error. --errors picks the injected
+failures: HTTP status codes, 'reset' (connection closed without a response) and
+'pdf' (a non-HTML response).
+"""
+
+import argparse
+import random
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+FIXTURE_PAGES = Path(__file__).resolve().parent.parent / 'benchmarks' / 'fixtures' / 'pages'
+DEFAULT_ERRORS = ('404', '403', '500', 'reset', 'pdf')
+
+
+class FixtureState:
+    """The page corpus and the latency and error settings."""
+
+    def __init__(self, pages: dict, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 errors=DEFAULT_ERRORS):
+        self.pages = [pages[name] for name in sorted(pages)]
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.errors = list(errors)
+
+    def plan(self, path: str):
+        """The (page, delay in seconds, injected error or None) for a path; the same path always gets the same."""
+        seed = zlib.crc32(path.split('?')[0].encode('utf-8'))
+        rng = random.Random(seed)
+        delay = max(0.0, self.latency * (1 + self.jitter * rng.uniform(-1, 1)))
+        error = rng.choice(self.errors) if self.errors and rng.random() < self.error_rate else None
+        return self.pages[seed % len(self.pages)], delay, error
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    state: FixtureState = None
+    protocol_version = 'HTTP/1.1'  # keep-alive, like real servers
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def _respond(self, body: bool):
+        page, delay, error = self.state.plan(self.path)
+        time.sleep(delay)
+
+        if error == 'reset':
+            self.close_connection = True
+            return
+        if error == 'pdf':
+            return self._send(200, 'application/pdf', b'%PDF-1.4 fixture', body)
+        if error:
+            return self._send(int(error), 'text/html; charset=utf-8',
+                              f"<html><body><h1>Error {error}</h1></body></html>".encode('utf-8'), body)
+        self._send(200, 'text/html; charset=utf-8', page, body)
+
+    def _send(self, status: int, content_type: str, content: bytes, body: bool = True):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        if body:
+            self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(host: str = '127.0.0.1', port: int = 8002, pages_dir: Path = FIXTURE_PAGES,
+                  latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                  errors=DEFAULT_ERRORS) -> ThreadingHTTPServer:
+    """Create (but do not start) a fixture server; port 0 picks a free port."""
+    pages = {path.name: path.read_bytes() for path in Path(pages_dir).glob('*.html')}
+    if not pages:
+        raise ValueError(f"No *.html pages in {pages_dir}")
+
+    state = FixtureState(pages, latency, jitter, error_rate, errors)
+    handler = type('Handler', (FixtureHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve saved HTML pages with injected latency and errors')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8002, help='Port, 0 for any free port (default: 8002)')
+    parser.add_argument('--pages', type=Path, default=FIXTURE_PAGES, help='Directory of saved *.html pages')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds before each response (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Vary the latency by up to this fraction either way (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Fraction of URLs that get an injected error (default: 0)')
+    parser.add_argument('--errors', default=','.join(DEFAULT_ERRORS),
+                        help=f"Injected errors: status codes, reset, pdf (default: {','.join(DEFAULT_ERRORS)})")
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.pages, args.latency, args.jitter, args.error_rate,
+                           [error.strip() for error in args.errors.split(',') if error.strip()])
+    print(f"Fixture server listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
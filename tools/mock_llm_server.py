@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Mock LLM Server
+Local stand-in for the OpenAI and Anthropic endpoints used by the enrichment tool,
+including the batch APIs, so --batch-api runs can be tested without network access.
+
+    python tools/mock_llm_server.py --port 8001
+    OPENAI_API_KEY=test OPENAI_BASE_URL=http://127.0.0.1:8001/v1 python main.py bookmarks.csv --batch-api
+    ANTHROPIC_API_KEY=test ANTHROPIC_BASE_URL=http://127.0.0.1:8001 ...
+
+Answers are deterministic and built from the titles found in the prompt. Requests
+with an Anthropic tool schema are answered with a tool call. --invalid-every N
+answers every Nth single-article prompt with malformed JSON to exercise re-asks.
+--latency (with --jitter) delays every chat/messages answer like a real model;
+with the `local` provider pointed at http://127.0.0.1:8001/v1 it stands in for
+Ollama in benchmarks.
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def build_answer(prompt: str) -> str:
+    """Build a JSON answer for a single-article or multi-article prompt."""
+    titles = re.findall(r'^Title: (.*)$', prompt, re.MULTILINE)
+
+    def item(title):
+        words = [word for word in re.findall(r'[A-Za-z]+', title) if len(word) > 3]
+        return {
+            'description': f"Mock summary of the article '{title}'.",
+            'tags': [word.lower() for word in words[:3]] or ['article'],
+            'author': ''
+        }
+
+    item_ids = re.findall(r'^=== Item (\d+) ===$', prompt, re.MULTILINE)
+    if item_ids:
+        return json.dumps({'items': [dict(item(title), id=item_id) for item_id, title in zip(item_ids, titles)]})
+    return json.dumps(item(titles[0] if titles else ''))
+
+
+def first_prompt(body: dict) -> str:
+    """The first user message (the article prompt, also when the request is a re-ask)."""
+    for message in body.get('messages', []):
+        if message.get('role') == 'user':
+            content = message.get('content')
+            return content if isinstance(content, str) else ''.join(part.get('text', '') for part in content)
+    return ''
+
+
+def is_reask(body: dict) -> bool:
+    return any(message.get('role') == 'assistant' for message in body.get('messages', []))
+
+
+def prompt_text(body: dict) -> str:
+    """The user prompt of a chat completion or messages request body."""
+    for message in reversed(body.get('messages', [])):
+        if message.get('role') == 'user':
+            content = message.get('content')
+            return content if isinstance(content, str) else ''.join(part.get('text', '') for part in content)
+    return ''
+
+
+def chat_completion(body: dict, malformed: bool = False) -> dict:
+    answer = build_answer(first_prompt(body))
+    if malformed:
+        answer = answer[:len(answer) // 2]
+    return {
+        'id': f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        'object': 'chat.completion',
+        'created': int(time.time()),
+        'model': body.get('model', 'mock'),
+        'choices': [{'index': 0, 'finish_reason': 'stop',
+                     'message': {'role': 'assistant', 'content': answer}}],
+        'usage': {'prompt_tokens': len(prompt_text(body)) // 4, 'completion_tokens': len(answer) // 4,
+                  'total_tokens': (len(prompt_text(body)) + len(answer)) // 4}
+    }
+
+
+def anthropic_message(body: dict, malformed: bool = False) -> dict:
+    answer = build_answer(first_prompt(body))
+    if body.get('tools'):
+        result = json.loads(answer)
+        if malformed:
+            result.pop('tags', None)
+        content = [{'type': 'tool_use', 'id': f"toolu_{uuid.uuid4().hex[:12]}",
+                    'name': body['tools'][0]['name'], 'input': result}]
+    else:
+        content = [{'type': 'text', 'text': answer[:len(answer) // 2] if malformed else answer}]
+    return {
+        'id': f"msg_{uuid.uuid4().hex[:12]}",
+        'type': 'message',
+        'role': 'assistant',
+        'model': body.get('model', 'mock'),
+        'content': content,
+        'stop_reason': 'tool_use' if body.get('tools') else 'end_turn',
+        'stop_sequence': None,
+        'usage': {'input_tokens': len(prompt_text(body)) // 4, 'output_tokens': len(answer) // 4}
+    }
+
+
+class MockState:
+    """Uploaded files and submitted batches."""
+
+    def __init__(self, batch_delay: float, invalid_every: int = 0, latency: float = 0.0, jitter: float = 0.0):
+        self.batch_delay = batch_delay
+        self.invalid_every = invalid_every
+        self.latency = latency
+        self.jitter = jitter
+        self.files = {}
+        self.batches = {}
+        self.requests = 0
+        self.lock = threading.Lock()
+        self._random = random.Random(0)
+
+    def wait(self):
+        """Sleep for the configured answer latency."""
+        if self.latency > 0:
+            with self.lock:
+                factor = 1 + self.jitter * self._random.uniform(-1, 1)
+            time.sleep(max(0.0, self.latency * factor))
+
+    def malformed(self, body: dict) -> bool:
+        """Whether to answer this request with a malformed result (never re-asks or multi-article prompts)."""
+        if not self.invalid_every or is_reask(body) or '=== Item ' in first_prompt(body):
+            return False
+        with self.lock:
+            self.requests += 1
+            return self.requests % self.invalid_every == 0
+
+    def add_file(self, content: bytes, filename: str, purpose: str) -> dict:
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        with self.lock:
+            self.files[file_id] = content
+        return {'id': file_id, 'object': 'file', 'bytes': len(content), 'created_at': int(time.time()),
+                'filename': filename, 'purpose': purpose, 'status': 'processed'}
+
+    def openai_batch(self, batch_id: str) -> dict:
+        with self.lock:
+            batch = self.batches[batch_id]
+            if batch['status'] == 'in_progress' and time.time() - batch['created_at'] >= self.batch_delay:
+                lines = []
+                for line in self.files[batch['input_file_id']].decode('utf-8').splitlines():
+                    if line.strip():
+                        request = json.loads(line)
+                        lines.append(json.dumps({
+                            'id': f"batch_req_{uuid.uuid4().hex[:12]}",
+                            'custom_id': request['custom_id'],
+                            'response': {'status_code': 200, 'request_id': uuid.uuid4().hex,
+                                         'body': chat_completion(request['body'])},
+                            'error': None
+                        }))
+                output_id = f"file-{uuid.uuid4().hex[:12]}"
+                self.files[output_id] = ('\n'.join(lines) + '\n').encode('utf-8')
+                batch.update(status='completed', output_file_id=output_id, completed_at=int(time.time()),
+                             request_counts={'total': len(lines), 'completed': len(lines), 'failed': 0})
+            return dict(batch)
+
+    def anthropic_batch(self, batch_id: str, base_url: str) -> dict:
+        with self.lock:
+            batch = self.batches[batch_id]
+            if batch['processing_status'] == 'in_progress' and time.time() - batch['_created'] >= self.batch_delay:
+                count = len(batch['_requests'])
+                batch.update(processing_status='ended', results_url=f"{base_url}/v1/messages/batches/{batch_id}/results",
+                             ended_at=time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+                             request_counts={'processing': 0, 'succeeded': count, 'errored': 0,
+                                             'canceled': 0, 'expired': 0})
+            return {key: value for key, value in batch.items() if not key.startswith('_')}
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    state: MockState = None
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        raw = self.rfile.read(length)
+        path = self.path.split('?')[0]
+
+        if path == '/v1/chat/completions':
+            body = json.loads(raw)
+            self.state.wait()
+            return self._json(chat_completion(body, self.state.malformed(body)))
+        if path == '/v1/messages':
+            body = json.loads(raw)
+            self.state.wait()
+            return self._json(anthropic_message(body, self.state.malformed(body)))
+        if path == '/v1/files':
+            return self._json(self._upload(raw))
+        if path == '/v1/batches':
+            body = json.loads(raw)
+            batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+            batch = {'id': batch_id, 'object': 'batch', 'endpoint': body['endpoint'],
+                     'input_file_id': body['input_file_id'], 'completion_window': body['completion_window'],
+                     'status': 'in_progress', 'created_at': int(time.time()), 'output_file_id': None,
+                     'error_file_id': None, 'request_counts': {'total': 0, 'completed': 0, 'failed': 0}}
+            with self.state.lock:
+                self.state.batches[batch_id] = batch
+            return self._json(batch)
+        if path == '/v1/messages/batches':
+            body = json.loads(raw)
+            batch_id = f"msgbatch_{uuid.uuid4().hex[:12]}"
+            now = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+            batch = {'id': batch_id, 'type': 'message_batch', 'processing_status': 'in_progress',
+                     'request_counts': {'processing': len(body['requests']), 'succeeded': 0, 'errored': 0,
+                                        'canceled': 0, 'expired': 0},
+                     'created_at': now, 'expires_at': now, 'ended_at': None, 'archived_at': None,
+                     'cancel_initiated_at': None, 'results_url': None,
+                     '_created': time.time(), '_requests': body['requests']}
+            with self.state.lock:
+                self.state.batches[batch_id] = batch
+            return self._json({key: value for key, value in batch.items() if not key.startswith('_')})
+
+        self._json({'error': {'message': f"Unknown endpoint {path}"}}, status=404)
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        base_url = f"http://{self.headers.get('Host')}"
+
+        match = re.fullmatch(r'/v1/batches/([\w-]+)', path)
+        if match and match.group(1) in self.state.batches:
+            return self._json(self.state.openai_batch(match.group(1)))
+
+        match = re.fullmatch(r'/v1/files/([\w-]+)/content', path)
+        if match and match.group(1) in self.state.files:
+            return self._send(200, 'application/octet-stream', self.state.files[match.group(1)])
+
+        match = re.fullmatch(r'/v1/messages/batches/([\w-]+)', path)
+        if match and match.group(1) in self.state.batches:
+            return self._json(self.state.anthropic_batch(match.group(1), base_url))
+
+        match = re.fullmatch(r'/v1/messages/batches/([\w-]+)/results', path)
+        if match and match.group(1) in self.state.batches:
+            lines = [json.dumps({'custom_id': request['custom_id'],
+                                 'result': {'type': 'succeeded', 'message': anthropic_message(request['params'])}})
+                     for request in self.state.batches[match.group(1)]['_requests']]
+            return self._send(200, 'application/binary', ('\n'.join(lines) + '\n').encode('utf-8'))
+
+        self._json({'error': {'message': f"Unknown endpoint {path}"}}, status=404)
+
+    def _upload(self, raw: bytes) -> dict:
+        """Handle a multipart/form-data file upload."""
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {self.headers.get('Content-Type')}\r\n\r\n".encode('utf-8') + raw
+        )
+        fields, content, filename = {}, b'', 'batch.jsonl'
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            if name == 'file':
+                content = part.get_payload(decode=True)
+                filename = part.get_filename() or filename
+            else:
+                fields[name] = part.get_content().strip()
+        return self.state.add_file(content, filename, fields.get('purpose', 'batch'))
+
+    def _json(self, data: dict, status: int = 200):
+        self._send(status, 'application/json', json.dumps(data).encode('utf-8'))
+
+    def _send(self, status: int, content_type: str, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(host: str = '127.0.0.1', port: int = 8001, batch_delay: float = 2.0,
+                  invalid_every: int = 0, latency: float = 0.0, jitter: float = 0.0) -> ThreadingHTTPServer:
+    """Create (but do not start) a mock server; port 0 picks a free port."""
+    handler = type('Handler', (MockHandler,), {'state': MockState(batch_delay, invalid_every, latency, jitter)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for the OpenAI/Anthropic chat and batch APIs')
+    parser.add_argument('--host', default='127.0.0.1', help='Bind address (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8001, help='Port (default: 8001)')
+    parser.add_argument('--batch-delay', type=float, default=2.0, help='Seconds before a submitted batch completes (default: 2)')
+    parser.add_argument('--invalid-every', type=int, default=0,
+                        help='Answer every Nth single-article prompt with malformed JSON (default: 0, never)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds before each answer (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                        help='Vary the latency by up to this fraction either way (default: 0)')
+    args = parser.parse_args()
+
+    server = create_server(args.host, args.port, args.batch_delay, args.invalid_every, args.latency, args.jitter)
+    print(f"Mock LLM server listening on http://{args.host}:{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()